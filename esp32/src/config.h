@@ -10,6 +10,9 @@
 #define MCP_SERVER_PORT 8080
 #define ROBOT_ID "MignonBot1"
 
+// Format des messages MCP : 0 = JSON, 1 = trame binaire compacte (application/x-mcp-struct)
+#define MCP_WIRE_FORMAT_BINARY 0
+
 // Broches des capteurs
 // Sons
 #define PIN_BIG_SOUND 36
@@ -61,4 +64,8 @@
 #define EMOTION_UPDATE_INTERVAL 2000
 #define MCP_SEND_INTERVAL 5000
 
+// Bornes de l'intervalle d'envoi recommandé par le serveur (data.reporting.send_interval_ms)
+#define MCP_SEND_INTERVAL_MIN 1000
+#define MCP_SEND_INTERVAL_MAX 30000
+
 #endif // CONFIG_H
@@ -72,8 +72,8 @@ void loop() {
     lastEmotionUpdate = millis();
   }
   
-  // Communiquer avec le serveur MCP
-  if (millis() - lastMCPUpdate >= MCP_SEND_INTERVAL && wifiManager.isConnected()) {
+  // Communiquer avec le serveur MCP (à la cadence recommandée par le serveur)
+  if (millis() - lastMCPUpdate >= mcpClient.getSendInterval() && wifiManager.isConnected()) {
     // Envoyer les données des capteurs
     mcpClient.sendSensorData(sensorData);
     
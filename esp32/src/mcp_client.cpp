@@ -1,6 +1,47 @@
 #include "mcp_client.h"
 
-MCPClient::MCPClient() : serverIP(nullptr), serverPort(0), lastCommunication(0) {
+// Format binaire des messages MCP (voir nas/serveur_mcp/wire_format.py)
+#define MCP_STRUCT_VERSION 1
+#define MCP_MESSAGE_SENSOR_DATA 1
+#define MCP_MESSAGE_EMOTIONAL_STATE 2
+#define MCP_FRAME_MAX_SIZE 320
+
+// Bits du champ de drapeaux des capteurs
+#define MCP_FLAG_IR_DETECTED (1 << 0)
+#define MCP_FLAG_TAP (1 << 1)
+#define MCP_FLAG_SHOCK (1 << 2)
+#define MCP_FLAG_TOUCH (1 << 3)
+#define MCP_FLAG_BUTTON (1 << 4)
+#define MCP_FLAG_REED (1 << 5)
+#define MCP_FLAG_TILT (1 << 6)
+
+// Copier une valeur dans la trame (l'ESP32 est little-endian, comme le format)
+template <typename T>
+static size_t writeValue(uint8_t* buffer, size_t offset, T value) {
+    memcpy(buffer + offset, &value, sizeof(T));
+    return offset + sizeof(T);
+}
+
+MCPClient::MCPClient() : serverIP(nullptr), serverPort(0), lastCommunication(0), sendInterval(MCP_SEND_INTERVAL) {
+}
+
+unsigned long MCPClient::getSendInterval() const {
+    return sendInterval;
+}
+
+void MCPClient::readReportingHints(const String& response) {
+    // Ne désérialiser que le champ utile (la réponse contient aussi l'analyse du LLM)
+    StaticJsonDocument<64> filter;
+    filter["data"]["reporting"]["send_interval_ms"] = true;
+    
+    StaticJsonDocument<128> hints;
+    if (deserializeJson(hints, response, DeserializationOption::Filter(filter))) {
+        return;
+    }
+    unsigned long interval = hints["data"]["reporting"]["send_interval_ms"] | 0UL;
+    if (interval > 0) {
+        sendInterval = constrain(interval, (unsigned long)MCP_SEND_INTERVAL_MIN, (unsigned long)MCP_SEND_INTERVAL_MAX);
+    }
 }
 
 bool MCPClient::begin(const char* serverIP, int serverPort, const char* robotId) {
@@ -16,7 +57,109 @@ bool MCPClient::begin(const char* serverIP, int serverPort, const char* robotId)
     return checkConnection();
 }
 
+size_t MCPClient::encodeFrameHeader(uint8_t messageType, uint64_t timestamp, uint8_t* buffer, size_t size) {
+    size_t idLength = robotId.length();
+    if (idLength > 255 || size < 13 + idLength) {
+        return 0;
+    }
+    
+    size_t offset = 0;
+    buffer[offset++] = 'M';
+    buffer[offset++] = 'C';
+    buffer[offset++] = MCP_STRUCT_VERSION;
+    buffer[offset++] = messageType;
+    offset = writeValue<uint64_t>(buffer, offset, timestamp);
+    buffer[offset++] = (uint8_t)idLength;
+    memcpy(buffer + offset, robotId.c_str(), idLength);
+    return offset + idLength;
+}
+
+size_t MCPClient::encodeSensorFrame(const SensorData& data, uint8_t* buffer, size_t size) {
+    size_t offset = encodeFrameHeader(MCP_MESSAGE_SENSOR_DATA, data.timestamp, buffer, size);
+    if (offset == 0 || size < offset + 56) {
+        return 0;
+    }
+    
+    uint16_t flags = 0;
+    if (data.irDetected) flags |= MCP_FLAG_IR_DETECTED;
+    if (data.tapDetected) flags |= MCP_FLAG_TAP;
+    if (data.shockDetected) flags |= MCP_FLAG_SHOCK;
+    if (data.touchDetected) flags |= MCP_FLAG_TOUCH;
+    if (data.buttonPressed) flags |= MCP_FLAG_BUTTON;
+    if (data.reedDetected) flags |= MCP_FLAG_REED;
+    if (data.tiltDetected) flags |= MCP_FLAG_TILT;
+    
+    offset = writeValue<uint16_t>(buffer, offset, data.bigSound);
+    offset = writeValue<uint16_t>(buffer, offset, data.smallSound);
+    offset = writeValue<float>(buffer, offset, data.distance);
+    offset = writeValue<uint16_t>(buffer, offset, data.lightLevel);
+    offset = writeValue<float>(buffer, offset, data.dht11Temp);
+    offset = writeValue<float>(buffer, offset, data.ds18b20Temp);
+    offset = writeValue<float>(buffer, offset, data.analogTemp);
+    offset = writeValue<float>(buffer, offset, data.humidity);
+    offset = writeValue<int16_t>(buffer, offset, data.hallValue);
+    offset = writeValue<uint16_t>(buffer, offset, data.waterLevel);
+    for (int i = 0; i < 3; i++) {
+        offset = writeValue<float>(buffer, offset, data.acceleration[i]);
+    }
+    for (int i = 0; i < 3; i++) {
+        offset = writeValue<float>(buffer, offset, data.gyro[i]);
+    }
+    offset = writeValue<uint16_t>(buffer, offset, flags);
+    return offset;
+}
+
+size_t MCPClient::encodeEmotionFrame(const EmotionalState& state, uint8_t* buffer, size_t size) {
+    size_t offset = encodeFrameHeader(MCP_MESSAGE_EMOTIONAL_STATE, millis(), buffer, size);
+    if (offset == 0 || size < offset + 6) {
+        return 0;
+    }
+    
+    // L'ordre de l'enum EmotionType correspond aux codes du format binaire
+    buffer[offset++] = (uint8_t)state.currentEmotion;
+    buffer[offset++] = (uint8_t)constrain(state.intensity, 0, 100);
+    offset = writeValue<uint32_t>(buffer, offset, millis() - state.lastChange);
+    return offset;
+}
+
+bool MCPClient::postMessage(const char* path, const char* contentType, uint8_t* payload, size_t length) {
+    String url = "http://" + String(serverIP) + ":" + String(serverPort) + path;
+    http.begin(url);
+    http.addHeader("Content-Type", contentType);
+    
+    int httpCode = http.POST(payload, length);
+    
+    // Vérifier le résultat
+    bool success = false;
+    if (httpCode == HTTP_CODE_OK || httpCode == HTTP_CODE_ACCEPTED) {
+        String response = http.getString();
+        readReportingHints(response);
+        success = true;
+        lastCommunication = millis();
+    } else {
+        Serial.print("Erreur lors de l'envoi du message MCP: ");
+        Serial.println(httpCode);
+    }
+    
+    http.end();
+    return success;
+}
+
 bool MCPClient::sendSensorData(const SensorData& data) {
+#if MCP_WIRE_FORMAT_BINARY
+    uint8_t frame[MCP_FRAME_MAX_SIZE];
+    size_t length = encodeSensorFrame(data, frame, sizeof(frame));
+    if (length == 0) {
+        Serial.println("Erreur lors de l'encodage des données des capteurs");
+        return false;
+    }
+    bool sent = postMessage("/api/sensors", "application/x-mcp-struct", frame, length);
+    if (sent) {
+        Serial.println("Données des capteurs envoyées avec succès");
+    }
+    return sent;
+#endif
+    
     // Créer le document JSON
     doc.clear();
     
@@ -91,6 +234,7 @@ bool MCPClient::sendSensorData(const SensorData& data) {
     bool success = false;
     if (httpCode == HTTP_CODE_OK) {
         String response = http.getString();
+        readReportingHints(response);
         Serial.println("Données des capteurs envoyées avec succès");
         success = true;
         lastCommunication = millis();
@@ -104,6 +248,20 @@ bool MCPClient::sendSensorData(const SensorData& data) {
 }
 
 bool MCPClient::sendEmotionalState(const EmotionalState& state) {
+#if MCP_WIRE_FORMAT_BINARY
+    uint8_t frame[MCP_FRAME_MAX_SIZE];
+    size_t length = encodeEmotionFrame(state, frame, sizeof(frame));
+    if (length == 0) {
+        Serial.println("Erreur lors de l'encodage de l'état émotionnel");
+        return false;
+    }
+    bool sent = postMessage("/api/emotion", "application/x-mcp-struct", frame, length);
+    if (sent) {
+        Serial.println("État émotionnel envoyé avec succès");
+    }
+    return sent;
+#endif
+    
     // Créer le document JSON
     doc.clear();
     
@@ -148,6 +306,7 @@ bool MCPClient::sendEmotionalState(const EmotionalState& state) {
     bool success = false;
     if (httpCode == HTTP_CODE_OK) {
         String response = http.getString();
+        readReportingHints(response);
         Serial.println("État émotionnel envoyé avec succès");
         success = true;
         lastCommunication = millis();
@@ -79,6 +79,20 @@ private:
     
     // Timestamp de la dernière communication
     unsigned long lastCommunication;
+    
+    // Intervalle d'envoi recommandé par le serveur (ms)
+    unsigned long sendInterval;
+    
+    // Lire la cadence d'envoi recommandée dans la réponse du serveur
+    void readReportingHints(const String& response);
+    
+    // Encoder les messages au format binaire compact (application/x-mcp-struct)
+    size_t encodeSensorFrame(const SensorData& data, uint8_t* buffer, size_t size);
+    size_t encodeEmotionFrame(const EmotionalState& state, uint8_t* buffer, size_t size);
+    size_t encodeFrameHeader(uint8_t messageType, uint64_t timestamp, uint8_t* buffer, size_t size);
+    
+    // Envoyer un message MCP et vérifier la réponse
+    bool postMessage(const char* path, const char* contentType, uint8_t* payload, size_t length);
 
 public:
     MCPClient();
@@ -97,6 +111,9 @@ public:
     
     // Vérifier la connexion au serveur MCP
     bool checkConnection();
+    
+    // Intervalle d'envoi recommandé par le serveur (MCP_SEND_INTERVAL par défaut)
+    unsigned long getSendInterval() const;
 };
 
 #endif // MCP_CLIENT_H
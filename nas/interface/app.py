@@ -30,6 +30,15 @@ VISION_SERVICE_URL = os.environ.get("VISION_SERVICE_URL", "http://vision_service
 SPEECH_SERVICE_URL = os.environ.get("SPEECH_SERVICE_URL", "http://speech_service:8050")
 ROBOT_ID = os.environ.get("ROBOT_ID", "MignonBot1")
 
+# Séries du graphique des capteurs : nom dans l'interface → champ de l'historique du serveur MCP
+HISTORY_SERIES = {
+    "temperature": "temp_dht11",
+    "humidity": "humidity",
+    "light": "light_level",
+    "distance": "distance",
+    "sound": "big_sound"
+}
+
 # Création de l'application
 app = FastAPI(
     title="Interface Robot Mignon",
@@ -137,7 +146,18 @@ async def get_sensor_history(period: str = "1h"):
         async with httpx.AsyncClient() as client:
             response = await client.get(f"{MCP_SERVER_URL}/api/sensor_history/{ROBOT_ID}?period={period}")
             if response.status_code == 200:
-                return response.json()
+                # Moyenne de chaque champ par intervalle
+                result = response.json()
+                history = result.get("data") or {}
+                fields = history.get("fields", {})
+                return {
+                    "success": result.get("success", False),
+                    "message": result.get("message"),
+                    "history": {
+                        "timestamps": history.get("timestamps", []),
+                        **{name: fields.get(field, {}).get("avg", []) for name, field in HISTORY_SERIES.items()}
+                    }
+                }
             else:
                 logger.error(f"Erreur lors de la récupération de l'historique des capteurs: {response.status_code}")
                 return {"success": False, "message": "Erreur lors de la récupération de l'historique des capteurs"}
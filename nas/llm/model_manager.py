@@ -1,6 +1,8 @@
 import os
+import time
 import torch
 import json
+import threading
 import numpy as np
 from typing import Dict, List, Any, Optional, Union, Tuple
 from transformers import AutoModelForCausalLM, AutoTokenizer, pipeline
@@ -25,6 +27,10 @@ class LLMManager:
         self.embedder = None
         self.llama_model = None
         
+        # Les modèles ne sont pas réentrants : une seule génération à la fois,
+        # même lorsque plusieurs workers d'inférence partagent cette instance
+        self._generation_lock = threading.Lock()
+        
         # Charger les modèles
         self._load_embedding_model()
         if self.engine == "llama3":
@@ -76,14 +82,34 @@ class LLMManager:
             logger.error(f"Erreur lors du chargement du modèle d'embedding: {e}")
             raise
     
-    def generate_text(self, prompt: str, max_tokens: int = 256, temperature: float = 0.7) -> str:
-        """Génère du texte à partir d'un prompt."""
-        if self.engine == "llama3":
-            return self._generate_with_llama(prompt, max_tokens, temperature)
-        else:
-            return self._generate_with_huggingface(prompt, max_tokens, temperature)
+    def generate_text(self, prompt: str, max_tokens: int = 256, temperature: float = 0.7,
+                      stats: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Génère du texte à partir d'un prompt.
+        
+        Args:
+            prompt: Texte d'entrée
+            max_tokens: Nombre maximal de tokens à générer
+            temperature: Température d'échantillonnage
+            stats: Dictionnaire optionnel complété avec le nombre de tokens générés
+                (`completion_tokens`), l'attente du verrou du modèle (`llm_lock_wait`)
+                et la durée de la génération elle-même (`generation`), en secondes
+        """
+        wait_start = time.perf_counter()
+        with self._generation_lock:
+            generation_start = time.perf_counter()
+            try:
+                if self.engine == "llama3":
+                    return self._generate_with_llama(prompt, max_tokens, temperature, stats)
+                else:
+                    return self._generate_with_huggingface(prompt, max_tokens, temperature, stats)
+            finally:
+                if stats is not None:
+                    stats["llm_lock_wait"] = generation_start - wait_start
+                    stats["generation"] = time.perf_counter() - generation_start
     
-    def _generate_with_huggingface(self, prompt: str, max_tokens: int = 256, temperature: float = 0.7) -> str:
+    def _generate_with_huggingface(self, prompt: str, max_tokens: int = 256, temperature: float = 0.7,
+                                   stats: Optional[Dict[str, Any]] = None) -> str:
         """Génère du texte avec un modèle HuggingFace."""
         try:
             inputs = self.tokenizer(prompt, return_tensors="pt").to(self.model.device)
@@ -94,12 +120,15 @@ class LLMManager:
                 do_sample=temperature > 0,
                 pad_token_id=self.tokenizer.eos_token_id
             )
+            if stats is not None:
+                stats["completion_tokens"] = gen_tokens.shape[1] - inputs["input_ids"].shape[1]
             return self.tokenizer.decode(gen_tokens[0], skip_special_tokens=True)[len(prompt):]
         except Exception as e:
             logger.error(f"Erreur lors de la génération de texte avec HuggingFace: {e}")
             return f"Erreur: {str(e)}"
     
-    def _generate_with_llama(self, prompt: str, max_tokens: int = 256, temperature: float = 0.7) -> str:
+    def _generate_with_llama(self, prompt: str, max_tokens: int = 256, temperature: float = 0.7,
+                             stats: Optional[Dict[str, Any]] = None) -> str:
         """Génère du texte avec le modèle LLAMA."""
         try:
             # Format adapté pour les modèles Llama 3
@@ -112,6 +141,9 @@ class LLMManager:
                 stop=["<|end_of_turn|>", "<|end_of_text|>"]
             )
             
+            if stats is not None:
+                stats["completion_tokens"] = output.get("usage", {}).get("completion_tokens", 0)
+            
             # Extrait uniquement la réponse générée
             return output["choices"][0]["text"]
         except Exception as e:
@@ -162,17 +194,41 @@ class LLMManager:
         vec2 = np.array(vec2)
         return np.dot(vec1, vec2) / (np.linalg.norm(vec1) * np.linalg.norm(vec2))
     
-    def analyze_sensors(self, sensor_data: Dict[str, Any], emotional_state: Dict[str, Any]) -> Dict[str, Any]:
-        """Analyse les données des capteurs et l'état émotionnel pour produire une interprétation."""
+    def analyze_sensors(self, sensor_data: Dict[str, Any], emotional_state: Dict[str, Any],
+                        timings: Optional[Dict[str, float]] = None,
+                        trends: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Analyse les données des capteurs et l'état émotionnel pour produire une interprétation.
+        
+        Args:
+            sensor_data: Données des capteurs
+            emotional_state: État émotionnel actuel
+            timings: Dictionnaire optionnel complété avec la durée (secondes) des étapes
+                `prompt_build`, `llm_lock_wait`, `generation` et `json_parse`, et le
+                nombre de tokens générés (`completion_tokens`)
+            trends: Tendances des dernières lectures (résumé de la fenêtre glissante
+                des capteurs), ajoutées au prompt si elles sont fournies
+        """
+        if timings is None:
+            timings = {}
+        start = time.perf_counter()
+        
         # Convertir les données en texte pour le LLM
         sensor_text = json.dumps(sensor_data, indent=2)
         emotion_text = json.dumps(emotional_state, indent=2)
+        trends_text = ""
+        if trends and (trends.get("fields") or trends.get("events") or trends.get("anomalies")):
+            trends_text = (
+                f"\nTENDANCES RÉCENTES ({trends.get('samples', 0)} lectures sur {trends.get('window_seconds', 0)} s ; "
+                f"pente par seconde, événements = nombre de déclenchements, anomalies = valeurs "
+                f"inhabituelles pour ce robot):\n{json.dumps(trends)}\n"
+            )
         
         prompt = f"""En tant qu'intelligence artificielle du robot mignon, analyse ces données de capteurs et l'état émotionnel actuel.
         
 DONNÉES DES CAPTEURS:
 {sensor_text}
-
+{trends_text}
 ÉTAT ÉMOTIONNEL ACTUEL:
 {emotion_text}
 
@@ -193,8 +249,11 @@ Format attendu:
 }}
 """
         
-        # Générer l'analyse
-        response_text = self.generate_text(prompt, max_tokens=1024, temperature=0.3)
+        timings["prompt_build"] = time.perf_counter() - start
+        
+        # Générer l'analyse (durées de génération et d'attente du modèle mesurées par generate_text)
+        response_text = self.generate_text(prompt, max_tokens=1024, temperature=0.3, stats=timings)
+        parse_start = time.perf_counter()
         
         # Essayer de parser le JSON de la réponse
         try:
@@ -205,6 +264,7 @@ Format attendu:
             if json_start >= 0 and json_end > json_start:
                 json_text = response_text[json_start:json_end]
                 analysis = json.loads(json_text)
+                timings["json_parse"] = time.perf_counter() - parse_start
                 return analysis
             else:
                 logger.warning(f"Impossible de trouver un JSON valide dans la réponse: {response_text}")
@@ -229,9 +289,16 @@ Format attendu:
                 }
             }
 
-# Instancier le gestionnaire de modèles
-llm_manager = LLMManager()
+# Gestionnaire de modèles, instancié au premier appel de get_llm_manager() : importer
+# ce module ne charge pas le modèle
+llm_manager: Optional[LLMManager] = None
+_llm_manager_lock = threading.Lock()
 
 def get_llm_manager() -> LLMManager:
-    """Retourne l'instance du gestionnaire de modèles."""
+    """Retourne l'instance du gestionnaire de modèles (le modèle est chargé au premier appel)."""
+    global llm_manager
+    if llm_manager is None:
+        with _llm_manager_lock:
+            if llm_manager is None:
+                llm_manager = LLMManager()
     return llm_manager
@@ -0,0 +1,261 @@
+import os
+import re
+import json
+import time
+import threading
+import unicodedata
+import logging
+from typing import Dict, List, Any, Optional, Tuple, Pattern
+
+# Configuration du logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Fichier du vocabulaire des actions (rechargé à chaud lorsqu'il est modifié)
+ACTIONS_PATH = os.environ.get(
+    "ACTIONS_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "config", "actions.json")
+)
+
+# Intervalle minimal (secondes) entre deux vérifications de la date de modification du fichier
+ACTIONS_RELOAD_INTERVAL = float(os.environ.get("ACTIONS_RELOAD_INTERVAL", "1"))
+
+
+class ActionVocabularyError(ValueError):
+    """Levée lorsqu'une action du vocabulaire est invalide."""
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalise un texte pour la recherche des synonymes : minuscules, sans accents
+    (les autres caractères non ASCII sont ignorés), apostrophes typographiques
+    remplacées et espaces consécutifs réduits à un seul.
+    """
+    text = text.lower()
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text.replace("’", "'")).encode("ascii", "ignore").decode("ascii")
+    return " ".join(text.split())
+
+
+# Élément « suffixe quelconque » d'un synonyme (`avance*` reconnaît avancer, avance, avancez...)
+_WILDCARD = "*"
+
+
+class _TrieNode:
+    """Nœud de l'arbre des préfixes des synonymes."""
+
+    __slots__ = ("children", "group", "depth")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.group: Optional[str] = None
+        # Longueur de la plus longue suite depuis ce nœud
+        self.depth = 0
+
+
+def _trie_pattern(node: _TrieNode) -> str:
+    """
+    Traduit un arbre des préfixes en expression régulière : les préfixes communs
+    ne sont examinés qu'une fois, les suites les plus longues sont essayées en
+    premier, et un groupe nommé vide marque la fin de chaque synonyme.
+    """
+    branches = []
+    for token, child in sorted(node.children.items(), key=lambda item: item[1].depth, reverse=True):
+        element = r"\w*" if token == _WILDCARD else re.escape(token)
+        branches.append(element + _trie_pattern(child))
+    if node.group is not None:
+        branches.append(rf"(?!\w)(?P<{node.group}>)")
+    if len(branches) == 1:
+        return branches[0]
+    return "(?:" + "|".join(branches) + ")"
+
+
+class Action:
+    """Action du vocabulaire : synonymes et commandes émises."""
+
+    def __init__(self, definition: Dict[str, Any]):
+        try:
+            self.name = definition["name"]
+            synonyms = definition["synonyms"]
+        except KeyError as e:
+            raise ActionVocabularyError(f"Champ obligatoire manquant dans une action: {e}")
+        self.synonyms = [synonym for synonym in synonyms if normalize_text(synonym).strip("*")]
+        if not self.synonyms:
+            raise ActionVocabularyError(f"L'action {self.name} n'a aucun synonyme")
+
+        self.description = definition.get("description", "")
+        self.commands = definition.get("commands", [])
+
+
+def _copy_command(command: Dict[str, Any]) -> Dict[str, Any]:
+    """Copie une commande (deux niveaux, comme RobotCommand), plus rapide que deepcopy."""
+    return {key: dict(value) if isinstance(value, dict) else value for key, value in command.items()}
+
+
+class ActionMatcher:
+    """
+    Traduction des actions suggérées par le LLM en commandes du robot.
+
+    Le vocabulaire, déclaré dans un fichier JSON, associe à chaque action ses
+    synonymes français et anglais et les commandes paramétrées qu'elle émet. Il
+    est compilé en une seule expression régulière, construite à partir de l'arbre
+    des préfixes des synonymes (à la manière d'un automate d'Aho-Corasick : les
+    préfixes communs ne sont examinés qu'une fois, les synonymes les plus longs
+    l'emportent, « jouer un son » sur « jouer ») : chaque suggestion, normalisée
+    une fois (minuscules, sans accents), est parcourue en une passe. Le fichier est rechargé à chaud
+    lorsqu'il est modifié ; en cas d'erreur, le vocabulaire précédent est conservé.
+    """
+
+    def __init__(self, path: Optional[str] = ACTIONS_PATH, reload_interval: float = ACTIONS_RELOAD_INTERVAL,
+                 actions: Optional[List[Dict[str, Any]]] = None):
+        """
+        Initialise le traducteur d'actions.
+
+        Args:
+            path: Fichier JSON du vocabulaire (None pour n'utiliser que `actions`)
+            reload_interval: Intervalle minimal (secondes) entre deux vérifications du fichier
+            actions: Définitions d'actions à utiliser à la place du fichier
+        """
+        self.path = path if actions is None else None
+        self.reload_interval = reload_interval
+        self._lock = threading.Lock()
+        self._compiled: Tuple[Tuple[Action, ...], Optional[Pattern], Dict[str, Action]] = ((), None, {})
+        self._mtime: Optional[float] = None
+        self._checked_at = 0.0
+
+        if actions is not None:
+            self._compiled = self.compile(actions)
+        else:
+            self.reload()
+
+    @staticmethod
+    def compile(definitions: List[Dict[str, Any]]) -> Tuple[Tuple[Action, ...], Optional[Pattern], Dict[str, Action]]:
+        """
+        Compile des définitions d'actions en une expression régulière.
+
+        Returns:
+            Triplet (actions, expression régulière, action de chaque groupe nommé)
+
+        Raises:
+            ActionVocabularyError: si une action est invalide
+        """
+        actions = tuple(Action(definition) for definition in definitions)
+        names = [action.name for action in actions]
+        duplicates = {name for name in names if names.count(name) > 1}
+        if duplicates:
+            raise ActionVocabularyError(f"Actions en double: {', '.join(sorted(duplicates))}")
+
+        root = _TrieNode()
+        groups: Dict[str, Action] = {}
+        for action in actions:
+            for synonym in action.synonyms:
+                tokens = normalize_text(synonym)
+                path = [root]
+                for token in tokens:
+                    path.append(path[-1].children.setdefault(token, _TrieNode()))
+                leaf = path[-1]
+                if leaf.group is not None:
+                    # Le premier synonyme déclaré l'emporte
+                    logger.warning(f"Synonyme « {synonym} » déjà associé à l'action {groups[leaf.group].name}")
+                    continue
+                leaf.group = f"s{len(groups)}"
+                groups[leaf.group] = action
+                for depth, node in enumerate(reversed(path)):
+                    node.depth = max(node.depth, depth)
+
+        if not groups:
+            return actions, None, groups
+        pattern = re.compile(r"(?<!\w)" + _trie_pattern(root))
+        return actions, pattern, groups
+
+    def reload(self) -> bool:
+        """
+        Recharge le vocabulaire depuis le fichier.
+
+        Returns:
+            True si le vocabulaire a été rechargé, False sinon
+        """
+        if not self.path:
+            return False
+        try:
+            mtime = os.path.getmtime(self.path)
+            with open(self.path, "r", encoding="utf-8") as f:
+                compiled = self.compile(json.load(f).get("actions", []))
+        except FileNotFoundError:
+            logger.warning(f"Fichier du vocabulaire des actions introuvable: {self.path}")
+            return False
+        except Exception as e:
+            logger.error(f"Erreur lors du chargement du vocabulaire des actions ({self.path}): {e}")
+            return False
+
+        with self._lock:
+            self._compiled = compiled
+            self._mtime = mtime
+        logger.info(f"{len(compiled[0])} action(s) chargée(s) depuis {self.path}")
+        return True
+
+    def _maybe_reload(self):
+        """Recharge le fichier du vocabulaire s'il a été modifié."""
+        now = time.monotonic()
+        if not self.path or now - self._checked_at < self.reload_interval:
+            return
+        self._checked_at = now
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return
+        if mtime != self._mtime:
+            self.reload()
+
+    @property
+    def actions(self) -> Tuple[Action, ...]:
+        """Actions du vocabulaire."""
+        return self._compiled[0]
+
+    def match(self, text: str) -> List[str]:
+        """
+        Retourne les actions reconnues dans une suggestion, dans leur ordre
+        d'apparition (chaque action une seule fois).
+
+        Args:
+            text: Action suggérée par le LLM
+
+        Returns:
+            Noms des actions reconnues
+        """
+        return [action.name for action in self._match(text)]
+
+    def _match(self, text: str) -> List[Action]:
+        _, pattern, groups = self._compiled
+        if pattern is None or not isinstance(text, str):
+            return []
+        matched: List[Action] = []
+        for match in pattern.finditer(normalize_text(text)):
+            action = groups[match.lastgroup]
+            if action not in matched:
+                matched.append(action)
+        return matched
+
+    def commands(self, suggested_actions: List[str]) -> List[Dict[str, Any]]:
+        """
+        Traduit des actions suggérées en commandes.
+
+        Args:
+            suggested_actions: Actions suggérées par le LLM
+
+        Returns:
+            Commandes des actions reconnues, dans l'ordre des suggestions
+        """
+        self._maybe_reload()
+        commands: List[Dict[str, Any]] = []
+        for text in suggested_actions:
+            for action in self._match(text):
+                commands.extend(_copy_command(command) for command in action.commands)
+        return commands
+
+
+# Instancier le traducteur d'actions
+action_matcher = ActionMatcher()
+
+def get_action_matcher() -> ActionMatcher:
+    """Retourne l'instance du traducteur d'actions."""
+    return action_matcher
@@ -0,0 +1,203 @@
+import os
+import threading
+import logging
+from concurrent.futures import Future
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple
+
+from inference_pool import InferencePool, InferenceJob, InferenceQueueFull, get_inference_pool
+from metrics import record_analysis_schedule
+
+# Configuration du logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Nombre maximal de lectures conservées dans une analyse en attente (les plus anciennes
+# sont oubliées si le pool d'inférence reste longtemps occupé)
+ANALYSIS_PENDING_MAX_READINGS = int(os.environ.get("ANALYSIS_PENDING_MAX_READINGS", "600"))
+
+
+class PendingAnalysis:
+    """
+    Analyse en attente d'un robot : lectures reçues depuis la dernière analyse
+    soumise, fusionnées tant qu'une analyse est en cours.
+    """
+
+    def __init__(self, context):
+        self.context = context
+        self.history: List[Dict[str, Any]] = []
+        self.anomalies: List[Dict[str, Any]] = []
+        self.received_at: Optional[datetime] = None
+        self.job: Optional[InferenceJob] = None
+        # Résolu par la tâche d'inférence de l'analyse (succès ou erreur)
+        self.future: Future = Future()
+
+    def add(self, context, history: List[Dict[str, Any]], anomalies: List[Dict[str, Any]]):
+        """Ajoute des lectures chronologiques ; la plus récente sera analysée."""
+        self.context = context
+        self.history.extend(history)
+        if len(self.history) > ANALYSIS_PENDING_MAX_READINGS:
+            del self.history[:-ANALYSIS_PENDING_MAX_READINGS]
+        self.anomalies.extend(anomalies)
+        self.received_at = datetime.utcnow()
+
+
+class _RobotSlot:
+    """État de l'ordonnancement des analyses d'un robot."""
+
+    __slots__ = ("running", "pending", "latest", "latest_received_at")
+
+    def __init__(self):
+        self.running: Optional[PendingAnalysis] = None
+        self.pending: Optional[PendingAnalysis] = None
+        self.latest: Optional[InferenceJob] = None
+        self.latest_received_at: Optional[datetime] = None
+
+
+class AnalysisScheduler:
+    """
+    Ordonnancement des analyses LLM des capteurs, robot par robot.
+
+    Chaque robot a au plus une analyse en cours et une analyse en attente. Les
+    lectures reçues pendant une analyse rejoignent l'analyse en attente, qui ne
+    porte que sur la plus récente (le filtre de changement significatif et les
+    anomalies tiennent compte de toutes) : on n'analyse jamais un état dépassé,
+    et les requêtes n'attendent pas chacune leur propre génération. L'analyse en
+    attente est soumise au pool d'inférence dès la fin de l'analyse en cours ; si
+    le pool est plein, elle l'est dès qu'une place se libère.
+    """
+
+    def __init__(self, pool: Optional[InferencePool] = None):
+        """
+        Initialise l'ordonnanceur.
+
+        Args:
+            pool: Pool d'inférence exécutant les analyses (par défaut, celui du serveur)
+        """
+        self.pool = pool or get_inference_pool()
+        # Réentrant : le rappel de fin d'une tâche déjà terminée s'exécute dans submit
+        self._lock = threading.RLock()
+        self._slots: Dict[str, _RobotSlot] = {}
+        # Robots dont l'analyse en attente n'a pas pu être soumise (pool plein)
+        self._waiting: Dict[str, None] = {}
+
+    def submit(self, context, history: List[Dict[str, Any]],
+               anomalies: Optional[List[Dict[str, Any]]] = None) -> Tuple[str, PendingAnalysis]:
+        """
+        Demande l'analyse de lectures déjà enregistrées (voir `ContextManager.record_sensor_readings`).
+
+        Args:
+            context: Gestionnaire de contexte du robot
+            history: Lectures chronologiques (la dernière est analysée)
+            anomalies: Anomalies détectées sur ces lectures
+
+        Returns:
+            Couple (décision : `started` si l'analyse est soumise au pool, `queued`
+            si elle attend la fin de l'analyse en cours ou une place dans le pool,
+            `merged` si elle rejoint une analyse déjà en attente ; analyse qui
+            couvrira ces lectures)
+        """
+        robot_id = context.robot_id
+        with self._lock:
+            slot = self._slots.setdefault(robot_id, _RobotSlot())
+            if slot.pending is None:
+                slot.pending = PendingAnalysis(context)
+                decision = "queued"
+            else:
+                decision = "merged"
+            pending = slot.pending
+            pending.add(context, history, anomalies or [])
+
+            if slot.running is None and self._dispatch(robot_id, slot):
+                decision = "started"
+        record_analysis_schedule(decision)
+        return decision, pending
+
+    def _dispatch(self, robot_id: str, slot: _RobotSlot) -> bool:
+        """Soumet l'analyse en attente d'un robot au pool (verrou détenu)."""
+        pending = slot.pending
+        try:
+            job = self.pool.submit(
+                pending.context.analyze_sensor_readings, pending.history, pending.anomalies, robot_id=robot_id
+            )
+        except InferenceQueueFull:
+            self._waiting[robot_id] = None
+            return False
+
+        self._waiting.pop(robot_id, None)
+        slot.pending = None
+        slot.running = pending
+        pending.job = job
+        job.future.add_done_callback(lambda _future: self._on_done(robot_id, pending))
+        return True
+
+    def _on_done(self, robot_id: str, analysis: PendingAnalysis):
+        """Enregistre le résultat d'une analyse et soumet les analyses en attente."""
+        job = analysis.job
+        with self._lock:
+            slot = self._slots[robot_id]
+            slot.running = None
+            if job.status == "done" and job.result.get("success"):
+                slot.latest = job
+                slot.latest_received_at = analysis.received_at
+            if slot.pending is not None:
+                self._dispatch(robot_id, slot)
+
+            # Une place s'est libérée dans le pool : relancer les robots en attente
+            for waiting in list(self._waiting):
+                other = self._slots[waiting]
+                if other.running is None and other.pending is not None:
+                    if not self._dispatch(waiting, other):
+                        break
+                else:
+                    self._waiting.pop(waiting, None)
+
+        analysis.future.set_result(job)
+
+    def latest(self, robot_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Retourne la dernière analyse terminée d'un robot et sa fraîcheur.
+
+        Returns:
+            Dictionnaire avec le résultat (`result`), la date de fin de l'analyse
+            (`analyzed_at`), la date de réception de la lecture analysée
+            (`reading_received_at`) et l'âge de l'analyse en secondes
+            (`analysis_age`), ou None si aucune analyse n'est terminée
+        """
+        with self._lock:
+            slot = self._slots.get(robot_id)
+            if slot is None or slot.latest is None:
+                return None
+            job, received_at = slot.latest, slot.latest_received_at
+        return {
+            "result": job.result,
+            "analyzed_at": job.finished_at.isoformat(),
+            "reading_received_at": received_at.isoformat() if received_at else None,
+            "analysis_age": round((datetime.utcnow() - job.finished_at).total_seconds(), 3)
+        }
+
+    def state(self, robot_id: str) -> Dict[str, bool]:
+        """Indique si une analyse est en cours ou en attente pour un robot."""
+        with self._lock:
+            slot = self._slots.get(robot_id)
+            return {
+                "running": slot is not None and slot.running is not None,
+                "pending": slot is not None and slot.pending is not None
+            }
+
+    def stats(self) -> Dict[str, int]:
+        """Nombre de robots ayant une analyse en cours, en attente, ou bloquée par le pool plein."""
+        with self._lock:
+            return {
+                "running": sum(1 for slot in self._slots.values() if slot.running is not None),
+                "pending": sum(1 for slot in self._slots.values() if slot.pending is not None),
+                "waiting_for_pool": len(self._waiting)
+            }
+
+
+# Instancier l'ordonnanceur des analyses
+analysis_scheduler = AnalysisScheduler()
+
+def get_analysis_scheduler() -> AnalysisScheduler:
+    """Retourne l'instance de l'ordonnanceur des analyses."""
+    return analysis_scheduler
@@ -0,0 +1,190 @@
+import os
+import json
+import math
+import copy
+import logging
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+
+# Configuration du logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Fichier JSON optionnel surchargeant la configuration par défaut du détecteur
+ANOMALY_CONFIG = os.environ.get("ANOMALY_CONFIG", "")
+
+# Configuration par défaut du détecteur d'anomalies.
+# Les chemins désignent des champs de SensorDataPayload ; `min_std` est l'écart-type
+# minimal retenu pour le calcul du z-score (il évite qu'un capteur parfaitement
+# stable ne signale la moindre variation), et `difference` définit un champ dérivé
+# comme la différence de deux champs.
+DEFAULT_ANOMALY_CONFIG: Dict[str, Any] = {
+    "enabled": True,
+    # Poids de la nouvelle lecture dans la moyenne et la variance exponentielles
+    "alpha": float(os.environ.get("ANOMALY_ALPHA", "0.05")),
+    # Z-score au-delà duquel une lecture est anormale
+    "threshold": float(os.environ.get("ANOMALY_Z_THRESHOLD", "4")),
+    # Nombre de lectures nécessaires avant de signaler des anomalies
+    "warmup": int(os.environ.get("ANOMALY_WARMUP", "20")),
+    "fields": {
+        "sound.big_sound": {"min_std": 100},
+        "vision.light_level": {"min_std": 100},
+        "temperature.dht11": {"min_std": 0.3},
+        "temperature.ds18b20": {"min_std": 0.3},
+        "temperature.humidity": {"min_std": 1.5},
+        # Écart entre les deux thermomètres : dérive ou défaillance de l'un d'eux
+        "temperature.drift": {"min_std": 0.3, "difference": ["temperature.dht11", "temperature.ds18b20"]},
+        "magnetic.hall": {"min_std": 20},
+        "water_level": {"min_std": 50}
+    }
+}
+
+
+def load_anomaly_config(path: str = ANOMALY_CONFIG) -> Dict[str, Any]:
+    """
+    Charge la configuration du détecteur : la configuration par défaut, surchargée
+    par le fichier JSON `path` s'il est fourni.
+
+    Args:
+        path: Chemin du fichier de configuration (optionnel)
+
+    Returns:
+        Configuration du détecteur
+    """
+    config = copy.deepcopy(DEFAULT_ANOMALY_CONFIG)
+    if not path:
+        return config
+
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            overrides = json.load(f)
+        for key, value in overrides.items():
+            if isinstance(value, dict) and isinstance(config.get(key), dict):
+                config[key].update(value)
+            else:
+                config[key] = value
+        logger.info(f"Configuration du détecteur d'anomalies chargée depuis {path}")
+    except Exception as e:
+        logger.error(f"Erreur lors du chargement de la configuration du détecteur ({path}): {e}")
+    return config
+
+
+def _get_field(sensor_data: Dict[str, Any], path: Tuple[str, ...]) -> float:
+    """Retourne la valeur numérique d'un champ (NaN s'il est absent ou invalide)."""
+    value = sensor_data
+    for part in path:
+        if not isinstance(value, dict):
+            return math.nan
+        value = value.get(part)
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+class AnomalyDetector:
+    """
+    Détecteur d'anomalies des données des capteurs d'un robot.
+
+    Pour chaque champ surveillé, une moyenne et une variance exponentielles (EWMA)
+    sont mises à jour à chaque lecture, en temps et en mémoire constants. Une
+    lecture dont le z-score dépasse le seuil est signalée, une seule fois tant que
+    le champ reste anormal. La lecture anormale est intégrée aux statistiques : un
+    changement durable de niveau cesse d'être signalé au bout de quelques lectures.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = config if config is not None else anomaly_config
+        fields = self.config.get("fields", {})
+        self.fields = tuple(fields)
+        self.alpha = float(self.config.get("alpha", 0.05))
+        self.threshold = float(self.config.get("threshold", 4))
+        self.warmup = int(self.config.get("warmup", 20))
+        self.enabled = bool(self.config.get("enabled", True))
+
+        self._sources = []
+        for name, options in fields.items():
+            difference = options.get("difference")
+            if difference:
+                self._sources.append(tuple(tuple(path.split(".")) for path in difference))
+            else:
+                self._sources.append((tuple(name.split(".")),))
+        self._min_std = np.array([float(fields[name].get("min_std", 0)) for name in self.fields])
+
+        count = len(self.fields)
+        self._mean = np.zeros(count)
+        self._var = np.zeros(count)
+        self._n = np.zeros(count)
+        self._active = np.zeros(count, dtype=bool)
+
+    def _extract(self, sensor_data: Dict[str, Any]) -> np.ndarray:
+        """Extrait les valeurs des champs surveillés (dérivés compris)."""
+        values = []
+        for source in self._sources:
+            if len(source) == 2:
+                values.append(_get_field(sensor_data, source[0]) - _get_field(sensor_data, source[1]))
+            else:
+                values.append(_get_field(sensor_data, source[0]))
+        return np.array(values)
+
+    def update(self, sensor_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Intègre une lecture et retourne les anomalies qu'elle déclenche.
+
+        Args:
+            sensor_data: Données des capteurs
+
+        Returns:
+            Liste des anomalies (champ, valeur, moyenne, écart-type et z-score)
+        """
+        if not self.enabled or not self.fields:
+            return []
+
+        values = self._extract(sensor_data)
+        valid = ~np.isnan(values)
+        x = np.where(valid, values, self._mean)
+
+        # Z-score par rapport aux statistiques précédant la lecture
+        delta = x - self._mean
+        std = np.maximum(np.sqrt(self._var), self._min_std)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            z = np.where(std > 0, np.abs(delta) / std, 0.0)
+        ready = valid & (self._n >= self.warmup)
+        anomalous = ready & (z > self.threshold)
+        new = anomalous & ~self._active
+        self._active = np.where(valid, anomalous, self._active)
+
+        # Mise à jour des statistiques (la première lecture initialise la moyenne)
+        previous_mean = self._mean
+        first = valid & (self._n == 0)
+        alpha = np.where(first, 1.0, self.alpha) * valid
+        self._mean = self._mean + alpha * delta
+        self._var = np.where(first, 0.0, (1 - alpha) * (self._var + alpha * delta * delta))
+        self._n = self._n + valid
+
+        anomalies = []
+        for index in np.flatnonzero(new):
+            anomalies.append({
+                "field": self.fields[index],
+                "value": float(values[index]),
+                "mean": float(previous_mean[index]),
+                "std": float(std[index]),
+                "z": round(float(z[index]), 2)
+            })
+        return anomalies
+
+    def reset(self):
+        """Oublie les statistiques accumulées."""
+        self._mean[:] = 0
+        self._var[:] = 0
+        self._n[:] = 0
+        self._active[:] = False
+
+
+# Configuration du détecteur, partagée par les robots
+anomaly_config = load_anomaly_config()
+
+def get_anomaly_config() -> Dict[str, Any]:
+    """Retourne la configuration du détecteur d'anomalies."""
+    return anomaly_config
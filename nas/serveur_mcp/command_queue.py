@@ -0,0 +1,156 @@
+import os
+import time
+import logging
+from typing import Dict, List, Any, Optional, Tuple
+
+# Configuration du logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Durée de validité (secondes) des commandes en attente, par type (0 : pas d'expiration)
+COMMAND_TTL = {
+    "movement": float(os.environ.get("COMMAND_TTL_MOVEMENT", "5")),
+    "sound": float(os.environ.get("COMMAND_TTL_SOUND", "5")),
+    "emotion": float(os.environ.get("COMMAND_TTL_EMOTION", "30"))
+}
+
+# Priorités des commandes (la plus petite est délivrée en premier) : l'arrêt, commande
+# de sécurité, passe avant tout le reste, puis l'émotion (affichage immédiat), les
+# mouvements et les sons
+PRIORITY_SAFETY = 0
+COMMAND_PRIORITIES = {
+    "emotion": 1,
+    "movement": 2,
+    "sound": 3
+}
+DEFAULT_PRIORITY = 4
+
+# Champ interne portant la date de mise en file (retiré avant la livraison)
+QUEUED_AT_FIELD = "_queued_at"
+
+
+def is_stop(command: Dict[str, Any]) -> bool:
+    """Indique si une commande est un arrêt des mouvements."""
+    if command.get("command_type") != "movement":
+        return False
+    movement = command.get("movement") or {}
+    return movement.get("direction") == "stop"
+
+
+def command_priority(command: Dict[str, Any]) -> int:
+    """Retourne la priorité d'une commande (0 pour l'arrêt)."""
+    if is_stop(command):
+        return PRIORITY_SAFETY
+    return COMMAND_PRIORITIES.get(command.get("command_type"), DEFAULT_PRIORITY)
+
+
+class CommandQueuePolicy:
+    """
+    Règles de la file des commandes en attente d'un robot.
+
+    Les commandes sont horodatées à leur mise en file ; lorsqu'elles sont retirées
+    de la file (`drain_commands` du stockage, atomique quel que soit le stockage),
+    le lot est réduit à ce que le robot doit encore exécuter :
+
+    1. Les commandes plus anciennes que la durée de validité de leur type sont
+       abandonnées (un arrêt n'expire jamais).
+    2. Un arrêt annule les mouvements mis en file avant lui (et les arrêts
+       précédents) ; une émotion remplace les émotions précédentes ; un mouvement
+       ou un son identique au précédent du même type n'est délivré qu'une fois.
+    3. Les commandes restantes sont triées par priorité (arrêt, émotion,
+       mouvements, sons), l'ordre de mise en file étant conservé à priorité égale.
+    """
+
+    def __init__(self, ttl: Optional[Dict[str, float]] = None):
+        """
+        Initialise les règles de la file.
+
+        Args:
+            ttl: Durée de validité (secondes) par type de commande (par défaut
+                `COMMAND_TTL`)
+        """
+        self.ttl = COMMAND_TTL if ttl is None else ttl
+
+    def stamp(self, commands: List[Dict[str, Any]], now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Horodate des commandes avant leur mise en file.
+
+        Les commandes déjà horodatées conservent leur date d'origine.
+
+        Args:
+            commands: Commandes à mettre en file
+            now: Date de mise en file (secondes depuis l'époque ; par défaut, maintenant)
+
+        Returns:
+            Copies horodatées des commandes
+        """
+        now = time.time() if now is None else now
+        return [command if QUEUED_AT_FIELD in command else {**command, QUEUED_AT_FIELD: now}
+                for command in commands]
+
+    def _expired(self, command: Dict[str, Any], now: float) -> bool:
+        """Indique si une commande a dépassé sa durée de validité."""
+        if is_stop(command):
+            return False
+        ttl = self.ttl.get(command.get("command_type"), 0)
+        queued_at = command.get(QUEUED_AT_FIELD)
+        return bool(ttl) and queued_at is not None and now - queued_at > ttl
+
+    def prepare(self, commands: List[Dict[str, Any]],
+                now: Optional[float] = None) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+        """
+        Réduit un lot de commandes retiré de la file à celles à délivrer.
+
+        Args:
+            commands: Commandes dans l'ordre de leur mise en file
+            now: Date de livraison (secondes depuis l'époque ; par défaut, maintenant)
+
+        Returns:
+            Couple (commandes à délivrer, sans le champ interne d'horodatage ;
+            nombre de commandes abandonnées par raison : `expired` ou `superseded`)
+        """
+        now = time.time() if now is None else now
+        dropped = {"expired": 0, "superseded": 0}
+        kept: List[Optional[Dict[str, Any]]] = []
+        last_of_type: Dict[str, int] = {}
+
+        for command in commands:
+            if self._expired(command, now):
+                dropped["expired"] += 1
+                continue
+
+            command_type = command.get("command_type")
+            command = {key: value for key, value in command.items() if key != QUEUED_AT_FIELD}
+            if is_stop(command):
+                # L'arrêt annule les mouvements (et arrêts) qui le précèdent
+                for index, previous in enumerate(kept):
+                    if previous is not None and previous.get("command_type") == "movement":
+                        kept[index] = None
+                        dropped["superseded"] += 1
+            elif command_type == "emotion":
+                # Seule la dernière émotion compte
+                previous = last_of_type.get("emotion")
+                if previous is not None and kept[previous] is not None:
+                    kept[previous] = None
+                    dropped["superseded"] += 1
+            elif command_type in ("movement", "sound"):
+                # Répétition de la même commande
+                previous = last_of_type.get(command_type)
+                if previous is not None and kept[previous] == command:
+                    dropped["superseded"] += 1
+                    continue
+
+            last_of_type[command_type] = len(kept)
+            kept.append(command)
+
+        delivered = [command for command in kept if command is not None]
+        delivered.sort(key=command_priority)
+        return delivered, dropped
+
+
+# Instancier les règles de la file des commandes
+command_queue_policy = CommandQueuePolicy()
+
+def get_command_queue_policy() -> CommandQueuePolicy:
+    """Retourne les règles de la file des commandes."""
+    return command_queue_policy
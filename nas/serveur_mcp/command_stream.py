@@ -0,0 +1,167 @@
+import os
+import asyncio
+import threading
+import logging
+from typing import Dict, Set, Optional, Callable
+
+# Configuration du logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Intervalle (secondes) de vérification des commandes mises en file par d'autres workers
+COMMAND_POLL_INTERVAL = float(os.environ.get("COMMAND_POLL_INTERVAL", "0.5"))
+
+
+class CommandNotifier:
+    """
+    Files d'attente par robot des clients en attente de commandes.
+
+    Les clients (long-poll, SSE, WebSocket) s'enregistrent dans la file de leur
+    robot via `wait`. Dès qu'une commande est mise en file pour ce robot,
+    `notify` réveille tous les clients en attente. `notify` peut être appelé
+    depuis n'importe quel thread (par exemple un worker du pool d'inférence) :
+    le réveil est alors planifié sur la boucle d'événements.
+
+    Avec plusieurs workers, une commande peut être mise en file par un autre
+    processus : `notify` n'est alors pas appelé localement. Si une sonde est
+    définie (`set_probe`), les clients en attente interrogent le stockage
+    partagé toutes les `poll_interval` secondes. La sonde est exécutée hors de
+    la boucle d'événements, et une seule interrogation est en cours à la fois
+    par robot, quel que soit le nombre de clients en attente.
+    """
+
+    def __init__(self, poll_interval: float = COMMAND_POLL_INTERVAL):
+        self.poll_interval = poll_interval
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._waiters: Dict[str, Set[asyncio.Future]] = {}
+        self._probe: Optional[Callable[[str], bool]] = None
+        self._probes: Dict[str, asyncio.Future] = {}
+
+    def attach(self, loop: asyncio.AbstractEventLoop):
+        """Associe le notificateur à la boucle d'événements du serveur."""
+        self._loop = loop
+        self._loop_thread = threading.get_ident()
+
+    def set_probe(self, probe: Optional[Callable[[str], bool]]):
+        """
+        Définit la fonction indiquant si des commandes sont en attente pour un robot
+        dans un stockage partagé entre processus.
+
+        Args:
+            probe: Fonction recevant l'identifiant du robot (None pour désactiver)
+        """
+        self._probe = probe
+
+    def notify(self, robot_id: str):
+        """Signale que des commandes sont disponibles pour un robot."""
+        if self._loop is None or self._loop.is_closed():
+            return
+        if threading.get_ident() == self._loop_thread:
+            self._wake(robot_id)
+        else:
+            self._loop.call_soon_threadsafe(self._wake, robot_id)
+
+    def _wake(self, robot_id: str):
+        """Réveille les clients en attente pour un robot (dans la boucle d'événements)."""
+        for waiter in self._waiters.pop(robot_id, ()):
+            if not waiter.done():
+                waiter.set_result(True)
+
+    async def wait(self, robot_id: str, timeout: Optional[float]) -> bool:
+        """
+        Attend qu'une commande soit mise en file pour un robot.
+
+        L'enregistrement dans la file est fait avant la première suspension de
+        la coroutine : une notification émise après une vérification des
+        commandes en attente ne peut donc pas être manquée.
+
+        Args:
+            robot_id: Identifiant du robot
+            timeout: Délai maximal d'attente en secondes
+
+        Returns:
+            True si une notification a été reçue (ou si la sonde a trouvé des
+            commandes), False si le délai a expiré
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is None:
+            self.attach(loop)
+
+        waiter = loop.create_future()
+        self._waiters.setdefault(robot_id, set()).add(waiter)
+        try:
+            if self._probe is None:
+                await asyncio.wait_for(waiter, timeout)
+                return True
+            return await self._wait_polling(robot_id, waiter, timeout)
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            waiters = self._waiters.get(robot_id)
+            if waiters is not None:
+                waiters.discard(waiter)
+                if not waiters:
+                    del self._waiters[robot_id]
+
+    async def _wait_polling(self, robot_id: str, waiter: asyncio.Future, timeout: Optional[float]) -> bool:
+        """Attend une notification locale en interrogeant la sonde à intervalles réguliers."""
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        while True:
+            interval = self.poll_interval
+            if deadline is not None:
+                interval = min(interval, deadline - loop.time())
+                if interval <= 0:
+                    return False
+            try:
+                await asyncio.wait_for(asyncio.shield(waiter), interval)
+                return True
+            except asyncio.TimeoutError:
+                try:
+                    if await self._run_probe(robot_id):
+                        return True
+                except Exception as e:
+                    logger.error(f"Erreur lors de la vérification des commandes partagées: {e}")
+    
+    async def _run_probe(self, robot_id: str) -> bool:
+        """
+        Interroge la sonde dans un thread, sans bloquer la boucle d'événements.
+        
+        Les clients en attente d'un même robot partagent l'interrogation en cours.
+        
+        Args:
+            robot_id: Identifiant du robot
+            
+        Returns:
+            True si des commandes sont en attente dans le stockage partagé
+        """
+        probe = self._probes.get(robot_id)
+        if probe is None:
+            probe = asyncio.ensure_future(asyncio.to_thread(self._probe, robot_id))
+            self._probes[robot_id] = probe
+            probe.add_done_callback(lambda done: self._probe_done(robot_id, done))
+        # Un client annulé ne doit pas annuler l'interrogation des autres clients
+        return await asyncio.shield(probe)
+    
+    def _probe_done(self, robot_id: str, probe: asyncio.Future):
+        """Retire une interrogation terminée (dans la boucle d'événements)."""
+        if self._probes.get(robot_id) is probe:
+            del self._probes[robot_id]
+        if not probe.cancelled():
+            # Erreur déjà journalisée par les clients en attente, le cas échéant
+            probe.exception()
+
+    def waiting(self, robot_id: Optional[str] = None) -> int:
+        """Nombre de clients en attente (pour un robot ou pour tous)."""
+        if robot_id is not None:
+            return len(self._waiters.get(robot_id, ()))
+        return sum(len(waiters) for waiters in self._waiters.values())
+
+
+# Instancier le notificateur de commandes
+command_notifier = CommandNotifier()
+
+def get_command_notifier() -> CommandNotifier:
+    """Retourne l'instance du notificateur de commandes."""
+    return command_notifier
@@ -1,20 +1,187 @@
 import sys
 import os
 import json
+import copy
+import time
+import zlib
+import asyncio
+import threading
+from collections import deque
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Optional, Tuple, Callable
 import logging
 
 # Ajouter les chemins pour l'importation des modules
 sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
 
-from memoire.db_manager import db_manager
+from memoire.db_manager import db_manager, get_async_db_manager
 from llm.model_manager import get_llm_manager
+from write_behind import get_write_behind
+from state_backend import StateBackend, get_state_backend
+from metrics import (stage_timer, observe_llm_timings, record_analysis_decision, record_reflexes,
+                     record_anomalies, record_dropped_commands)
+from significance import SignificanceFilter
+from sensor_window import SensorWindow
+from anomaly_detector import AnomalyDetector
+from reflex_engine import get_reflex_engine
+from action_matcher import get_action_matcher
+from context_snapshot import ContextSnapshotStore, get_context_snapshot_store
+from command_queue import get_command_queue_policy
+from emotion_model import get_emotion_model
+from reporting_hints import ActivityMeter
 
 # Configuration du logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Identifiant du robot par défaut (compatibilité avec un déploiement mono-robot)
+DEFAULT_ROBOT_ID = os.environ.get("ROBOT_ID", "MignonBot1")
+
+# Paramètres du registre de contextes
+CONTEXT_IDLE_TTL = float(os.environ.get("CONTEXT_IDLE_TTL", "900"))
+CONTEXT_REGISTRY_SHARDS = int(os.environ.get("CONTEXT_REGISTRY_SHARDS", "16"))
+CONTEXT_EVICTION_INTERVAL = float(os.environ.get("CONTEXT_EVICTION_INTERVAL", "60"))
+
+# Nombre d'événements récents conservés dans le contexte
+MAX_RECENT_EVENTS = 5
+
+# Écart d'intensité à partir duquel une nouvelle commande d'émotion est envoyée au robot
+EMOTION_COMMAND_DELTA = 20
+
+
+def read_db_context(db, robot_id: str) -> Dict[str, Any]:
+    """
+    Lit le contexte d'un robot dans la base de données.
+    
+    Args:
+        db: Gestionnaire de base de données
+        robot_id: Identifiant du robot
+        
+    Returns:
+        Champs du contexte trouvés en base de données
+    """
+    return _db_context(
+        db.get_recent_sensor_data(robot_id, limit=1),
+        db.get_current_emotion(robot_id),
+        db.get_recent_events(robot_id, limit=MAX_RECENT_EVENTS),
+        db.get_recent_interactions(robot_id, limit=1)
+    )
+
+
+async def read_db_context_async(db, robot_id: str) -> Dict[str, Any]:
+    """
+    Lit le contexte d'un robot dans la base de données, sans bloquer la boucle
+    d'événements (voir `read_db_context`).
+    
+    Args:
+        db: Gestionnaire asynchrone de base de données
+        robot_id: Identifiant du robot
+        
+    Returns:
+        Champs du contexte trouvés en base de données
+    """
+    return _db_context(
+        await db.get_recent_sensor_data(robot_id, limit=1),
+        await db.get_current_emotion(robot_id),
+        await db.get_recent_events(robot_id, limit=MAX_RECENT_EVENTS),
+        await db.get_recent_interactions(robot_id, limit=1)
+    )
+
+
+def _db_context(recent_sensor_data, current_emotion, recent_events, recent_interactions) -> Dict[str, Any]:
+    """Convertit les lignes lues en base de données en champs du contexte."""
+    loaded = {}
+    
+    # Dernières données des capteurs
+    if recent_sensor_data:
+        loaded["sensors"] = recent_sensor_data[0].data
+    
+    # État émotionnel actuel
+    if current_emotion:
+        loaded["emotion"] = {
+            "type": current_emotion.emotion_type,
+            "intensity": current_emotion.intensity,
+            "last_change": current_emotion.timestamp.isoformat()
+        }
+    
+    # Événements récents
+    loaded["recent_events"] = [
+        {
+            "timestamp": event.timestamp.isoformat(),
+            "type": event.event_type,
+            "description": event.description,
+            "data": event.data
+        }
+        for event in recent_events
+    ]
+    
+    # Dernière interaction
+    if recent_interactions:
+        loaded["last_interaction"] = {
+            "timestamp": recent_interactions[0].timestamp.isoformat(),
+            "type": recent_interactions[0].interaction_type,
+            "content": recent_interactions[0].content
+        }
+    
+    return loaded
+
+
+def has_robot_data(loaded: Dict[str, Any]) -> bool:
+    """
+    Indique si des champs lus en base de données (voir `read_db_context`) ou un
+    instantané témoignent d'un robot ayant déjà envoyé des données.
+    
+    Args:
+        loaded: Champs du contexte
+        
+    Returns:
+        True si le contexte contient des lectures, une émotion, des événements ou une interaction
+    """
+    return any(loaded.get(field) for field in ("sensors", "emotion", "recent_events", "last_interaction"))
+
+
+def merge_db_context(current: Dict[str, Any], loaded: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Compare un contexte restauré depuis un instantané avec celui lu en base de
+    données et retourne les champs à mettre à jour : l'émotion et la dernière
+    interaction les plus récentes, et les événements récents des deux sources.
+    
+    Args:
+        current: Contexte restauré
+        loaded: Contexte lu par `read_db_context`
+        
+    Returns:
+        Champs du contexte à mettre à jour
+    """
+    updates = {}
+    if loaded.get("sensors") and not current.get("sensors"):
+        updates["sensors"] = loaded["sensors"]
+    
+    # Les horodatages sont au format ISO 8601 (UTC) : l'ordre lexicographique suffit
+    for field, timestamp in (("emotion", "last_change"), ("last_interaction", "timestamp")):
+        new = loaded.get(field)
+        old = current.get(field)
+        if new and (not old or str(new.get(timestamp, "")) > str(old.get(timestamp, ""))):
+            updates[field] = new
+    
+    events = {}
+    for event in list(current.get("recent_events") or []) + list(loaded.get("recent_events") or []):
+        events.setdefault((event.get("timestamp"), event.get("type"), event.get("description")), event)
+    merged = sorted(events.values(), key=lambda event: event.get("timestamp") or "")[-MAX_RECENT_EVENTS:]
+    if merged != list(current.get("recent_events") or []):
+        updates["recent_events"] = merged
+    return updates
+
+
+def preload_llm():
+    """Charge le LLM, afin que la première analyse n'attende pas son chargement."""
+    try:
+        get_llm_manager()
+        logger.info("LLM chargé")
+    except Exception as e:
+        logger.error(f"Erreur lors du chargement du LLM: {e}")
+
+
 class ContextManager:
     """
     Gestionnaire de contexte pour le robot mignon.
@@ -27,110 +194,362 @@ class ContextManager:
     5. Intégrer le LLM pour l'analyse et la prise de décision
     """
     
-    def __init__(self, robot_id: str = "MignonBot1"):
-        """Initialise le gestionnaire de contexte."""
+    def __init__(self, robot_id: str = "MignonBot1", snapshot: Optional[Dict[str, Any]] = None,
+                 on_commands: Optional[Callable[[str], None]] = None,
+                 backend: Optional[StateBackend] = None,
+                 db_context: Optional[Dict[str, Any]] = None):
+        """
+        Initialise le gestionnaire de contexte.
+        
+        Args:
+            robot_id: Identifiant du robot
+            snapshot: Instantané produit par `snapshot()` ; s'il est fourni, le contexte
+                est restauré depuis celui-ci au lieu d'être rechargé depuis la base de données
+            on_commands: Fonction appelée avec l'identifiant du robot lorsque des
+                commandes sont mises en file
+            backend: Stockage de l'état et des commandes en attente (par défaut celui
+                configuré par `CONTEXT_STATE_BACKEND`)
+            db_context: Champs du contexte déjà lus en base de données (voir
+                `ContextRegistry.preload`) ; à défaut, ils sont lus par le moteur synchrone
+        """
         self.robot_id = robot_id
+        self.backend = backend or get_state_backend()
         self.db = db_manager
-        self.llm = get_llm_manager()
+        # Les écritures passent par le tampon d'écriture différée (le chemin de la
+        # requête ne touche que la mémoire)
+        self.writer = get_write_behind()
+        self.on_commands = on_commands
+        # Priorités, durée de validité et fusion des commandes en attente
+        self.command_policy = get_command_queue_policy()
+        
+        # Verrou protégeant le contexte de ce robot (les autres robots ne sont pas bloqués)
+        self.lock = threading.RLock()
+        # Écritures du stockage d'état différées jusqu'à la libération du verrou (voir
+        # `_publish`) : un stockage lent ne bloque jamais les lecteurs du contexte
+        self._pending_writes: List[Tuple[Callable[..., Any], tuple]] = []
+        self._pending_lock = threading.Lock()
+        self._publish_lock = threading.Lock()
+        self.last_access = time.monotonic()
+        
+        # Filtre de changement significatif et dernière analyse du LLM
+        self.significance = SignificanceFilter()
+        self.last_analysis: Optional[Dict[str, Any]] = None
+        
+        # Fenêtre glissante des dernières lectures (tendances, comptage d'événements)
+        # et détecteur d'anomalies
+        self.window = SensorWindow()
+        self.anomalies = AnomalyDetector()
+        
+        # Activité du robot (part des lectures qui changent), pour la cadence d'envoi recommandée
+        self.activity = ActivityMeter()
+        
+        # Moteur de réflexes et date du dernier déclenchement de chaque règle
+        self.reflexes = get_reflex_engine()
+        self._reflex_fired: Dict[str, float] = {}
+        
+        # Traduction des actions suggérées par le LLM en commandes
+        self.actions = get_action_matcher()
+        
+        # Dynamique des émotions (décroissance et mélange des stimuli)
+        self.emotions = get_emotion_model()
         
         # Contexte actuel
         self.current_context = {
             "sensors": {},
+            # État émotionnel enregistré (voir `EmotionModel`) ; l'émotion exprimée
+            # est calculée à la lecture par `emotion()`
             "emotion": {
                 "type": "neutre",
                 "intensity": 50,
                 "last_change": datetime.utcnow().isoformat()
             },
             "last_interaction": None,
-            "recent_events": [],
-            "pending_commands": []
+            # Derniers événements (les plus anciens sont évincés à l'ajout)
+            "recent_events": deque(maxlen=MAX_RECENT_EVENTS)
         }
         
-        # Charger le contexte initial depuis la base de données
-        self._load_initial_context()
+        if snapshot is not None:
+            # Restaurer le contexte depuis l'instantané
+            self.update_context(copy.deepcopy(snapshot))
+            self.received_data = True
+        else:
+            # Charger le contexte initial depuis la base de données
+            if db_context is None:
+                db_context = self._load_initial_context()
+            self.update_context(db_context)
+            # Un robot inconnu (identifiant erroné d'une requête GET, par exemple) n'est
+            # publié dans le stockage d'état qu'à la réception de ses premières données
+            self.received_data = has_robot_data(db_context)
+            if self.received_data:
+                self._save_state(**self.snapshot())
+                self._publish()
         
         logger.info(f"Gestionnaire de contexte initialisé pour le robot {robot_id}")
     
-    def _load_initial_context(self):
-        """Charge le contexte initial depuis la base de données."""
-        try:
-            # Charger les dernières données des capteurs
-            recent_sensor_data = self.db.get_recent_sensor_data(self.robot_id, limit=1)
-            if recent_sensor_data:
-                self.current_context["sensors"] = recent_sensor_data[0].data
-            
-            # Charger l'état émotionnel actuel
-            current_emotion = self.db.get_current_emotion(self.robot_id)
-            if current_emotion:
-                self.current_context["emotion"] = {
-                    "type": current_emotion.emotion_type,
-                    "intensity": current_emotion.intensity,
-                    "last_change": current_emotion.timestamp.isoformat()
-                }
-            
-            # Charger les événements récents
-            recent_events = self.db.get_recent_events(self.robot_id, limit=5)
-            self.current_context["recent_events"] = [
-                {
-                    "timestamp": event.timestamp.isoformat(),
-                    "type": event.event_type,
-                    "description": event.description,
-                    "data": event.data
-                }
-                for event in recent_events
-            ]
+    @property
+    def llm(self):
+        """Gestionnaire du LLM (chargé à la première analyse, ou au démarrage en arrière-plan)."""
+        return get_llm_manager()
+    
+    def _notify_commands(self):
+        """Signale que des commandes sont disponibles pour ce robot."""
+        if self.on_commands is not None:
+            try:
+                self.on_commands(self.robot_id)
+            except Exception as e:
+                logger.error(f"Erreur lors de la notification des commandes: {e}")
+    
+    def touch(self):
+        """Marque le contexte comme utilisé."""
+        self.last_access = time.monotonic()
+    
+    def idle_time(self) -> float:
+        """Retourne le temps (en secondes) écoulé depuis la dernière utilisation du contexte."""
+        return time.monotonic() - self.last_access
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Produit un instantané compact du contexte, suffisant pour le restaurer
+        sans interroger la base de données.
+        
+        Returns:
+            Copie du contexte actuel (sérialisable en JSON)
+        """
+        with self.lock:
+            snapshot = copy.deepcopy(self.current_context)
+        snapshot["recent_events"] = list(snapshot["recent_events"])
+        return snapshot
+    
+    def emotion(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Retourne l'émotion exprimée par le robot, après décroissance.
+        
+        Args:
+            now: Instant de la lecture (par défaut, maintenant)
             
-            # Charger les interactions récentes
-            recent_interactions = self.db.get_recent_interactions(self.robot_id, limit=1)
-            if recent_interactions:
-                self.current_context["last_interaction"] = {
-                    "timestamp": recent_interactions[0].timestamp.isoformat(),
-                    "type": recent_interactions[0].interaction_type,
-                    "content": recent_interactions[0].content
-                }
+        Returns:
+            Dictionnaire avec le type, l'intensité et la date du dernier changement
+        """
+        with self.lock:
+            return self.emotions.read(self.current_context["emotion"], now)
+    
+    def _stimulate_emotion(self, emotion_type: str, intensity: int, source: str,
+                           expressed: bool = False) -> Dict[str, Any]:
+        """
+        Mélange un stimulus émotionnel à l'état du robot (verrou détenu).
+        
+        Args:
+            emotion_type: Type d'émotion du stimulus
+            intensity: Intensité du stimulus
+            source: Source du stimulus (`robot`, `reflex` ou `llm`)
+            expressed: True si le robot exprime déjà le stimulus (émotion signalée
+                par le robot, ou commande du réflexe)
             
+        Returns:
+            Émotion exprimée après le stimulus
+        """
+        state = self.current_context["emotion"]
+        new_state = self.emotions.stimulate(state, emotion_type, intensity, source)
+        new_state["expressed"] = (
+            {"type": emotion_type, "intensity": intensity} if expressed else self._expressed_emotion(state)
+        )
+        self.current_context["emotion"] = new_state
+        self._save_state(emotion=new_state)
+        return self.emotions.read(new_state)
+    
+    @staticmethod
+    def _expressed_emotion(state: Dict[str, Any]) -> Dict[str, Any]:
+        """Émotion exprimée par le robot (par défaut, celle de l'état enregistré)."""
+        return state.get("expressed") or {"type": state.get("type", "neutre"), "intensity": state.get("intensity", 50)}
+    
+    def _emotion_command(self, emotion: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Retourne la commande d'émotion à envoyer au robot si l'émotion `emotion`
+        s'écarte de celle qu'il exprime (verrou détenu), et la marque comme exprimée.
+        """
+        state = self.current_context["emotion"]
+        expressed = self._expressed_emotion(state)
+        if (emotion["type"] == expressed.get("type")
+                and abs(emotion["intensity"] - expressed.get("intensity", 0)) <= EMOTION_COMMAND_DELTA):
+            return None
+        state["expressed"] = {"type": emotion["type"], "intensity": emotion["intensity"]}
+        self._save_state(emotion=state)
+        return {"command_type": "emotion", "emotion": {"emotion": emotion["type"], "intensity": emotion["intensity"]}}
+    
+    def update_context(self, fields: Dict[str, Any]):
+        """
+        Met à jour des champs du contexte actuel (instantané, stockage partagé,
+        base de données), en conservant la file bornée des événements récents.
+        
+        Args:
+            fields: Champs du contexte à mettre à jour
+        """
+        with self.lock:
+            self.current_context.update(fields)
+            events = self.current_context["recent_events"]
+            if not isinstance(events, deque):
+                self.current_context["recent_events"] = deque(events or (), maxlen=MAX_RECENT_EVENTS)
+    
+    def refresh(self):
+        """
+        Recharge le contexte depuis le stockage partagé.
+        
+        Avec plusieurs workers, un autre processus a pu modifier l'état du robot
+        depuis la dernière requête traitée par celui-ci.
+        """
+        if not self.backend.shared:
+            return
+        try:
+            state = self.backend.load_state(self.robot_id)
+            if state:
+                self.update_context(state)
+        except Exception as e:
+            logger.error(f"Erreur lors du rechargement du contexte: {e}")
+    
+    def _defer(self, write: Callable[..., Any], *args):
+        """Ajoute une écriture du stockage à celles publiées par le prochain `_publish`."""
+        with self._pending_lock:
+            self._pending_writes.append((write, args))
+    
+    def _publish(self):
+        """
+        Exécute les écritures différées du stockage, dans leur ordre d'ajout.
+        
+        Appelée hors du verrou du contexte : un stockage lent (SQLite en attente
+        d'un verrou, Redis distant) ne retient que l'appelant. Un appelant dont
+        les écritures sont en cours de publication par un autre thread attend
+        leur fin.
+        """
+        with self._publish_lock:
+            with self._pending_lock:
+                writes, self._pending_writes = self._pending_writes, []
+            for write, args in writes:
+                write(*args)
+    
+    def _save_state(self, **fields):
+        """Publie des champs du contexte dans le stockage partagé (au prochain `_publish`)."""
+        if self.backend.shared:
+            # Copie : le contexte peut changer avant la publication
+            self._defer(self.backend.update_state, self.robot_id, copy.deepcopy(fields))
+    
+    def _queue_commands(self, commands: List[Dict[str, Any]]):
+        """Met des commandes en file dans le stockage (au prochain `_publish`)."""
+        if commands:
+            self._defer(self._push_commands, self.command_policy.stamp(commands))
+    
+    def _push_commands(self, commands: List[Dict[str, Any]]):
+        """Ajoute des commandes à la file du stockage et prévient les clients en attente."""
+        self.backend.push_commands(self.robot_id, commands)
+        self._notify_commands()
+    
+    def _load_initial_context(self) -> Dict[str, Any]:
+        """Lit le contexte initial dans la base de données (moteur synchrone)."""
+        try:
+            loaded = read_db_context(self.db, self.robot_id)
             logger.info("Contexte initial chargé depuis la base de données")
+            return loaded
         except Exception as e:
             logger.error(f"Erreur lors du chargement du contexte initial: {e}")
             # Continuer avec le contexte par défaut
+            return {}
     
-    def process_sensor_data(self, sensor_data: Dict[str, Any]) -> Dict[str, Any]:
+    def _mark_received(self):
         """
-        Traite les données des capteurs entrantes.
+        Marque le robot comme ayant envoyé des données ; à la première réception,
+        son contexte est publié dans le stockage d'état.
+        """
+        if not self.received_data:
+            self.received_data = True
+            self._save_state(**self.snapshot())
+            self._publish()
+    
+    def apply_reflexes(self, sensor_data: Dict[str, Any]) -> List[str]:
+        """
+        Applique les règles de réflexe aux données des capteurs.
+        
+        Les commandes des réflexes déclenchés sont mises en file immédiatement,
+        sans attendre l'analyse du LLM ; l'émotion du réflexe devient l'émotion
+        courante du contexte, que l'analyse du LLM peut ensuite affiner.
         
         Args:
             sensor_data: Dictionnaire contenant les données des capteurs
             
         Returns:
-            Dictionnaire contenant la réponse du système
+            Noms des règles déclenchées
         """
         try:
-            # Enregistrer les données dans la base de données
-            self.db.save_sensor_data(self.robot_id, sensor_data)
-            
-            # Mettre à jour le contexte actuel
-            self.current_context["sensors"] = sensor_data
-            
-            # Analyser les données des capteurs avec le LLM
-            analysis = self.llm.analyze_sensors(
-                sensor_data, 
-                self.current_context["emotion"]
-            )
+            with self.lock, stage_timer("reflex"):
+                fired, commands = self.reflexes.evaluate(sensor_data, self._reflex_fired)
+                if not fired:
+                    return []
+                
+                for command in commands:
+                    if command["command_type"] == "emotion":
+                        self._stimulate_emotion(
+                            command["emotion"]["emotion"], command["emotion"]["intensity"], "reflex", expressed=True
+                        )
+                
+                self._queue_commands(commands)
+            self._publish()
             
-            # Journaliser l'analyse
-            logger.info(f"Analyse des capteurs: {json.dumps(analysis, indent=2)}")
+            record_reflexes(fired)
+            logger.info(f"Réflexe(s) déclenché(s) pour le robot {self.robot_id}: {', '.join(fired)}")
+            return fired
+        except Exception as e:
+            logger.error(f"Erreur lors de l'application des réflexes: {e}")
+            return []
+    
+    def record_sensor_readings(self, readings: List[Tuple[Optional[datetime], Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        Enregistre des lectures de capteurs sans les analyser : écriture différée en
+        base de données, fenêtre glissante et détection d'anomalies (quelques
+        dizaines de microsecondes par lecture).
+        
+        Args:
+            readings: Liste de couples (horodatage ou None pour maintenant, données des
+                capteurs), dans l'ordre chronologique
             
-            # Traiter l'analyse pour générer des événements si nécessaire
-            self._process_sensor_analysis(analysis)
+        Returns:
+            Anomalies détectées
+        """
+        self._mark_received()
+        # Mettre les données en attente d'écriture en base de données
+        with stage_timer("db_write"):
+            if len(readings) == 1 and readings[0][0] is None:
+                self.writer.save_sensor_data(self.robot_id, readings[0][1])
+            else:
+                self.writer.save_sensor_data_many([
+                    {"robot_id": self.robot_id, "timestamp": timestamp, "data": sensor_data}
+                    for timestamp, sensor_data in readings
+                ])
+        return self._observe_readings(readings)
+    
+    def analyze_sensor_readings(self, history: List[Dict[str, Any]],
+                                anomalies: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """
+        Analyse la plus récente de lectures déjà enregistrées par `record_sensor_readings`.
+        
+        Args:
+            history: Lectures chronologiques soumises au filtre de changement
+                significatif (la dernière est analysée)
+            anomalies: Anomalies détectées sur ces lectures ; elles imposent l'analyse
             
-            # Générer des commandes basées sur l'analyse
-            commands = self._generate_commands(analysis)
+        Returns:
+            Dictionnaire contenant la réponse du système
+        """
+        anomalies = anomalies or []
+        try:
+            analysis, commands, reused = self._analyze_sensor_data(
+                history[-1], history=history if len(history) > 1 else None, anomalies=anomalies
+            )
             
             # Retourner la réponse
             return {
                 "success": True,
                 "message": "Données des capteurs traitées avec succès",
                 "analysis": analysis,
+                "analysis_reused": reused,
+                "anomalies": [anomaly["field"] for anomaly in anomalies],
                 "commands": commands
             }
         except Exception as e:
@@ -141,9 +560,112 @@ class ContextManager:
                 "commands": []
             }
     
+    def _observe_readings(self, readings: List[Tuple[Optional[datetime], Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        Ajoute des lectures chronologiques à la fenêtre glissante et au détecteur
+        d'anomalies, et enregistre un événement `anomaly` pour chaque anomalie.
+        
+        Args:
+            readings: Liste de couples (horodatage ou None pour maintenant, données des capteurs)
+            
+        Returns:
+            Anomalies détectées
+        """
+        anomalies = []
+        with self.lock:
+            for timestamp, sensor_data in readings:
+                self.window.add(sensor_data, timestamp)
+                self.activity.update(sensor_data)
+                anomalies.extend(self.anomalies.update(sensor_data))
+        
+        for anomaly in anomalies:
+            self.writer.save_event(
+                self.robot_id,
+                "anomaly",
+                f"Valeur inhabituelle de {anomaly['field']} : {anomaly['value']:g} "
+                f"(moyenne {anomaly['mean']:.2f}, z-score {anomaly['z']})",
+                anomaly
+            )
+        if anomalies:
+            record_anomalies([anomaly["field"] for anomaly in anomalies])
+            logger.info(f"Anomalie(s) détectée(s) pour le robot {self.robot_id}: "
+                        f"{', '.join(anomaly['field'] for anomaly in anomalies)}")
+        return anomalies
+    
+    def _analyze_sensor_data(self, sensor_data: Dict[str, Any],
+                             history: Optional[List[Dict[str, Any]]] = None,
+                             anomalies: Optional[List[Dict[str, Any]]] = None
+                             ) -> Tuple[Dict[str, Any], List[Dict[str, Any]], bool]:
+        """
+        Met à jour le contexte avec des données de capteurs et les analyse avec le LLM.
+        
+        Si rien de significatif n'a changé depuis la dernière analyse et qu'aucune
+        anomalie n'a été détectée, celle-ci est réutilisée sans appeler le LLM et
+        aucune nouvelle commande n'est générée.
+        
+        Args:
+            sensor_data: Dictionnaire contenant les données des capteurs
+            history: Lectures chronologiques à soumettre au filtre de changement
+                significatif (par défaut, `sensor_data` seule)
+            anomalies: Anomalies détectées sur ces lectures ; elles imposent l'analyse
+            
+        Returns:
+            Triplet (analyse du LLM, commandes générées, analyse réutilisée)
+        """
+        # Mettre à jour le contexte actuel
+        with self.lock:
+            self.current_context["sensors"] = sensor_data
+            emotion = self.emotion()
+            force = f"anomaly:{anomalies[0]['field']}" if anomalies else None
+            if history:
+                reason = self.significance.check_many(history, force=force)
+            else:
+                reason = self.significance.check(sensor_data, force=force)
+            last_analysis = self.last_analysis
+            trends = self.window.trends(self.significance.config.get("deadbands")) if reason is not None else None
+        if trends is not None and anomalies:
+            trends["anomalies"] = anomalies
+        self._save_state(sensors=sensor_data)
+        self._publish()
+        
+        if reason is None and last_analysis is not None:
+            record_analysis_decision("skipped", "unchanged")
+            return last_analysis, [], True
+        record_analysis_decision("analyzed", reason or "first")
+        
+        # Analyser les données des capteurs avec le LLM (hors verrou : la génération
+        # peut durer plusieurs secondes)
+        timings = {}
+        analysis = self.llm.analyze_sensors(sensor_data, emotion, timings=timings, trends=trends)
+        observe_llm_timings(timings)
+        
+        # Journaliser l'analyse
+        logger.info(f"Analyse des capteurs: {json.dumps(analysis, indent=2)}")
+        
+        with self.lock, stage_timer("command_generation"):
+            # Ne pas réutiliser une analyse en erreur : la prochaine lecture sera analysée
+            if analysis.get("interpretation") == "Erreur d'analyse":
+                self.significance.reset()
+            else:
+                self.last_analysis = analysis
+            
+            # Traiter l'analyse pour générer des événements si nécessaire
+            self._process_sensor_analysis(analysis)
+            
+            # Générer des commandes basées sur l'analyse
+            commands = self._generate_commands(analysis)
+        self._publish()
+        
+        # Enregistrer l'interprétation hors du verrou : la contre-pression du tampon
+        # d'écriture peut bloquer l'appelant
+        self._save_interpretation(analysis)
+        
+        return analysis, commands, False
+    
     def process_emotional_state(self, emotional_state: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Traite l'état émotionnel entrant.
+        Traite l'état émotionnel entrant : enregistrement (`record_emotional_state`)
+        puis mise à jour du contexte (`apply_emotional_state`).
         
         Args:
             emotional_state: Dictionnaire contenant l'état émotionnel
@@ -151,6 +673,25 @@ class ContextManager:
         Returns:
             Dictionnaire contenant la réponse du système
         """
+        if not self.record_emotional_state(emotional_state):
+            return {
+                "success": False,
+                "message": "Erreur lors de l'enregistrement de l'état émotionnel"
+            }
+        return self.apply_emotional_state(emotional_state)
+    
+    def record_emotional_state(self, emotional_state: Dict[str, Any]) -> bool:
+        """
+        Enregistre un état émotionnel sans l'appliquer au contexte : écriture
+        différée de l'état en base de données, et de l'événement et du souvenir
+        d'une émotion forte.
+        
+        Args:
+            emotional_state: Dictionnaire contenant l'état émotionnel
+            
+        Returns:
+            True si l'état émotionnel a été enregistré, False sinon
+        """
         try:
             # Extraire les données
             emotion_type = emotional_state["type"]
@@ -158,18 +699,12 @@ class ContextManager:
             duration = emotional_state["duration"]
             
             # Enregistrer l'état émotionnel dans la base de données
-            self.db.save_emotional_state(self.robot_id, emotion_type, intensity, duration)
-            
-            # Mettre à jour le contexte actuel
-            self.current_context["emotion"] = {
-                "type": emotion_type,
-                "intensity": intensity,
-                "last_change": datetime.utcnow().isoformat()
-            }
+            self._mark_received()
+            self.writer.save_emotional_state(self.robot_id, emotion_type, intensity, duration)
             
             # Enregistrer un événement pour les changements d'émotion significatifs
             if intensity > 70:
-                self.db.save_event(
+                self.writer.save_event(
                     self.robot_id,
                     "emotion_change",
                     f"Changement significatif d'émotion : {emotion_type} (intensité: {intensity})",
@@ -178,12 +713,35 @@ class ContextManager:
                 
                 # Ajouter à la mémoire à long terme si l'émotion est forte
                 if intensity > 85:
-                    self.db.save_memory(
+                    self.writer.save_memory(
                         self.robot_id,
                         "emotional_event",
                         f"J'ai ressenti une forte émotion de {emotion_type} avec une intensité de {intensity}.",
                         importance=intensity
                     )
+            return True
+        except Exception as e:
+            logger.error(f"Erreur lors de l'enregistrement de l'état émotionnel: {e}")
+            return False
+    
+    def apply_emotional_state(self, emotional_state: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Applique au contexte un état émotionnel déjà enregistré par `record_emotional_state`.
+        
+        Args:
+            emotional_state: Dictionnaire contenant l'état émotionnel
+            
+        Returns:
+            Dictionnaire contenant la réponse du système
+        """
+        try:
+            emotion_type = emotional_state["type"]
+            intensity = emotional_state["intensity"]
+            
+            # Mettre à jour le contexte actuel : le robot exprime l'émotion qu'il signale
+            with self.lock:
+                self._stimulate_emotion(emotion_type, intensity, "robot", expressed=True)
+            self._publish()
             
             # Retourner la réponse
             return {
@@ -202,6 +760,17 @@ class ContextManager:
                 "message": f"Erreur lors du traitement de l'état émotionnel: {str(e)}"
             }
     
+    def get_sensor_features(self) -> Dict[str, Any]:
+        """
+        Récupère les caractéristiques des dernières lectures des capteurs (moyenne,
+        minimum, maximum et pente de chaque champ, nombre d'événements).
+        
+        Returns:
+            Caractéristiques de la fenêtre glissante
+        """
+        with self.lock:
+            return self.window.features()
+    
     def get_commands(self, robot_id: str) -> List[Dict[str, Any]]:
         """
         Récupère les commandes en attente pour le robot.
@@ -210,69 +779,91 @@ class ContextManager:
             robot_id: Identifiant du robot
             
         Returns:
-            Liste des commandes en attente
+            Liste des commandes en attente, par ordre de priorité (voir `CommandQueuePolicy`)
         """
         if robot_id != self.robot_id:
             logger.warning(f"Tentative d'accès aux commandes pour un robot inconnu: {robot_id}")
             return []
         
-        # Récupérer et vider la liste des commandes en attente
-        commands = self.current_context["pending_commands"].copy()
-        self.current_context["pending_commands"] = []
+        # Récupérer et vider la file des commandes en attente (opération atomique du
+        # stockage : une commande n'est délivrée qu'une fois, quel que soit le worker)
+        commands = self.backend.drain_commands(self.robot_id)
+        
+        # L'émotion décroît entre les événements : la rafraîchir chez le robot
+        # lorsqu'elle s'écarte de celle qu'il exprime
+        with self.lock:
+            decayed = self._emotion_command(self.emotion())
+        self._publish()
+        if decayed is not None:
+            commands.append(self.command_policy.stamp([decayed])[0])
+        if not commands:
+            return commands
         
+        # Abandonner les commandes expirées ou remplacées, l'arrêt en premier
+        commands, dropped = self.command_policy.prepare(commands)
+        record_dropped_commands(dropped)
         return commands
     
+    def _save_interpretation(self, analysis: Dict[str, Any]):
+        """
+        Enregistre l'interprétation d'une analyse des capteurs en base de données
+        (événement `sensor_interpretation`).
+        
+        Args:
+            analysis: Résultat de l'analyse des capteurs par le LLM
+        """
+        if not analysis.get("interpretation"):
+            return
+        try:
+            self.writer.save_event(
+                self.robot_id,
+                "sensor_interpretation",
+                analysis["interpretation"],
+                {"raw_analysis": analysis}
+            )
+        except Exception as e:
+            logger.error(f"Erreur lors de l'enregistrement de l'interprétation des capteurs: {e}")
+    
     def _process_sensor_analysis(self, analysis: Dict[str, Any]):
         """
-        Traite l'analyse des capteurs pour générer des événements.
+        Traite l'analyse des capteurs : événements récents et émotion du contexte.
+        
+        Appelée sous le verrou du contexte ; l'événement correspondant est
+        enregistré en base de données par `_save_interpretation`, hors verrou.
         
         Args:
             analysis: Résultat de l'analyse des capteurs par le LLM
         """
         try:
-            # Créer un événement à partir de l'interprétation
             if "interpretation" in analysis and analysis["interpretation"]:
-                self.db.save_event(
-                    self.robot_id,
-                    "sensor_interpretation",
-                    analysis["interpretation"],
-                    {"raw_analysis": analysis}
-                )
-                
                 # Mettre à jour la liste des événements récents dans le contexte
-                self.current_context["recent_events"].append({
+                event = {
                     "timestamp": datetime.utcnow().isoformat(),
                     "type": "sensor_interpretation",
                     "description": analysis["interpretation"]
-                })
+                }
                 
-                # Limiter à 5 événements récents
-                if len(self.current_context["recent_events"]) > 5:
-                    self.current_context["recent_events"] = self.current_context["recent_events"][-5:]
+                # File bornée : seuls les 5 derniers événements sont conservés
+                self.current_context["recent_events"].append(event)
+                if self.backend.shared:
+                    self._defer(self.backend.append_event, self.robot_id, event, MAX_RECENT_EVENTS)
             
             # Analyser la réponse émotionnelle recommandée
             if "emotional_response" in analysis and analysis["emotional_response"]:
                 emotional_response = analysis["emotional_response"]
                 
-                # Si la réponse émotionnelle est significativement différente de l'état actuel,
-                # l'ajouter aux commandes en attente
-                current_emotion = self.current_context["emotion"]["type"]
-                current_intensity = self.current_context["emotion"]["intensity"]
-                
                 new_emotion = emotional_response.get("emotion", "neutre")
                 new_intensity = emotional_response.get("intensity", 50)
                 
-                if new_emotion != current_emotion or abs(new_intensity - current_intensity) > 20:
-                    # Ajouter la commande de changement d'émotion
-                    self.current_context["pending_commands"].append({
-                        "command_type": "emotion",
-                        "emotion": {
-                            "emotion": new_emotion,
-                            "intensity": new_intensity
-                        }
-                    })
+                # Mélanger la suggestion à l'état émotionnel ; si l'émotion résultante
+                # s'écarte de celle que le robot exprime, l'ajouter aux commandes en attente
+                emotion = self._stimulate_emotion(new_emotion, new_intensity, "llm")
+                command = self._emotion_command(emotion)
+                if command is not None:
+                    self._queue_commands([command])
                     
-                    logger.info(f"Nouvelle émotion suggérée: {new_emotion} (intensité: {new_intensity})")
+                    logger.info(f"Nouvelle émotion: {emotion['type']} (intensité: {emotion['intensity']}, "
+                                f"suggérée: {new_emotion} {new_intensity})")
         except Exception as e:
             logger.error(f"Erreur lors du traitement de l'analyse des capteurs: {e}")
     
@@ -286,68 +877,12 @@ class ContextManager:
         Returns:
             Liste des commandes générées
         """
-        commands = []
-        
         try:
-            # Traiter les actions suggérées
-            if "suggested_actions" in analysis and analysis["suggested_actions"]:
-                for action in analysis["suggested_actions"]:
-                    # Traiter chaque action suggérée
-                    if "avancer" in action.lower() or "forward" in action.lower():
-                        commands.append({
-                            "command_type": "movement",
-                            "movement": {
-                                "direction": "forward",
-                                "speed": 60,
-                                "duration": 2000  # 2 secondes
-                            }
-                        })
-                    elif "reculer" in action.lower() or "backward" in action.lower():
-                        commands.append({
-                            "command_type": "movement",
-                            "movement": {
-                                "direction": "backward",
-                                "speed": 60,
-                                "duration": 2000  # 2 secondes
-                            }
-                        })
-                    elif "tourner" in action.lower() and "gauche" in action.lower() or "left" in action.lower():
-                        commands.append({
-                            "command_type": "movement",
-                            "movement": {
-                                "direction": "left",
-                                "speed": 50,
-                                "duration": 1000  # 1 seconde
-                            }
-                        })
-                    elif "tourner" in action.lower() and "droite" in action.lower() or "right" in action.lower():
-                        commands.append({
-                            "command_type": "movement",
-                            "movement": {
-                                "direction": "right",
-                                "speed": 50,
-                                "duration": 1000  # 1 seconde
-                            }
-                        })
-                    elif "arret" in action.lower() or "stop" in action.lower():
-                        commands.append({
-                            "command_type": "movement",
-                            "movement": {
-                                "direction": "stop",
-                                "speed": 0
-                            }
-                        })
-                    elif "bip" in action.lower() or "son" in action.lower() or "sound" in action.lower():
-                        commands.append({
-                            "command_type": "sound",
-                            "sound": {
-                                "frequency": 1000,  # 1 kHz
-                                "duration": 500  # 0.5 seconde
-                            }
-                        })
-            
-            # Ajouter toutes les commandes au contexte
-            self.current_context["pending_commands"].extend(commands)
+            # Traduire les actions suggérées (vocabulaire de config/actions.json)
+            commands = self.actions.commands(analysis.get("suggested_actions") or [])
+            
+            # Ajouter toutes les commandes à la file du robot
+            self._queue_commands(commands)
             
             return commands
         except Exception as e:
@@ -368,14 +903,18 @@ class ContextManager:
         """
         try:
             # Enregistrer l'interaction dans la base de données
+            self._mark_received()
             self.db.save_interaction(self.robot_id, interaction_type, content, metadata)
             
             # Mettre à jour le contexte
-            self.current_context["last_interaction"] = {
-                "timestamp": datetime.utcnow().isoformat(),
-                "type": interaction_type,
-                "content": content
-            }
+            with self.lock:
+                self.current_context["last_interaction"] = {
+                    "timestamp": datetime.utcnow().isoformat(),
+                    "type": interaction_type,
+                    "content": content
+                }
+                self._save_state(last_interaction=self.current_context["last_interaction"])
+            self._publish()
             
             return True
         except Exception as e:
@@ -393,15 +932,312 @@ class ContextManager:
             True si la commande a été ajoutée avec succès, False sinon
         """
         try:
-            self.current_context["pending_commands"].append(command)
+            self._mark_received()
+            self._queue_commands([command])
+            self._publish()
             return True
         except Exception as e:
             logger.error(f"Erreur lors de l'ajout d'une commande: {e}")
             return False
 
-# Instancier le gestionnaire de contexte
-context_manager = ContextManager(robot_id=os.environ.get("ROBOT_ID", "MignonBot1"))
+class _RegistryShard:
+    """Partition du registre : contextes actifs."""
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.contexts: Dict[str, ContextManager] = {}
+
+class ContextRegistry:
+    """
+    Registre des gestionnaires de contexte d'une flotte de robots.
+    
+    Les contextes sont créés à la demande au premier message d'un robot (et
+    initialisés depuis le stockage d'état ou, à défaut, la base de données), puis
+    évincés vers un instantané dans le stockage d'état après `idle_ttl` secondes
+    d'inactivité. Le registre est partitionné
+    en `shards` afin de limiter la contention entre robots ; chaque contexte
+    possède son propre verrou, de sorte que des robots différents sont traités
+    en parallèle.
+    
+    Avec le stockage en mémoire, les contextes sont périodiquement écrits dans un
+    fichier d'instantanés local (`checkpoint`), relu au redémarrage (`warm_start`).
+    """
+    
+    def __init__(self, idle_ttl: float = CONTEXT_IDLE_TTL, shards: int = CONTEXT_REGISTRY_SHARDS,
+                 eviction_interval: float = CONTEXT_EVICTION_INTERVAL,
+                 backend: Optional[StateBackend] = None,
+                 snapshot_store: Optional[ContextSnapshotStore] = None):
+        self.idle_ttl = idle_ttl
+        self.backend = backend or get_state_backend()
+        self.snapshot_store = snapshot_store or get_context_snapshot_store()
+        self.eviction_interval = eviction_interval
+        self._shards = [_RegistryShard() for _ in range(max(1, shards))]
+        self._last_eviction = time.monotonic()
+        self._command_listener: Optional[Callable[[str], None]] = None
+        # Points de contrôle sérialisés : le dernier commencé écrit le plus récent état
+        self._checkpoint_lock = threading.Lock()
+    
+    def set_command_listener(self, listener: Optional[Callable[[str], None]]):
+        """
+        Définit la fonction appelée lorsque des commandes sont mises en file pour un robot.
+        
+        Args:
+            listener: Fonction recevant l'identifiant du robot
+        """
+        self._command_listener = listener
+    
+    def _on_commands(self, robot_id: str):
+        """Relaie la mise en file de commandes au listener courant."""
+        listener = self._command_listener
+        if listener is not None:
+            listener(robot_id)
+    
+    def _shard(self, robot_id: str) -> _RegistryShard:
+        """Retourne la partition d'un robot (hachage stable)."""
+        return self._shards[zlib.crc32(robot_id.encode("utf-8")) % len(self._shards)]
+    
+    def get(self, robot_id: str, db_context: Optional[Dict[str, Any]] = None) -> ContextManager:
+        """
+        Retourne le gestionnaire de contexte d'un robot, en le créant si nécessaire.
+        
+        Args:
+            robot_id: Identifiant du robot
+            db_context: Champs du contexte lus par `preload`, utilisés à la création
+                du contexte à la place d'une lecture synchrone en base de données
+            
+        Returns:
+            Gestionnaire de contexte du robot
+        """
+        self._maybe_evict()
+        
+        shard = self._shard(robot_id)
+        with shard.lock:
+            context = shard.contexts.get(robot_id)
+            if context is None:
+                snapshot = self.backend.load_state(robot_id)
+                context = ContextManager(robot_id=robot_id, snapshot=snapshot,
+                                         on_commands=self._on_commands, backend=self.backend,
+                                         db_context=db_context)
+                shard.contexts[robot_id] = context
+            else:
+                # Avec un stockage partagé, reprendre les modifications des autres workers
+                context.refresh()
+            context.touch()
+            return context
+    
+    def _maybe_evict(self):
+        """Lance une éviction si la dernière date de plus de `eviction_interval` secondes."""
+        now = time.monotonic()
+        if now - self._last_eviction >= self.eviction_interval:
+            self._last_eviction = now
+            self.evict_idle()
+    
+    def evict_idle(self) -> int:
+        """
+        Évince les contextes inactifs depuis plus de `idle_ttl` secondes.
+        
+        Returns:
+            Nombre de contextes évincés
+        """
+        evicted = 0
+        for shard in self._shards:
+            with shard.lock:
+                for robot_id, context in list(shard.contexts.items()):
+                    if context.idle_time() < self.idle_ttl:
+                        continue
+                    # Ne pas évincer un contexte en cours d'utilisation
+                    if not context.lock.acquire(blocking=False):
+                        continue
+                    try:
+                        # Un stockage partagé est déjà à jour (écriture à chaque modification) ;
+                        # le contexte d'un robot qui n'a rien envoyé est simplement oublié
+                        if not self.backend.shared and context.received_data:
+                            self.backend.update_state(robot_id, context.snapshot())
+                        del shard.contexts[robot_id]
+                        evicted += 1
+                    finally:
+                        context.lock.release()
+        
+        if evicted:
+            logger.info(f"{evicted} contexte(s) inactif(s) évincé(s)")
+        return evicted
+    
+    def checkpoint(self) -> int:
+        """
+        Écrit les instantanés de tous les contextes connus (actifs ou évincés) dans
+        le fichier des instantanés.
+        
+        Sans effet avec un stockage partagé, qui survit déjà au redémarrage.
+        
+        Returns:
+            Nombre de contextes écrits
+        """
+        if self.backend.shared or not self.snapshot_store.enabled:
+            return 0
+        
+        with self._checkpoint_lock:
+            return self._write_checkpoint()
+    
+    def _write_checkpoint(self) -> int:
+        """Écrit le fichier des instantanés (verrou des points de contrôle détenu)."""
+        snapshots = {}
+        for robot_id in self.backend.robot_ids():
+            state = self.backend.load_state(robot_id)
+            if state:
+                snapshots[robot_id] = state
+        for shard in self._shards:
+            with shard.lock:
+                contexts = list(shard.contexts.items())
+            for robot_id, context in contexts:
+                if context.received_data:
+                    snapshots[robot_id] = context.snapshot()
+        
+        try:
+            return self.snapshot_store.save(snapshots)
+        except Exception as e:
+            logger.error(f"Erreur lors de l'écriture des instantanés des contextes: {e}")
+            return 0
+    
+    def warm_start(self, reconcile: bool = True) -> int:
+        """
+        Restaure les contextes depuis le fichier des instantanés (démarrage à chaud).
+        
+        Les instantanés sont placés dans le stockage d'état : le contexte de chaque
+        robot est repris sans requête à la base de données à son premier message.
+        La réconciliation avec la base de données se fait ensuite en arrière-plan.
+        
+        Args:
+            reconcile: Lancer la réconciliation avec la base de données
+            
+        Returns:
+            Nombre de contextes restaurés
+        """
+        if self.backend.shared or not self.snapshot_store.enabled:
+            return 0
+        
+        start = time.perf_counter()
+        restored = []
+        for robot_id, snapshot in self.snapshot_store.load().items():
+            if snapshot and not self.backend.load_state(robot_id):
+                self.backend.update_state(robot_id, snapshot)
+                restored.append(robot_id)
+        logger.info(
+            f"{len(restored)} contexte(s) restauré(s) depuis {self.snapshot_store.path} "
+            f"en {(time.perf_counter() - start) * 1000:.1f} ms"
+        )
+        
+        if restored and reconcile:
+            threading.Thread(
+                target=self.reconcile, args=(restored,), name="context-reconcile", daemon=True
+            ).start()
+        return len(restored)
+    
+    def reconcile(self, robot_ids: List[str]) -> int:
+        """
+        Réconcilie des contextes restaurés avec la base de données, qui peut contenir
+        des données plus récentes que l'instantané (voir `merge_db_context`).
+        
+        Args:
+            robot_ids: Identifiants des robots à réconcilier
+            
+        Returns:
+            Nombre de contextes mis à jour
+        """
+        updated = 0
+        for robot_id in robot_ids:
+            try:
+                loaded = read_db_context(db_manager, robot_id)
+            except Exception as e:
+                logger.error(f"Erreur lors de la réconciliation du contexte du robot {robot_id}: {e}")
+                continue
+            
+            shard = self._shard(robot_id)
+            with shard.lock:
+                context = shard.contexts.get(robot_id)
+                if context is None:
+                    # Contexte pas encore repris : mettre à jour l'instantané
+                    updates = merge_db_context(self.backend.load_state(robot_id) or {}, loaded)
+                    if updates:
+                        self.backend.update_state(robot_id, updates)
+            if context is not None:
+                with context.lock:
+                    updates = merge_db_context(context.current_context, loaded)
+                    context.update_context(updates)
+            if updates:
+                updated += 1
+        
+        logger.info(f"Réconciliation avec la base de données terminée: {updated}/{len(robot_ids)} contexte(s) mis à jour")
+        return updated
+    
+    def is_active(self, robot_id: str) -> bool:
+        """Indique si le contexte d'un robot est actif dans ce processus."""
+        shard = self._shard(robot_id)
+        with shard.lock:
+            return robot_id in shard.contexts
+    
+    async def preload(self, robot_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Lit en base de données, par le moteur asynchrone, le contexte d'un robot
+        qui n'est ni actif ni dans le stockage d'état, à passer à `get`
+        (`db_context`) : le contexte est ensuite créé sans requête bloquante.
+        
+        Rien n'est écrit dans le stockage d'état : le contexte d'un robot n'y est
+        publié qu'à la réception de ses premières données.
+        
+        Args:
+            robot_id: Identifiant du robot
+            
+        Returns:
+            Champs du contexte lus en base de données (vides si la lecture a échoué),
+            ou None si le contexte est actif ou dans le stockage d'état
+        """
+        if self.is_active(robot_id):
+            return None
+        if await asyncio.to_thread(self.backend.load_state, robot_id) is not None:
+            return None
+        try:
+            return await read_db_context_async(get_async_db_manager(), robot_id)
+        except Exception as e:
+            # Contexte par défaut : la boucle d'événements n'attend pas le moteur synchrone
+            logger.error(f"Erreur lors de la lecture asynchrone du contexte du robot {robot_id}: {e}")
+            return {}
+    
+    def robot_ids(self) -> List[str]:
+        """Retourne les identifiants des robots connus (actifs ou évincés)."""
+        robot_ids = set(self.backend.robot_ids())
+        for shard in self._shards:
+            with shard.lock:
+                robot_ids.update(robot_id for robot_id, context in shard.contexts.items()
+                                 if context.received_data)
+        return sorted(robot_ids)
+    
+    def active_count(self) -> int:
+        """Nombre de contextes actifs (non évincés) dans ce processus."""
+        active = 0
+        for shard in self._shards:
+            with shard.lock:
+                active += len(shard.contexts)
+        return active
+    
+    def stats(self) -> Dict[str, Any]:
+        """Statistiques du registre."""
+        return {
+            "active": self.active_count(),
+            "known": len(self.robot_ids()),
+            "shards": len(self._shards),
+            "idle_ttl": self.idle_ttl,
+            "backend": type(self.backend).__name__,
+            "shared": self.backend.shared
+        }
+
+# Instancier le registre des gestionnaires de contexte
+context_registry = ContextRegistry()
+
+def get_context_registry() -> ContextRegistry:
+    """Retourne le registre des gestionnaires de contexte."""
+    return context_registry
 
-def get_context_manager() -> ContextManager:
-    """Retourne l'instance du gestionnaire de contexte."""
-    return context_manager
+def get_context_manager(robot_id: Optional[str] = None,
+                        db_context: Optional[Dict[str, Any]] = None) -> ContextManager:
+    """Retourne le gestionnaire de contexte d'un robot (par défaut `ROBOT_ID`, voir `ContextRegistry.get`)."""
+    return context_registry.get(robot_id or DEFAULT_ROBOT_ID, db_context)
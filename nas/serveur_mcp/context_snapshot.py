@@ -0,0 +1,112 @@
+import os
+import time
+import tempfile
+import logging
+from typing import Dict, Any
+
+import msgpack
+
+# Configuration du logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Fichier des instantanés des contextes (vide pour désactiver les instantanés)
+CONTEXT_SNAPSHOT_PATH = os.environ.get(
+    "CONTEXT_SNAPSHOT_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "context_snapshot.msgpack")
+)
+
+# Intervalle (secondes) entre deux écritures du fichier des instantanés
+CONTEXT_SNAPSHOT_INTERVAL = float(os.environ.get("CONTEXT_SNAPSHOT_INTERVAL", "30"))
+
+# Version du format du fichier
+SNAPSHOT_FORMAT_VERSION = 1
+
+
+class ContextSnapshotStore:
+    """
+    Fichier local des instantanés des contextes des robots, au format MessagePack.
+
+    Le fichier est réécrit en entier à chaque point de contrôle : il est d'abord
+    écrit dans un fichier temporaire propre à chaque écriture, synchronisé sur
+    le disque, puis renommé (`os.replace` est atomique), de sorte qu'un arrêt
+    brutal ou une écriture concurrente laisse toujours un instantané complet.
+    """
+
+    def __init__(self, path: str = CONTEXT_SNAPSHOT_PATH):
+        """
+        Initialise le fichier des instantanés.
+
+        Args:
+            path: Chemin du fichier (vide pour désactiver les instantanés)
+        """
+        self.path = path
+
+    @property
+    def enabled(self) -> bool:
+        """Indique si les instantanés sont activés."""
+        return bool(self.path)
+
+    def save(self, contexts: Dict[str, Dict[str, Any]]) -> int:
+        """
+        Écrit les instantanés des contextes.
+
+        Args:
+            contexts: Instantanés (`ContextManager.snapshot()`) par identifiant de robot
+
+        Returns:
+            Nombre de contextes écrits
+        """
+        if not self.enabled:
+            return 0
+
+        payload = msgpack.packb(
+            {"version": SNAPSHOT_FORMAT_VERSION, "saved_at": time.time(), "robots": contexts},
+            use_bin_type=True,
+            default=str
+        )
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        descriptor, temporary = tempfile.mkstemp(
+            dir=directory or None, prefix=f"{os.path.basename(self.path)}.", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(descriptor, "wb") as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporary, self.path)
+        finally:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+        return len(contexts)
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Lit les instantanés des contextes.
+
+        Returns:
+            Instantanés par identifiant de robot (vide si le fichier est absent ou invalide)
+        """
+        if not self.enabled or not os.path.exists(self.path):
+            return {}
+
+        try:
+            with open(self.path, "rb") as f:
+                content = msgpack.unpackb(f.read(), raw=False)
+            if content.get("version") != SNAPSHOT_FORMAT_VERSION:
+                logger.warning(f"Version du fichier des instantanés non prise en charge: {content.get('version')}")
+                return {}
+            return content.get("robots", {})
+        except Exception as e:
+            logger.error(f"Erreur lors de la lecture des instantanés des contextes ({self.path}): {e}")
+            return {}
+
+
+# Instancier le fichier des instantanés
+context_snapshot_store = ContextSnapshotStore()
+
+def get_context_snapshot_store() -> ContextSnapshotStore:
+    """Retourne le fichier des instantanés des contextes."""
+    return context_snapshot_store
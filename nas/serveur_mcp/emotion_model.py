@@ -0,0 +1,175 @@
+import os
+import math
+import logging
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+# Configuration du logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Émotion de repos, vers laquelle toutes les émotions décroissent, et son intensité
+NEUTRAL_EMOTION = "neutre"
+NEUTRAL_INTENSITY = int(os.environ.get("EMOTION_NEUTRAL_INTENSITY", "50"))
+
+# Intensité en dessous de laquelle une émotion s'est dissipée (le robot redevient neutre)
+EMOTION_NEUTRAL_THRESHOLD = float(os.environ.get("EMOTION_NEUTRAL_THRESHOLD", "20"))
+
+# Demi-vie (secondes) des émotions : par défaut, et par type d'émotion
+# (variables EMOTION_HALF_LIFE_<TYPE>, par exemple EMOTION_HALF_LIFE_SURPRISE)
+EMOTION_HALF_LIFE = float(os.environ.get("EMOTION_HALF_LIFE", "120"))
+EMOTION_HALF_LIVES = {
+    emotion: float(os.environ.get(f"EMOTION_HALF_LIFE_{emotion.upper()}", default))
+    for emotion, default in (
+        ("joie", EMOTION_HALF_LIFE),
+        ("peur", "60"),
+        ("curiosite", EMOTION_HALF_LIFE),
+        ("tristesse", "300"),
+        ("colere", "90"),
+        ("fatigue", "600"),
+        ("surprise", "20"),
+        ("tendresse", "180")
+    )
+}
+
+# Poids d'un nouveau stimulus selon sa source (1 : le stimulus remplace l'état courant)
+EMOTION_STIMULUS_WEIGHTS = {
+    "robot": float(os.environ.get("EMOTION_WEIGHT_ROBOT", "1")),
+    "reflex": float(os.environ.get("EMOTION_WEIGHT_REFLEX", "1")),
+    "llm": float(os.environ.get("EMOTION_WEIGHT_LLM", "0.5"))
+}
+
+# Composantes négligeables, oubliées lors de la mise à jour
+_MIN_COMPONENT = 1.0
+
+
+class EmotionModel:
+    """
+    Dynamique des émotions du robot.
+
+    L'état émotionnel est un mélange de composantes (une intensité par type
+    d'émotion), datées de leur dernier changement (`last_change`). Chaque
+    composante décroît exponentiellement avec la demi-vie de son type ;
+    l'émotion exprimée est la composante dominante, ou `neutre` lorsque toutes
+    sont passées sous `EMOTION_NEUTRAL_THRESHOLD`. La décroissance est calculée
+    à la lecture, à partir de `last_change` : rien n'est exécuté entre deux
+    événements.
+
+    Un stimulus est mélangé à l'état courant avec le poids de sa source :
+    `(1 - poids) * état + poids * stimulus`. Un stimulus `neutre` apaise toutes
+    les composantes.
+    """
+
+    def __init__(self, half_lives: Optional[Dict[str, float]] = None, default_half_life: float = EMOTION_HALF_LIFE,
+                 threshold: float = EMOTION_NEUTRAL_THRESHOLD, weights: Optional[Dict[str, float]] = None):
+        """
+        Initialise le modèle.
+
+        Args:
+            half_lives: Demi-vie (secondes) de chaque type d'émotion
+            default_half_life: Demi-vie des types non listés
+            threshold: Intensité en dessous de laquelle une émotion s'est dissipée
+            weights: Poids des stimuli de chaque source
+        """
+        self.half_lives = EMOTION_HALF_LIVES if half_lives is None else half_lives
+        self.default_half_life = default_half_life
+        self.threshold = threshold
+        self.weights = EMOTION_STIMULUS_WEIGHTS if weights is None else weights
+
+    @staticmethod
+    def components(state: Optional[Dict[str, Any]]) -> Dict[str, float]:
+        """Composantes enregistrées d'un état (un état sans composantes n'en a qu'une, son émotion)."""
+        if not state:
+            return {}
+        components = state.get("components")
+        if components is None:
+            emotion = state.get("type", NEUTRAL_EMOTION)
+            return {} if emotion == NEUTRAL_EMOTION else {emotion: float(state.get("intensity", 0))}
+        return dict(components)
+
+    def decay(self, state: Optional[Dict[str, Any]], now: Optional[datetime] = None) -> Dict[str, float]:
+        """
+        Calcule les composantes d'un état à l'instant `now`.
+
+        Args:
+            state: État émotionnel enregistré
+            now: Instant de la lecture (par défaut, maintenant)
+
+        Returns:
+            Intensité de chaque composante à l'instant `now`
+        """
+        components = self.components(state)
+        if not components:
+            return components
+        try:
+            elapsed = ((now or datetime.utcnow()) - datetime.fromisoformat(state["last_change"])).total_seconds()
+        except (KeyError, TypeError, ValueError):
+            # État sans date de changement : pas de décroissance
+            return components
+        if elapsed <= 0:
+            return components
+        return {
+            emotion: intensity * math.exp(-math.log(2) * elapsed / self.half_lives.get(emotion, self.default_half_life))
+            for emotion, intensity in components.items()
+        }
+
+    def _dominant(self, components: Dict[str, float]) -> Dict[str, Any]:
+        """Émotion exprimée par des composantes."""
+        if components:
+            emotion, intensity = max(components.items(), key=lambda item: item[1])
+            if intensity >= self.threshold:
+                return {"type": emotion, "intensity": min(100, int(round(intensity)))}
+        return {"type": NEUTRAL_EMOTION, "intensity": NEUTRAL_INTENSITY}
+
+    def read(self, state: Optional[Dict[str, Any]], now: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Retourne l'émotion exprimée à l'instant `now`.
+
+        Args:
+            state: État émotionnel enregistré
+            now: Instant de la lecture (par défaut, maintenant)
+
+        Returns:
+            Dictionnaire avec le type, l'intensité et la date du dernier changement
+        """
+        emotion = self._dominant(self.decay(state, now))
+        emotion["last_change"] = (state or {}).get("last_change")
+        return emotion
+
+    def stimulate(self, state: Optional[Dict[str, Any]], emotion: str, intensity: float,
+                  source: str = "llm", now: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Mélange un stimulus à un état émotionnel.
+
+        Args:
+            state: État émotionnel enregistré
+            emotion: Type d'émotion du stimulus
+            intensity: Intensité du stimulus (0-100)
+            source: Source du stimulus (`robot`, `reflex` ou `llm`), qui détermine son poids
+            now: Instant du stimulus (par défaut, maintenant)
+
+        Returns:
+            Nouvel état émotionnel à enregistrer
+        """
+        now = now or datetime.utcnow()
+        weight = min(1.0, max(0.0, self.weights.get(source, 1.0)))
+        components = {
+            name: value * (1 - weight)
+            for name, value in self.decay(state, now).items()
+        }
+        if emotion != NEUTRAL_EMOTION:
+            components[emotion] = components.get(emotion, 0.0) + weight * float(intensity)
+        components = {name: round(value, 2) for name, value in components.items() if value >= _MIN_COMPONENT}
+
+        new_state = self._dominant(components)
+        new_state["last_change"] = now.isoformat()
+        new_state["components"] = components
+        return new_state
+
+
+# Instancier le modèle des émotions
+emotion_model = EmotionModel()
+
+def get_emotion_model() -> EmotionModel:
+    """Retourne l'instance du modèle des émotions."""
+    return emotion_model
@@ -0,0 +1,180 @@
+import os
+import uuid
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor, Future
+from datetime import datetime
+from typing import Dict, Any, Optional, Callable
+
+from metrics import INFERENCE_QUEUE_WAIT, METRICS_ENABLED
+
+# Configuration du logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Paramètres du pool d'inférence (configurables par variables d'environnement)
+INFERENCE_WORKERS = int(os.environ.get("INFERENCE_WORKERS", "1"))
+INFERENCE_QUEUE_SIZE = int(os.environ.get("INFERENCE_QUEUE_SIZE", "8"))
+INFERENCE_RESULT_TTL = float(os.environ.get("INFERENCE_RESULT_TTL", "300"))
+
+
+class InferenceQueueFull(Exception):
+    """Levée lorsque le pool d'inférence ne peut plus accepter de tâche."""
+
+
+class InferenceJob:
+    """Tâche soumise au pool d'inférence et son état d'avancement."""
+
+    def __init__(self, robot_id: Optional[str] = None):
+        self.job_id = uuid.uuid4().hex
+        self.robot_id = robot_id
+        self.status = "pending"
+        self.submitted_at = datetime.utcnow()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.future: Optional[Future] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("done", "error")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Représentation sérialisable de la tâche."""
+        return {
+            "job_id": self.job_id,
+            "robot_id": self.robot_id,
+            "status": self.status,
+            "submitted_at": self.submitted_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "error": self.error
+        }
+
+
+class InferencePool:
+    """
+    Pool de workers dédié aux traitements lourds (analyse LLM des capteurs).
+
+    Les tâches sont exécutées hors de la boucle d'événements d'asyncio afin que
+    les routes légères (/api/ping, /api/commands, ...) restent réactives pendant
+    une génération. Le nombre de tâches en attente est borné : au-delà de
+    `max_workers + max_queue` tâches non terminées, `submit` lève
+    `InferenceQueueFull`.
+    """
+
+    def __init__(self, max_workers: int = INFERENCE_WORKERS, max_queue: int = INFERENCE_QUEUE_SIZE,
+                 result_ttl: float = INFERENCE_RESULT_TTL):
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self.result_ttl = result_ttl
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="inference")
+        self._slots = threading.BoundedSemaphore(self.max_workers + self.max_queue)
+        self._jobs: Dict[str, InferenceJob] = {}
+        self._lock = threading.Lock()
+        self._running = 0
+
+        logger.info(f"Pool d'inférence initialisé ({self.max_workers} worker(s), file de {self.max_queue})")
+
+    def submit(self, fn: Callable[..., Any], *args, robot_id: Optional[str] = None, **kwargs) -> InferenceJob:
+        """
+        Soumet une tâche au pool.
+
+        Args:
+            fn: Fonction à exécuter dans un worker
+            robot_id: Identifiant du robot concerné (informatif)
+
+        Returns:
+            La tâche créée
+
+        Raises:
+            InferenceQueueFull: si la file d'attente est pleine
+        """
+        if not self._slots.acquire(blocking=False):
+            raise InferenceQueueFull("La file d'attente du pool d'inférence est pleine")
+
+        job = InferenceJob(robot_id=robot_id)
+        try:
+            with self._lock:
+                self._purge_expired()
+                self._jobs[job.job_id] = job
+            job.future = self._executor.submit(self._run, job, fn, args, kwargs)
+        except Exception:
+            with self._lock:
+                self._jobs.pop(job.job_id, None)
+            self._slots.release()
+            raise
+
+        return job
+
+    def _run(self, job: InferenceJob, fn: Callable[..., Any], args: tuple, kwargs: Dict[str, Any]) -> Any:
+        """Exécute une tâche dans un worker et enregistre son résultat."""
+        with self._lock:
+            self._running += 1
+        job.status = "running"
+        job.started_at = datetime.utcnow()
+        if METRICS_ENABLED:
+            INFERENCE_QUEUE_WAIT.observe((job.started_at - job.submitted_at).total_seconds())
+        try:
+            job.result = fn(*args, **kwargs)
+            job.status = "done"
+            return job.result
+        except Exception as e:
+            logger.error(f"Erreur dans la tâche d'inférence {job.job_id}: {e}")
+            job.error = str(e)
+            job.status = "error"
+            raise
+        finally:
+            job.finished_at = datetime.utcnow()
+            with self._lock:
+                self._running -= 1
+            self._slots.release()
+
+    def get_job(self, job_id: str) -> Optional[InferenceJob]:
+        """Retourne une tâche par son identifiant."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _purge_expired(self):
+        """Supprime les résultats des tâches terminées depuis plus de `result_ttl` secondes."""
+        now = datetime.utcnow()
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.done and job.finished_at and (now - job.finished_at).total_seconds() > self.result_ttl
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    @property
+    def running(self) -> int:
+        """Nombre de tâches en cours d'exécution."""
+        return self._running
+
+    @property
+    def queue_depth(self) -> int:
+        """Nombre de tâches soumises mais pas encore démarrées."""
+        with self._lock:
+            return sum(1 for job in self._jobs.values() if job.status == "pending")
+
+    def stats(self) -> Dict[str, Any]:
+        """Statistiques du pool."""
+        return {
+            "workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "running": self.running,
+            "queued": self.queue_depth
+        }
+
+    def shutdown(self, wait: bool = True):
+        """Arrête le pool en attendant (ou non) la fin des tâches en cours."""
+        logger.info("Arrêt du pool d'inférence")
+        self._executor.shutdown(wait=wait)
+
+
+# Instancier le pool d'inférence
+inference_pool = InferencePool()
+
+def get_inference_pool() -> InferencePool:
+    """Retourne l'instance du pool d'inférence."""
+    return inference_pool
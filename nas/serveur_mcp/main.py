@@ -39,6 +39,7 @@ def init_app():
         logger.info(f"Robot ID: {os.environ.get('ROBOT_ID', 'MignonBot1')}")
         logger.info(f"Moteur LLM: {os.environ.get('LLM_ENGINE', 'llama3')}")
         logger.info(f"Chemin des modèles LLM: {os.environ.get('LLM_MODEL_PATH', './models')}")
+        logger.info(f"Stockage de l'état des contextes: {os.environ.get('CONTEXT_STATE_BACKEND', 'memory')}")
         
         logger.info("Initialisation terminée avec succès!")
         return True
@@ -46,6 +47,27 @@ def init_app():
         logger.error(f"Erreur lors de l'initialisation: {e}")
         return False
 
+def get_worker_count() -> int:
+    """
+    Détermine le nombre de workers Uvicorn (variable `MCP_WORKERS`).
+    
+    Plusieurs workers ne partagent l'état des robots que si le stockage de
+    l'état est partagé (`CONTEXT_STATE_BACKEND=sqlite` ou `redis`) ; avec le
+    stockage en mémoire, un seul worker est lancé.
+    
+    Returns:
+        Nombre de workers
+    """
+    workers = max(1, int(os.environ.get("MCP_WORKERS", "1")))
+    backend = os.environ.get("CONTEXT_STATE_BACKEND", "memory").lower()
+    if workers > 1 and backend == "memory":
+        logger.warning(
+            f"MCP_WORKERS={workers} ignoré : le stockage en mémoire n'est pas partagé entre processus "
+            "(utiliser CONTEXT_STATE_BACKEND=sqlite ou redis)"
+        )
+        return 1
+    return workers
+
 def main():
     """Point d'entrée principal de l'application."""
     logger.info("Démarrage du serveur MCP (Model Context Protocol)...")
@@ -58,15 +80,16 @@ def main():
     # Configurer le serveur Uvicorn
     host = os.environ.get("MCP_SERVER_HOST", "0.0.0.0")
     port = int(os.environ.get("MCP_SERVER_PORT", "8080"))
+    workers = get_worker_count()
     
     # Démarrer le serveur
-    logger.info(f"Démarrage du serveur sur {host}:{port}")
+    logger.info(f"Démarrage du serveur sur {host}:{port} ({workers} worker(s))")
     uvicorn.run(
         "mcp_server:app",
         host=host,
         port=port,
         reload=False,
-        workers=1
+        workers=workers
     )
 
 if __name__ == "__main__":
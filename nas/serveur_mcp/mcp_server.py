@@ -1,24 +1,84 @@
-from fastapi import FastAPI, HTTPException, Depends, Body
+from fastapi import FastAPI, HTTPException, Depends, Body, Response, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
+from fastapi.responses import StreamingResponse
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, Field, ValidationError
 import json
 import os
+import asyncio
 import sys
 import logging
-from typing import Dict, List, Any, Optional
-from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple
+from datetime import datetime, timedelta
+from types import SimpleNamespace
 
 # Ajouter les chemins pour l'importation des modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
 
 # Import des schémas MCP
 from schemas.mcp_schemas import (
     SensorMCPMessage, EmotionalMCPMessage, RobotCommand,
-    MCPResponse, EmotionType, SensorDataPayload
+    MCPResponse, EmotionType, SensorDataPayload, SensorBatchMessage
 )
 
 # Import du gestionnaire de contexte
-from context_manager import get_context_manager
+from context_manager import get_context_manager, get_context_registry, preload_llm
+
+# Import du pool d'inférence et de l'ordonnanceur des analyses (une analyse en cours
+# et une en attente par robot)
+from inference_pool import get_inference_pool
+from analysis_scheduler import get_analysis_scheduler
+
+# Import des acteurs des robots (messages d'un robot traités dans l'ordre, robots
+# traités en parallèle)
+from robot_actor import get_actor_system, MailboxFull, MessageDropped, MAILBOX_POLICIES
+
+# Import du calcul de la cadence d'envoi recommandée aux robots
+from reporting_hints import get_reporting_advisor
+
+# Import du modèle des émotions (décroissance calculée à la lecture)
+from emotion_model import get_emotion_model
+
+# Import du notificateur de commandes (long-poll, SSE, WebSocket)
+from command_stream import get_command_notifier
+
+# Import du stockage de l'état des contextes (partagé entre workers)
+from state_backend import get_state_backend
+
+# Import du tampon d'écriture différée
+from write_behind import get_write_behind
+
+# Import du fichier des instantanés des contextes (démarrage à chaud)
+from context_snapshot import CONTEXT_SNAPSHOT_INTERVAL
+
+# Import des métriques (format Prometheus)
+from metrics import (
+    MetricsMiddleware, get_metrics_registry, stage_timer, CONTENT_TYPE_PROMETHEUS,
+    INFERENCE_QUEUE_DEPTH, INFERENCE_RUNNING, COMMAND_WAITERS, ACTIVE_CONTEXTS,
+    ACTIVE_ACTORS, ACTOR_MAILBOX_DEPTH, ACTOR_MAILBOX_MAX_DEPTH
+)
+
+# Import des formats de transport des messages MCP (JSON, MessagePack, binaire)
+from wire_format import (
+    decode_sensor_message, decode_emotion_message, supported_content_types,
+    WireFormatError, UnsupportedContentType
+)
+
+# Délai maximal (secondes) d'attente d'une analyse en mode synchrone
+SENSOR_ANALYSIS_TIMEOUT = float(os.environ.get("SENSOR_ANALYSIS_TIMEOUT", "30"))
+
+# Nombre maximal de lectures acceptées dans un lot de capteurs
+SENSOR_BATCH_MAX_READINGS = int(os.environ.get("SENSOR_BATCH_MAX_READINGS", "600"))
+
+# Délai maximal (secondes) d'un long-poll sur /api/commands
+COMMAND_LONG_POLL_MAX = float(os.environ.get("COMMAND_LONG_POLL_MAX", "60"))
+
+# Intervalle (secondes) des messages de maintien des flux de commandes
+COMMAND_STREAM_HEARTBEAT = float(os.environ.get("COMMAND_STREAM_HEARTBEAT", "15"))
+
+# Chargement du LLM au démarrage, en arrière-plan (sinon à la première analyse)
+LLM_PRELOAD = os.environ.get("LLM_PRELOAD", "true").lower() in ("1", "true", "yes")
 
 # Configuration du logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -40,9 +100,50 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Dépendance pour obtenir le gestionnaire de contexte
-def get_context():
-    return get_context_manager()
+# Mesure de la latence des requêtes par route
+app.add_middleware(MetricsMiddleware)
+
+async def _load_context(robot_id: str):
+    """
+    Retourne le gestionnaire de contexte d'un robot. Le contexte d'un robot qui
+    n'est pas encore actif est d'abord lu en base de données par le moteur
+    asynchrone : la boucle d'événements n'attend jamais la base de données.
+    
+    Avec un stockage d'état partagé, le contexte est rechargé depuis le stockage
+    (modifications des autres workers) dans un thread.
+    """
+    registry = get_context_registry()
+    db_context = None
+    if not registry.is_active(robot_id):
+        db_context = await registry.preload(robot_id)
+    if registry.backend.shared:
+        return await asyncio.to_thread(get_context_manager, robot_id, db_context)
+    return get_context_manager(robot_id, db_context)
+
+# Dépendance pour obtenir le gestionnaire de contexte du robot concerné
+async def get_context(robot_id: str):
+    return await _load_context(robot_id)
+
+def _decode_body(body: bytes, content_type: Optional[str], decoder):
+    """Décode le corps d'une requête et convertit les erreurs de décodage en réponses HTTP."""
+    try:
+        return decoder(body, content_type)
+    except UnsupportedContentType as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    except WireFormatError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ValidationError as e:
+        raise RequestValidationError(e.errors(include_url=False))
+
+# Dépendance décodant un message de capteurs selon son Content-Type
+async def read_sensor_message(request: Request) -> SensorMCPMessage:
+    body = await request.body()
+    with stage_timer("decode"):
+        return _decode_body(body, request.headers.get("content-type"), decode_sensor_message)
+
+# Dépendance décodant un message émotionnel selon son Content-Type
+async def read_emotion_message(request: Request) -> EmotionalMCPMessage:
+    return _decode_body(await request.body(), request.headers.get("content-type"), decode_emotion_message)
 
 # Route de ping pour vérifier la connectivité
 @app.get("/api/ping")
@@ -53,57 +154,397 @@ async def ping():
 # Route pour recevoir les données des capteurs
 @app.post("/api/sensors", response_model=MCPResponse)
 async def receive_sensor_data(
-    message: SensorMCPMessage = Body(...),
-    context = Depends(get_context)
+    response: Response,
+    message: SensorMCPMessage = Depends(read_sensor_message),
+    wait: bool = False,
+    timeout: Optional[float] = None
 ):
     """
     Reçoit les données des capteurs du robot.
     
-    Le message doit être au format MCP (Model Context Protocol).
+    Le message doit être au format MCP (Model Context Protocol), encodé en JSON
+    (`application/json`), MessagePack (`application/msgpack`) ou trame binaire
+    (`application/x-mcp-struct`) selon l'en-tête Content-Type.
+    
+    La lecture est enregistrée immédiatement ; son analyse par le LLM est confiée
+    à l'ordonnanceur des analyses (au plus une analyse en cours et une en attente
+    par robot, la plus récente lecture l'emportant). Par défaut, la réponse est
+    immédiate et contient la dernière analyse terminée et sa fraîcheur. Avec
+    `wait=true`, la requête attend au plus `timeout` secondes l'analyse couvrant
+    cette lecture ; au-delà, la réponse 202 contient l'identifiant de la tâche à
+    consulter via `/api/sensors/jobs/{job_id}` si l'analyse a démarré.
+    
+    La lecture est enregistrée (base de données, fenêtre glissante, anomalies)
+    avant de passer par la boîte aux lettres du robot ; si celle-ci est pleine,
+    seule la demande d'analyse de la plus ancienne lecture en attente est
+    abandonnée (`"analysis_status": "dropped"`).
     """
     try:
         logger.info(f"Données des capteurs reçues du robot {message.robot_id}")
         
         # Extraire les données des capteurs
         sensor_data = message.sensors.dict()
+        context = await _load_context(message.robot_id)
+        
+        # Réflexes : réaction immédiate, avant l'analyse du LLM (hors de la boîte aux
+        # lettres du robot : un réflexe n'attend pas les messages précédents)
+        readings = [(None, sensor_data)]
+        reflexes = await asyncio.to_thread(_apply_reflexes, context, readings)
+        
+        # Enregistrer la lecture hors de la boîte aux lettres : une lecture évincée
+        # par une plus récente perd son analyse, jamais son enregistrement
+        anomalies = await asyncio.to_thread(context.record_sensor_readings, readings)
+        
+        # Demander l'analyse de la lecture (acteur du robot)
+        scheduler = get_analysis_scheduler()
+        try:
+            decision, analysis = await get_actor_system().ask(
+                message.robot_id, "sensor", _submit_analysis, context, readings, anomalies
+            )
+        except MessageDropped:
+            return MCPResponse(
+                success=True,
+                message="Lecture enregistrée, analyse remplacée par celle d'une lecture plus récente",
+                data={
+                    "analysis_status": "dropped",
+                    "anomalies": [anomaly["field"] for anomaly in anomalies],
+                    "reflexes": reflexes,
+                    "reporting": _reporting_hints(context),
+                    **_latest_analysis(scheduler, message.robot_id)
+                }
+            )
+        _publish_analysis(analysis)
         
-        # Traiter les données avec le gestionnaire de contexte
-        response = context.process_sensor_data(sensor_data)
+        if wait and await _wait_for_analysis(analysis, timeout if timeout is not None else SENSOR_ANALYSIS_TIMEOUT):
+            result = _sensor_job_response(analysis.job)
+            result.data["reflexes"] = reflexes
+            result.data["analyzed_at"] = analysis.job.finished_at.isoformat()
+            result.data["reporting"] = _reporting_hints(context)
+            return result
+        
+        data = {
+            "analysis_status": decision,
+            "anomalies": [anomaly["field"] for anomaly in anomalies],
+            "reflexes": reflexes,
+            "reporting": _reporting_hints(context),
+            **_latest_analysis(scheduler, message.robot_id)
+        }
+        if analysis.job is not None:
+            data["job_id"] = analysis.job.job_id
+            data["result_url"] = f"/api/sensors/jobs/{analysis.job.job_id}"
+        if wait:
+            # Traitement asynchrone : le résultat sera disponible plus tard
+            response.status_code = 202
+            return MCPResponse(success=True, message="Analyse des capteurs en cours", data=data)
+        return MCPResponse(success=True, message="Données des capteurs reçues", data=data)
+    except HTTPException:
+        raise
+    except MailboxFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        logger.error(f"Erreur lors du traitement des données des capteurs: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+def _apply_reflexes(context, readings: List[Tuple[Optional[datetime], Dict[str, Any]]]) -> List[str]:
+    """
+    Applique les réflexes à des lectures chronologiques (dans un thread : les
+    commandes et l'émotion des réflexes sont publiées dans le stockage d'état).
+    
+    Returns:
+        Noms des règles déclenchées
+    """
+    fired = []
+    for _, sensor_data in readings:
+        fired.extend(context.apply_reflexes(sensor_data))
+    return fired
+
+def _reporting_hints(context) -> Dict[str, Any]:
+    """Cadence d'envoi recommandée à un robot (voir `ReportingHints`)."""
+    return get_reporting_advisor().hints(context.activity.level)
+
+def _record_sensor_readings(context, readings: List[Tuple[Optional[datetime], Dict[str, Any]]]):
+    """
+    Enregistre des lectures et demande leur analyse (exécuté par l'acteur du robot).
+    
+    Returns:
+        Triplet (anomalies détectées, décision de l'ordonnanceur, analyse en attente)
+    """
+    anomalies = context.record_sensor_readings(readings)
+    decision, analysis = _submit_analysis(context, readings, anomalies)
+    return anomalies, decision, analysis
+
+def _submit_analysis(context, readings: List[Tuple[Optional[datetime], Dict[str, Any]]],
+                     anomalies: List[Dict[str, Any]]):
+    """
+    Demande l'analyse de lectures déjà enregistrées (exécuté par l'acteur du robot).
+    
+    Returns:
+        Couple (décision de l'ordonnanceur, analyse en attente)
+    """
+    return get_analysis_scheduler().submit(context, [sensor_data for _, sensor_data in readings], anomalies)
+
+async def _wait_for_analysis(analysis, timeout: float) -> bool:
+    """Attend au plus `timeout` secondes la fin d'une analyse de l'ordonnanceur."""
+    try:
+        await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(analysis.future)), timeout)
+        return True
+    except asyncio.TimeoutError:
+        return False
+
+def _latest_analysis(scheduler, robot_id: str) -> Dict[str, Any]:
+    """Dernière analyse terminée d'un robot et sa fraîcheur (champs de réponse)."""
+    latest = scheduler.latest(robot_id)
+    if latest is None:
+        return {"analysis": {}, "analyzed_at": None, "reading_received_at": None, "analysis_age": None}
+    return {
+        "analysis": latest["result"].get("analysis", {}),
+        "analyzed_at": latest["analyzed_at"],
+        "reading_received_at": latest["reading_received_at"],
+        "analysis_age": latest["analysis_age"]
+    }
+
+def _publish_analysis(analysis):
+    """Publie la tâche d'une analyse de l'ordonnanceur, si elle a été soumise au pool."""
+    if analysis.job is not None:
+        _publish_job(analysis.job)
+
+def _publish_job(job):
+    """
+    Publie l'état d'une tâche dans le stockage partagé, afin que son résultat puisse
+    être consulté via n'importe quel worker.
+    """
+    backend = get_state_backend()
+    if not backend.shared:
+        return
+    
+    def save(_future=None):
+        try:
+            backend.save_job(job.job_id, {**job.to_dict(), "result": job.result})
+        except Exception as e:
+            logger.error(f"Erreur lors de la publication de la tâche {job.job_id}: {e}")
+    
+    save()
+    job.future.add_done_callback(save)
+
+def _sensor_job_response(job) -> MCPResponse:
+    """Construit la réponse MCP d'une tâche d'analyse terminée."""
+    if job.status == "error":
+        raise HTTPException(status_code=500, detail=job.error)
+    
+    response = job.result
+    data = {"analysis": response.get("analysis", {}), "commands": response.get("commands", [])}
+    if "analysis_reused" in response:
+        data["analysis_reused"] = response["analysis_reused"]
+    if "anomalies" in response:
+        data["anomalies"] = response["anomalies"]
+    return MCPResponse(
+        success=response["success"],
+        message=response["message"],
+        data=data
+    )
+
+# Route pour recevoir un lot de données des capteurs
+@app.post("/api/sensors/batch", response_model=MCPResponse)
+async def receive_sensor_batch(
+    response: Response,
+    batch: SensorBatchMessage = Body(...),
+    wait: bool = False,
+    timeout: Optional[float] = None
+):
+    """
+    Reçoit un lot de lectures des capteurs d'un ou plusieurs robots.
+    
+    Les lectures de chaque robot sont enregistrées en une seule requête et seule
+    la plus récente est analysée par le LLM, via l'ordonnanceur des analyses. Les
+    horodatages (millisecondes depuis le démarrage du robot) sont interprétés
+    relativement à la lecture la plus récente du robot, datée de la réception du lot.
+    
+    Les paramètres `wait` et `timeout` ont le même sens que pour `/api/sensors` :
+    par défaut, la réponse est immédiate.
+    """
+    if len(batch.readings) > SENSOR_BATCH_MAX_READINGS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Lot trop volumineux ({len(batch.readings)} lectures, maximum {SENSOR_BATCH_MAX_READINGS})"
+        )
+    
+    try:
+        received_at = datetime.utcnow()
+        
+        # Regrouper les lectures par robot
+        readings_by_robot: Dict[str, List[SensorMCPMessage]] = {}
+        for reading in batch.readings:
+            readings_by_robot.setdefault(reading.robot_id, []).append(reading)
+        
+        logger.info(f"Lot de {len(batch.readings)} lecture(s) reçu pour {len(readings_by_robot)} robot(s)")
+        
+        # Enregistrer les lectures et demander une analyse par robot (acteurs des
+        # robots, en parallèle)
+        scheduler = get_analysis_scheduler()
+        actors = get_actor_system()
+        analyses = {}
+        decisions = {}
+        accepted = {}
+        reflexes: Dict[str, List[str]] = {}
+        requests = {}
+        contexts = {}
+        for robot_id, readings in readings_by_robot.items():
+            readings = sorted(readings, key=lambda reading: reading.timestamp)
+            latest = readings[-1].timestamp
+            rows = [
+                (received_at - timedelta(milliseconds=latest - reading.timestamp), reading.sensors.dict())
+                for reading in readings
+            ]
+            context = contexts[robot_id] = await _load_context(robot_id)
+            
+            # Réflexes sur chaque lecture, dans l'ordre chronologique
+            reflexes[robot_id] = await asyncio.to_thread(_apply_reflexes, context, rows)
+            
+            requests[robot_id] = actors.ask(robot_id, "sensor_batch", _record_sensor_readings, context, rows)
+            accepted[robot_id] = len(rows)
+        
+        for robot_id, (_, decision, analysis) in zip(requests, await asyncio.gather(*requests.values())):
+            decisions[robot_id], analyses[robot_id] = decision, analysis
+            _publish_analysis(analysis)
+        
+        if wait:
+            deadline = timeout if timeout is not None else SENSOR_ANALYSIS_TIMEOUT
+            await asyncio.gather(*(_wait_for_analysis(analysis, deadline) for analysis in analyses.values()))
+        
+        # Construire la réponse par robot
+        robots = {}
+        for robot_id, analysis in analyses.items():
+            job = analysis.job
+            if analysis.future.done() and job.status == "done":
+                result = job.result
+                robots[robot_id] = {
+                    "status": "done",
+                    "success": result["success"],
+                    "accepted": accepted[robot_id],
+                    "analysis": result.get("analysis", {}),
+                    "analysis_reused": result.get("analysis_reused", False),
+                    "anomalies": result.get("anomalies", []),
+                    "commands": result.get("commands", []),
+                    "analyzed_at": job.finished_at.isoformat()
+                }
+            elif analysis.future.done():
+                robots[robot_id] = {"status": "error", "success": False, "error": job.error}
+            else:
+                robots[robot_id] = {
+                    "status": job.status if job is not None else "queued",
+                    "accepted": accepted[robot_id],
+                    "analysis_status": decisions[robot_id],
+                    **_latest_analysis(scheduler, robot_id)
+                }
+                if job is not None:
+                    robots[robot_id]["job_id"] = job.job_id
+                    robots[robot_id]["result_url"] = f"/api/sensors/jobs/{job.job_id}"
+        for robot_id, fired in reflexes.items():
+            robots[robot_id]["reflexes"] = fired
+        for robot_id, context in contexts.items():
+            robots[robot_id]["reporting"] = _reporting_hints(context)
+        
+        pending = any(not analysis.future.done() for analysis in analyses.values())
+        if pending:
+            response.status_code = 202
         
         return MCPResponse(
-            success=response["success"],
-            message=response["message"],
-            data={"analysis": response.get("analysis", {}), "commands": response.get("commands", [])}
+            success=all(entry.get("success", True) for entry in robots.values()),
+            message="Lot de capteurs en cours de traitement" if pending else "Lot de capteurs traité",
+            data={"robots": robots}
         )
+    except HTTPException:
+        raise
+    except MailboxFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
-        logger.error(f"Erreur lors du traitement des données des capteurs: {e}")
+        logger.error(f"Erreur lors du traitement du lot de capteurs: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+# Route pour consulter le résultat d'une analyse asynchrone
+@app.get("/api/sensors/jobs/{job_id}", response_model=MCPResponse)
+async def get_sensor_job(job_id: str, response: Response):
+    """
+    Récupère l'état ou le résultat d'une analyse des capteurs soumise au pool d'inférence.
+    """
+    job = get_inference_pool().get_job(job_id)
+    if job is not None:
+        if job.done:
+            return _sensor_job_response(job)
+        data = job.to_dict()
+    else:
+        # Tâche soumise à un autre worker
+        stored = get_state_backend().load_job(job_id)
+        if stored is None:
+            raise HTTPException(status_code=404, detail=f"Tâche inconnue: {job_id}")
+        if stored["status"] in ("done", "error"):
+            return _sensor_job_response(SimpleNamespace(**stored))
+        data = {key: value for key, value in stored.items() if key != "result"}
+    
+    response.status_code = 202
+    return MCPResponse(
+        success=True,
+        message="Analyse des capteurs en cours",
+        data=data
+    )
+
 # Route pour recevoir l'état émotionnel
 @app.post("/api/emotion", response_model=MCPResponse)
 async def receive_emotional_state(
-    message: EmotionalMCPMessage = Body(...),
-    context = Depends(get_context)
+    message: EmotionalMCPMessage = Depends(read_emotion_message)
 ):
     """
     Reçoit l'état émotionnel du robot.
     
-    Le message doit être au format MCP (Model Context Protocol).
+    Le message doit être au format MCP (Model Context Protocol), encodé en JSON,
+    MessagePack ou trame binaire selon l'en-tête Content-Type.
+    
+    L'état est enregistré (base de données, événement et souvenir d'une émotion
+    forte) avant de passer par la boîte aux lettres du robot ; si celle-ci est
+    pleine, seule la mise à jour du contexte par le plus ancien état en attente
+    est abandonnée (`"context_status": "dropped"`), l'état plus récent en tenant lieu.
     """
     try:
         logger.info(f"État émotionnel reçu du robot {message.robot_id}")
         
         # Extraire l'état émotionnel
         emotional_state = message.emotion.dict()
+        context = await _load_context(message.robot_id)
         
-        # Traiter l'état émotionnel avec le gestionnaire de contexte
-        response = context.process_emotional_state(emotional_state)
+        # Enregistrer l'état hors de la boîte aux lettres : un état évincé par un plus
+        # récent ne perd que sa mise à jour du contexte, jamais son enregistrement
+        if not await asyncio.to_thread(context.record_emotional_state, emotional_state):
+            return MCPResponse(
+                success=False,
+                message="Erreur lors de l'enregistrement de l'état émotionnel",
+                data=None
+            )
+        
+        # Mettre à jour le contexte (acteur du robot)
+        try:
+            response = await get_actor_system().ask(
+                message.robot_id, "emotion", context.apply_emotional_state, emotional_state
+            )
+        except MessageDropped:
+            return MCPResponse(
+                success=True,
+                message="État émotionnel enregistré, remplacé dans le contexte par un état plus récent",
+                data={
+                    "type": emotional_state["type"],
+                    "intensity": emotional_state["intensity"],
+                    "acknowledged": True,
+                    "context_status": "dropped",
+                    "reporting": _reporting_hints(context)
+                }
+            )
         
         return MCPResponse(
             success=response["success"],
             message=response["message"],
-            data=response.get("emotion", {})
+            data={**response.get("emotion", {}), "reporting": _reporting_hints(context)}
         )
+    except MailboxFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Erreur lors du traitement de l'état émotionnel: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -112,16 +553,24 @@ async def receive_emotional_state(
 @app.get("/api/commands", response_model=MCPResponse)
 async def get_commands(
     robot_id: str,
+    wait: float = 0,
     context = Depends(get_context)
 ):
     """
     Récupère les commandes en attente pour le robot.
+    
+    Avec `wait` > 0, la requête est maintenue ouverte (long-poll) jusqu'à l'arrivée
+    d'une commande ou l'expiration du délai (en secondes, borné par
+    `COMMAND_LONG_POLL_MAX`).
     """
     try:
         logger.info(f"Demande de commandes pour le robot {robot_id}")
         
         # Récupérer les commandes avec le gestionnaire de contexte
-        commands = context.get_commands(robot_id)
+        if wait > 0:
+            commands = await _wait_for_commands(context, robot_id, min(wait, COMMAND_LONG_POLL_MAX))
+        else:
+            commands = await asyncio.to_thread(context.get_commands, robot_id)
         
         return MCPResponse(
             success=True,
@@ -132,6 +581,79 @@ async def get_commands(
         logger.error(f"Erreur lors de la récupération des commandes: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+async def _wait_for_commands(context, robot_id: str, timeout: float) -> List[Dict[str, Any]]:
+    """Attend au plus `timeout` secondes que des commandes soient disponibles, puis les retourne."""
+    notifier = get_command_notifier()
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    
+    while True:
+        commands = await asyncio.to_thread(context.get_commands, robot_id)
+        remaining = deadline - loop.time()
+        if commands or remaining <= 0:
+            return commands
+        await notifier.wait(robot_id, remaining)
+
+# Flux SSE des commandes d'un robot
+@app.get("/api/commands/stream")
+async def stream_commands(robot_id: str, request: Request):
+    """
+    Diffuse les commandes du robot en Server-Sent Events dès leur mise en file.
+    
+    Chaque lot de commandes est envoyé sous forme d'un événement `commands` ;
+    un commentaire de maintien est émis toutes les `COMMAND_STREAM_HEARTBEAT` secondes.
+    """
+    logger.info(f"Ouverture d'un flux SSE de commandes pour le robot {robot_id}")
+    notifier = get_command_notifier()
+    
+    async def event_stream():
+        while not await request.is_disconnected():
+            context = await _load_context(robot_id)
+            commands = await asyncio.to_thread(context.get_commands, robot_id)
+            if commands:
+                yield f"event: commands\ndata: {json.dumps(commands)}\n\n"
+            elif not await notifier.wait(robot_id, COMMAND_STREAM_HEARTBEAT):
+                yield ": keep-alive\n\n"
+        logger.info(f"Fermeture du flux SSE de commandes du robot {robot_id}")
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# Flux WebSocket des commandes d'un robot
+@app.websocket("/ws/commands/{robot_id}")
+async def websocket_commands(websocket: WebSocket, robot_id: str):
+    """
+    Pousse les commandes du robot sur un WebSocket dès leur mise en file.
+    
+    Messages envoyés : `{"type": "commands", "commands": [...]}` et
+    `{"type": "heartbeat", "timestamp": ...}`.
+    """
+    await websocket.accept()
+    logger.info(f"Ouverture d'un WebSocket de commandes pour le robot {robot_id}")
+    notifier = get_command_notifier()
+    
+    try:
+        while True:
+            context = await _load_context(robot_id)
+            commands = await asyncio.to_thread(context.get_commands, robot_id)
+            if commands:
+                try:
+                    await websocket.send_json({"type": "commands", "commands": commands})
+                except Exception:
+                    # Remettre en file les commandes non délivrées
+                    for command in commands:
+                        await asyncio.to_thread(context.add_command, command)
+                    raise
+            elif not await notifier.wait(robot_id, COMMAND_STREAM_HEARTBEAT):
+                await websocket.send_json({"type": "heartbeat", "timestamp": datetime.utcnow().isoformat()})
+    except WebSocketDisconnect:
+        logger.info(f"WebSocket de commandes du robot {robot_id} fermé")
+    except Exception as e:
+        logger.error(f"Erreur sur le WebSocket de commandes du robot {robot_id}: {e}")
+
 # Route pour envoyer manuellement une commande au robot
 @app.post("/api/send_command", response_model=MCPResponse)
 async def send_command(
@@ -147,8 +669,8 @@ async def send_command(
     try:
         logger.info(f"Envoi d'une commande manuelle au robot {robot_id}")
         
-        # Ajouter la commande avec le gestionnaire de contexte
-        success = context.add_command(command.dict())
+        # Ajouter la commande avec le gestionnaire de contexte (acteur du robot)
+        success = await get_actor_system().ask(robot_id, "command", context.add_command, command.dict())
         
         if success:
             return MCPResponse(
@@ -178,31 +700,100 @@ async def get_robot_status(
     try:
         logger.info(f"Demande de l'état actuel du robot {robot_id}")
         
-        # Vérifier que le robot correspond à celui géré par le contexte
-        if robot_id != context.robot_id:
-            return MCPResponse(
-                success=False,
-                message=f"Robot inconnu: {robot_id}",
-                data=None
-            )
-        
-        # Récupérer le contexte actuel
-        current_context = context.current_context
+        # Récupérer le contexte actuel (copié sous le verrou du robot : une analyse
+        # peut ajouter un événement au même moment)
+        with context.lock:
+            current_context = context.current_context
+            data = {
+                "sensors": current_context.get("sensors", {}),
+                "emotion": get_emotion_model().read(current_context.get("emotion")),
+                "recent_events": list(current_context.get("recent_events", [])),
+                "last_interaction": current_context.get("last_interaction", None)
+            }
         
         return MCPResponse(
             success=True,
             message="État du robot récupéré avec succès",
-            data={
-                "sensors": current_context.get("sensors", {}),
-                "emotion": current_context.get("emotion", {}),
-                "recent_events": current_context.get("recent_events", []),
-                "last_interaction": current_context.get("last_interaction", None)
-            }
+            data=data
         )
     except Exception as e:
         logger.error(f"Erreur lors de la récupération de l'état du robot: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+# Route pour obtenir les caractéristiques des dernières lectures des capteurs
+@app.get("/api/robot_features/{robot_id}", response_model=MCPResponse)
+async def get_robot_features(
+    robot_id: str,
+    context = Depends(get_context)
+):
+    """
+    Récupère les caractéristiques des dernières lectures des capteurs du robot :
+    dernière valeur, moyenne, minimum, maximum et pente (par seconde) de chaque
+    champ, et nombre d'événements (fronts montants des booléens).
+    """
+    try:
+        return MCPResponse(
+            success=True,
+            message="Caractéristiques des capteurs récupérées avec succès",
+            data=context.get_sensor_features()
+        )
+    except Exception as e:
+        logger.error(f"Erreur lors de la récupération des caractéristiques des capteurs: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Unités des périodes d'historique (`15m`, `1h`, `7d`...), en secondes
+_PERIOD_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+# Nombre maximal de points d'un historique des capteurs
+MAX_HISTORY_POINTS = 1000
+
+def _parse_period(period: str) -> timedelta:
+    """Convertit une période (`15m`, `1h`, `7d`...) en durée (ValueError si elle est invalide)."""
+    period = period.strip().lower()
+    if len(period) < 2 or period[-1] not in _PERIOD_UNITS or not period[:-1].isdigit() or int(period[:-1]) <= 0:
+        raise ValueError(f"Période invalide: {period}")
+    return timedelta(seconds=int(period[:-1]) * _PERIOD_UNITS[period[-1]])
+
+# Route pour obtenir l'historique des capteurs
+@app.get("/api/sensor_history/{robot_id}", response_model=MCPResponse)
+async def get_sensor_history(robot_id: str, period: str = "1h", points: int = 60):
+    """
+    Récupère l'historique des capteurs du robot : moyenne, minimum, maximum et
+    nombre de lectures de chaque champ, en `points` intervalles sur `period`.
+    L'historique est lu dans l'agrégat (1 minute, 1 heure) le plus grossier qui
+    fournit la résolution demandée.
+    """
+    try:
+        duration = _parse_period(period)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not 1 <= points <= MAX_HISTORY_POINTS:
+        raise HTTPException(status_code=400, detail=f"Nombre de points invalide (1 à {MAX_HISTORY_POINTS})")
+    try:
+        from memoire.db_manager import get_async_db_manager
+        history = await get_async_db_manager().get_sensor_history(robot_id, duration, points)
+        return MCPResponse(
+            success=True,
+            message="Historique des capteurs récupéré avec succès",
+            data=history
+        )
+    except Exception as e:
+        logger.error(f"Erreur lors de la récupération de l'historique des capteurs: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Route pour lister les robots connus du serveur
+@app.get("/api/robots", response_model=MCPResponse)
+async def list_robots():
+    """
+    Liste les robots dont le contexte est actif ou évincé, avec les statistiques du registre.
+    """
+    registry = get_context_registry()
+    return MCPResponse(
+        success=True,
+        message="Robots récupérés avec succès",
+        data={"robots": registry.robot_ids(), "registry": registry.stats()}
+    )
+
 # Route pour ajouter une interaction manuelle
 @app.post("/api/interaction", response_model=MCPResponse)
 async def add_interaction(
@@ -218,16 +809,10 @@ async def add_interaction(
     try:
         logger.info(f"Ajout d'une interaction manuelle pour le robot {robot_id}")
         
-        # Vérifier que le robot correspond à celui géré par le contexte
-        if robot_id != context.robot_id:
-            return MCPResponse(
-                success=False,
-                message=f"Robot inconnu: {robot_id}",
-                data=None
-            )
-        
-        # Ajouter l'interaction avec le gestionnaire de contexte
-        success = context.add_interaction(interaction_type, content, metadata)
+        # Ajouter l'interaction avec le gestionnaire de contexte (acteur du robot)
+        success = await get_actor_system().ask(
+            robot_id, "interaction", context.add_interaction, interaction_type, content, metadata
+        )
         
         if success:
             return MCPResponse(
@@ -245,6 +830,92 @@ async def add_interaction(
         logger.error(f"Erreur lors de l'ajout d'une interaction: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+# Route d'exposition des métriques au format Prometheus
+@app.get("/metrics")
+async def metrics():
+    """
+    Expose les métriques du serveur au format texte Prometheus : latence des
+    requêtes par route, durée des étapes du traitement des capteurs, débit du LLM
+    (tokens/s) et profondeur des files d'attente.
+    """
+    return Response(content=get_metrics_registry().render(), media_type=CONTENT_TYPE_PROMETHEUS)
+
+# Jauges calculées à chaque collecte des métriques
+@app.on_event("startup")
+async def register_queue_gauges():
+    pool = get_inference_pool()
+    INFERENCE_QUEUE_DEPTH.set_function(lambda: pool.queue_depth)
+    INFERENCE_RUNNING.set_function(lambda: pool.running)
+    COMMAND_WAITERS.set_function(get_command_notifier().waiting)
+    ACTIVE_CONTEXTS.set_function(get_context_registry().active_count)
+    actors = get_actor_system()
+    ACTIVE_ACTORS.set_function(actors.active_count)
+    ACTOR_MAILBOX_MAX_DEPTH.set_function(actors.max_depth)
+    for kind in MAILBOX_POLICIES:
+        ACTOR_MAILBOX_DEPTH.set_function(lambda kind=kind: actors.depth(kind), kind)
+
+# Raccordement du notificateur de commandes à la boucle d'événements
+@app.on_event("startup")
+async def start_command_notifier():
+    notifier = get_command_notifier()
+    notifier.attach(asyncio.get_running_loop())
+    get_context_registry().set_command_listener(notifier.notify)
+    
+    # Stockage partagé : des commandes peuvent être mises en file par d'autres workers
+    backend = get_state_backend()
+    if backend.shared:
+        notifier.set_probe(backend.has_commands)
+
+# Démarrage à chaud : contextes restaurés depuis le fichier des instantanés et LLM
+# chargé en arrière-plan, le serveur répondant déjà aux requêtes
+@app.on_event("startup")
+async def warm_start_contexts():
+    registry = get_context_registry()
+    await asyncio.to_thread(registry.warm_start)
+    app.state.checkpoint_task = asyncio.create_task(checkpoint_contexts(registry))
+    if LLM_PRELOAD:
+        asyncio.get_running_loop().run_in_executor(None, preload_llm)
+
+async def checkpoint_contexts(registry):
+    """Écrit périodiquement les instantanés des contextes."""
+    while True:
+        await asyncio.sleep(CONTEXT_SNAPSHOT_INTERVAL)
+        await asyncio.to_thread(registry.checkpoint)
+
+# Maintenance des partitions de la base de données (prochaines partitions, rétention)
+@app.on_event("startup")
+async def start_db_maintenance():
+    from memoire.db_manager import db_manager, DB_MAINTENANCE_INTERVAL
+    if DB_MAINTENANCE_INTERVAL > 0:
+        app.state.maintenance_task = asyncio.create_task(maintain_database(db_manager, DB_MAINTENANCE_INTERVAL))
+
+async def maintain_database(db, interval: float):
+    """Maintient périodiquement les partitions de la base de données."""
+    while True:
+        try:
+            await asyncio.to_thread(db.maintain_partitions)
+        except Exception as e:
+            logger.error(f"Erreur lors de la maintenance des partitions: {e}")
+        await asyncio.sleep(interval)
+
+# Arrêt propre du pool d'inférence
+@app.on_event("shutdown")
+async def shutdown_inference_pool():
+    get_inference_pool().shutdown(wait=False)
+    await get_actor_system().shutdown()
+    # Arrêter les tâches périodiques, puis dernier instantané des contextes
+    for name in ("checkpoint_task", "maintenance_task"):
+        task = getattr(app.state, name, None)
+        if task is not None:
+            task.cancel()
+    await asyncio.to_thread(get_context_registry().checkpoint)
+    get_state_backend().close()
+    # Écrire en base de données les lignes encore en attente
+    await asyncio.to_thread(get_write_behind().shutdown)
+    # Fermer les connexions du moteur asynchrone
+    from memoire.db_manager import get_async_db_manager
+    await get_async_db_manager().dispose()
+
 # Route principale pour vérifier que le serveur fonctionne
 @app.get("/")
 async def root():
@@ -253,13 +924,22 @@ async def root():
         "name": "Serveur MCP (Model Context Protocol)",
         "status": "online",
         "version": "1.0.0",
+        "content_types": supported_content_types(),
         "endpoints": [
             {"path": "/api/ping", "method": "GET", "description": "Vérifier la connectivité"},
             {"path": "/api/sensors", "method": "POST", "description": "Recevoir les données des capteurs"},
+            {"path": "/api/sensors/batch", "method": "POST", "description": "Recevoir un lot de données des capteurs"},
+            {"path": "/api/sensors/jobs/{job_id}", "method": "GET", "description": "Obtenir le résultat d'une analyse des capteurs"},
             {"path": "/api/emotion", "method": "POST", "description": "Recevoir l'état émotionnel"},
-            {"path": "/api/commands", "method": "GET", "description": "Obtenir les commandes"},
+            {"path": "/api/commands", "method": "GET", "description": "Obtenir les commandes (long-poll avec ?wait=)"},
+            {"path": "/api/commands/stream", "method": "GET", "description": "Flux SSE des commandes"},
+            {"path": "/ws/commands/{robot_id}", "method": "WEBSOCKET", "description": "Flux WebSocket des commandes"},
             {"path": "/api/send_command", "method": "POST", "description": "Envoyer une commande manuelle"},
             {"path": "/api/robot_status/{robot_id}", "method": "GET", "description": "Obtenir l'état du robot"},
-            {"path": "/api/interaction", "method": "POST", "description": "Ajouter une interaction manuelle"}
+            {"path": "/api/robot_features/{robot_id}", "method": "GET", "description": "Obtenir les tendances des capteurs du robot"},
+            {"path": "/api/sensor_history/{robot_id}", "method": "GET", "description": "Obtenir l'historique agrégé des capteurs"},
+            {"path": "/api/robots", "method": "GET", "description": "Lister les robots connus"},
+            {"path": "/api/interaction", "method": "POST", "description": "Ajouter une interaction manuelle"},
+            {"path": "/metrics", "method": "GET", "description": "Métriques au format Prometheus"}
         ]
     }
@@ -0,0 +1,452 @@
+import os
+import time
+import threading
+import logging
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, List, Tuple, Callable, Optional, Iterable
+
+# Configuration du logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Activation de la collecte des métriques
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# Bornes (secondes) des histogrammes de latence : de la milliseconde à la génération LLM
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Type de contenu du format texte Prometheus
+CONTENT_TYPE_PROMETHEUS = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    """Échappe une valeur d'étiquette pour le format texte Prometheus."""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    """Formate les étiquettes d'un échantillon (`{a="x",b="y"}`)."""
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    """Formate une valeur numérique (entiers sans décimale)."""
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """Base des métriques : nom, aide, étiquettes et verrou."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, label_names: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+
+    def _key(self, label_values: Tuple) -> Tuple[str, ...]:
+        if len(label_values) != len(self.label_names):
+            raise ValueError(f"{self.name}: {len(self.label_names)} étiquette(s) attendue(s)")
+        return tuple(str(value) for value in label_values)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        """Rend la métrique au format texte Prometheus."""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Compteur monotone."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, label_names: Iterable[str] = ()):
+        super().__init__(name, documentation, label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, *label_values):
+        """Incrémente le compteur."""
+        key = self._key(label_values)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, *label_values) -> float:
+        with self._lock:
+            return self._values.get(self._key(label_values), 0.0)
+
+    def total(self, **label_filter) -> float:
+        """Somme des séries dont les étiquettes correspondent au filtre."""
+        positions = {self.label_names.index(name): str(value) for name, value in label_filter.items()}
+        with self._lock:
+            return sum(
+                value for key, value in self._values.items()
+                if all(key[position] == expected for position, expected in positions.items())
+            )
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}" for key, value in items]
+
+
+class Gauge(_Metric):
+    """
+    Jauge : valeur instantanée, fixée explicitement ou calculée à la lecture
+    par une fonction (`set_function`), ce qui ne coûte rien hors des collectes.
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, label_names: Iterable[str] = ()):
+        super().__init__(name, documentation, label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._functions: Dict[Tuple[str, ...], Callable[[], float]] = {}
+
+    def set(self, value: float, *label_values):
+        """Fixe la valeur de la jauge."""
+        key = self._key(label_values)
+        with self._lock:
+            self._values[key] = value
+
+    def set_function(self, function: Callable[[], float], *label_values):
+        """Calcule la valeur de la jauge à chaque collecte."""
+        key = self._key(label_values)
+        with self._lock:
+            self._functions[key] = function
+
+    def value(self, *label_values) -> float:
+        key = self._key(label_values)
+        with self._lock:
+            function = self._functions.get(key)
+            if function is None:
+                return self._values.get(key, 0.0)
+        return function()
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = dict(self._values)
+            functions = dict(self._functions)
+        for key, function in functions.items():
+            try:
+                values[key] = function()
+            except Exception as e:
+                logger.error(f"Erreur lors du calcul de la jauge {self.name}: {e}")
+        return [
+            f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}"
+            for key, value in sorted(values.items())
+        ]
+
+
+class Histogram(_Metric):
+    """Histogramme à bornes fixes (format cumulatif `_bucket`, `_sum`, `_count`)."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, label_names: Iterable[str] = (),
+                 buckets: Iterable[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+        # Par étiquettes : [comptes par borne (+Inf en dernier), somme, nombre]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *label_values):
+        """Enregistre une observation."""
+        key = self._key(label_values)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    @contextmanager
+    def time(self, *label_values):
+        """Mesure la durée d'un bloc de code."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *label_values)
+
+    def count(self, *label_values) -> int:
+        with self._lock:
+            entry = self._values.get(self._key(label_values))
+            return entry[2] if entry else 0
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, (list(entry[0]), entry[1], entry[2])) for key, entry in self._values.items())
+        lines = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound!r}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, le)} {cumulative}")
+            labels = _format_labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Registre des métriques exposées sur /metrics."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, label_names: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, label_names))
+
+    def gauge(self, name: str, documentation: str, label_names: Iterable[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, label_names))
+
+    def histogram(self, name: str, documentation: str, label_names: Iterable[str] = (),
+                  buckets: Iterable[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, label_names, buckets))
+
+    def render(self) -> str:
+        """Rend toutes les métriques au format texte Prometheus."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI mesurant la latence des requêtes HTTP par route.
+
+    La durée mesurée va de la réception de la requête à l'envoi de l'en-tête de
+    la réponse ; pour les flux (SSE), elle ne comprend donc pas la durée du flux.
+    Les routes sont identifiées par leur modèle (`/api/robot_status/{robot_id}`)
+    afin de borner le nombre de séries.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        recorded = False
+
+        def record(status: int):
+            nonlocal recorded
+            if recorded:
+                return
+            recorded = True
+            route = scope.get("route")
+            if route is not None:
+                path = getattr(route, "path", "unmatched")
+            else:
+                endpoint = scope.get("endpoint")
+                path = getattr(endpoint, "__name__", "unmatched")
+            HTTP_REQUEST_LATENCY.observe(time.perf_counter() - start, scope["method"], path, str(status))
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                record(message["status"])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            record(500)
+            raise
+
+
+# Instancier le registre des métriques
+metrics_registry = MetricsRegistry()
+
+def get_metrics_registry() -> MetricsRegistry:
+    """Retourne le registre des métriques."""
+    return metrics_registry
+
+# Métriques du serveur MCP
+HTTP_REQUEST_LATENCY = metrics_registry.histogram(
+    "mcp_http_request_duration_seconds", "Latence des requêtes HTTP par route",
+    ("method", "route", "status")
+)
+SENSOR_STAGE_LATENCY = metrics_registry.histogram(
+    "mcp_sensor_stage_duration_seconds",
+    "Durée des étapes du traitement des capteurs (decode, reflex, db_write, prompt_build, llm_lock_wait, generation, json_parse, command_generation)",
+    ("stage",)
+)
+INFERENCE_QUEUE_WAIT = metrics_registry.histogram(
+    "mcp_inference_queue_wait_seconds", "Temps d'attente des tâches avant leur exécution par le pool d'inférence"
+)
+LLM_COMPLETION_TOKENS = metrics_registry.counter(
+    "mcp_llm_completion_tokens_total", "Nombre de tokens générés par le LLM"
+)
+LLM_GENERATION_SECONDS = metrics_registry.counter(
+    "mcp_llm_generation_seconds_total", "Temps total passé en génération par le LLM"
+)
+LLM_TOKENS_PER_SECOND = metrics_registry.gauge(
+    "mcp_llm_tokens_per_second", "Débit de la dernière génération du LLM (tokens/s)"
+)
+INFERENCE_QUEUE_DEPTH = metrics_registry.gauge(
+    "mcp_inference_queue_depth", "Nombre de tâches en attente dans le pool d'inférence"
+)
+INFERENCE_RUNNING = metrics_registry.gauge(
+    "mcp_inference_running", "Nombre de tâches en cours d'exécution dans le pool d'inférence"
+)
+COMMAND_WAITERS = metrics_registry.gauge(
+    "mcp_command_waiters", "Nombre de clients en attente de commandes (long-poll, SSE, WebSocket)"
+)
+ACTIVE_CONTEXTS = metrics_registry.gauge(
+    "mcp_active_contexts", "Nombre de contextes de robots actifs dans ce worker"
+)
+ACTIVE_ACTORS = metrics_registry.gauge(
+    "mcp_active_actors", "Nombre d'acteurs de robots en cours d'exécution dans ce worker"
+)
+ACTOR_MAILBOX_DEPTH = metrics_registry.gauge(
+    "mcp_actor_mailbox_depth", "Nombre de messages en attente dans les boîtes aux lettres des robots, par type",
+    ("kind",)
+)
+ACTOR_MAILBOX_MAX_DEPTH = metrics_registry.gauge(
+    "mcp_actor_mailbox_max_depth", "Profondeur de la boîte aux lettres de robot la plus remplie"
+)
+ACTOR_MESSAGES_DROPPED = metrics_registry.counter(
+    "mcp_actor_messages_dropped_total",
+    "Messages évincés (drop_oldest) ou refusés (reject) par une boîte aux lettres pleine",
+    ("kind", "policy")
+)
+SENSOR_ANALYSIS_DECISIONS = metrics_registry.counter(
+    "mcp_sensor_analysis_decisions_total",
+    "Décisions du filtre de changement significatif (analyzed ou skipped) et leur raison",
+    ("decision", "reason")
+)
+SENSOR_ANALYSIS_SKIP_RATIO = metrics_registry.gauge(
+    "mcp_sensor_analysis_skip_ratio", "Part des lectures de capteurs traitées sans appel au LLM"
+)
+
+SENSOR_ANALYSIS_SCHEDULED = metrics_registry.counter(
+    "mcp_sensor_analysis_scheduled_total",
+    "Lectures de capteurs soumises à l'ordonnanceur des analyses, par décision (started, queued ou merged)",
+    ("decision",)
+)
+
+
+def _skip_ratio() -> float:
+    total = SENSOR_ANALYSIS_DECISIONS.total()
+    return SENSOR_ANALYSIS_DECISIONS.total(decision="skipped") / total if total else 0.0
+
+SENSOR_ANALYSIS_SKIP_RATIO.set_function(_skip_ratio)
+
+
+REFLEXES_FIRED = metrics_registry.counter(
+    "mcp_reflexes_fired_total", "Nombre de déclenchements des règles de réflexe", ("rule",)
+)
+
+
+ANOMALIES_DETECTED = metrics_registry.counter(
+    "mcp_anomalies_detected_total", "Nombre d'anomalies détectées dans les données des capteurs", ("field",)
+)
+
+
+COMMANDS_DROPPED = metrics_registry.counter(
+    "mcp_commands_dropped_total",
+    "Nombre de commandes en attente abandonnées avant leur livraison (expired ou superseded)",
+    ("reason",)
+)
+
+
+def record_dropped_commands(dropped: Dict[str, int]):
+    """Enregistre les commandes abandonnées par la file des commandes."""
+    if METRICS_ENABLED:
+        for reason, count in dropped.items():
+            if count:
+                COMMANDS_DROPPED.inc(count, reason)
+
+
+def record_anomalies(fields: List[str]):
+    """Enregistre la détection d'anomalies."""
+    if METRICS_ENABLED:
+        for field in fields:
+            ANOMALIES_DETECTED.inc(1, field)
+
+
+def record_reflexes(rules: List[str]):
+    """Enregistre le déclenchement de règles de réflexe."""
+    if METRICS_ENABLED:
+        for rule in rules:
+            REFLEXES_FIRED.inc(1, rule)
+
+
+def record_analysis_schedule(decision: str):
+    """Enregistre une décision de l'ordonnanceur des analyses (started, queued ou merged)."""
+    if METRICS_ENABLED:
+        SENSOR_ANALYSIS_SCHEDULED.inc(1, decision)
+
+
+def record_mailbox_drop(kind: str, policy: str):
+    """Enregistre un message évincé ou refusé par une boîte aux lettres pleine."""
+    if METRICS_ENABLED:
+        ACTOR_MESSAGES_DROPPED.inc(1, kind, policy)
+
+
+def record_analysis_decision(decision: str, reason: str):
+    """Enregistre une décision du filtre de changement significatif."""
+    if METRICS_ENABLED:
+        SENSOR_ANALYSIS_DECISIONS.inc(1, decision, reason)
+
+
+def observe_stage(stage: str, seconds: float):
+    """Enregistre la durée d'une étape du traitement des capteurs."""
+    if METRICS_ENABLED:
+        SENSOR_STAGE_LATENCY.observe(seconds, stage)
+
+
+@contextmanager
+def stage_timer(stage: str):
+    """Mesure la durée d'une étape du traitement des capteurs."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, time.perf_counter() - start)
+
+
+def observe_llm_timings(timings: Optional[Dict[str, float]]):
+    """
+    Enregistre les mesures d'une analyse LLM (voir `LLMManager.analyze_sensors`).
+
+    Args:
+        timings: Durées des étapes (secondes) et nombre de tokens générés
+    """
+    if not timings or not METRICS_ENABLED:
+        return
+    for stage in ("prompt_build", "llm_lock_wait", "generation", "json_parse"):
+        if stage in timings:
+            SENSOR_STAGE_LATENCY.observe(timings[stage], stage)
+    tokens = timings.get("completion_tokens")
+    generation = timings.get("generation")
+    if tokens and generation:
+        LLM_COMPLETION_TOKENS.inc(tokens)
+        LLM_GENERATION_SECONDS.inc(generation)
+        LLM_TOKENS_PER_SECOND.set(tokens / generation)
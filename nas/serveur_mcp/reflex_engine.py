@@ -0,0 +1,251 @@
+import os
+import json
+import time
+import operator
+import threading
+import logging
+from typing import Dict, List, Any, Optional, Callable, Tuple
+
+# Configuration du logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Fichier des règles de réflexes (rechargé à chaud lorsqu'il est modifié)
+REFLEX_RULES_PATH = os.environ.get(
+    "REFLEX_RULES_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "config", "reflexes.json")
+)
+
+# Intervalle minimal (secondes) entre deux vérifications de la date de modification du fichier
+REFLEX_RELOAD_INTERVAL = float(os.environ.get("REFLEX_RELOAD_INTERVAL", "1"))
+
+# Opérateurs de comparaison utilisables dans les conditions
+_OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    "eq": operator.eq,
+    "ne": operator.ne,
+    "lt": operator.lt,
+    "le": operator.le,
+    "gt": operator.gt,
+    "ge": operator.ge
+}
+
+
+def _copy_command(command: Dict[str, Any]) -> Dict[str, Any]:
+    """Copie une commande (deux niveaux, comme RobotCommand), plus rapide que deepcopy."""
+    return {key: dict(value) if isinstance(value, dict) else value for key, value in command.items()}
+
+
+class ReflexRuleError(ValueError):
+    """Levée lorsqu'une règle de réflexe est invalide."""
+
+
+def _compile_getter(path: str) -> Callable[[Dict[str, Any]], Any]:
+    """Compile l'accès à un champ désigné par un chemin pointé (`vision.distance`)."""
+    parts = tuple(path.split("."))
+
+    def getter(sensor_data: Dict[str, Any]) -> Any:
+        value = sensor_data
+        for part in parts:
+            value = value[part]
+        return value
+
+    return getter
+
+
+def _compile_condition(path: str, expected: Any) -> Callable[[Dict[str, Any]], bool]:
+    """
+    Compile une condition sur un champ.
+
+    `expected` est soit une valeur (égalité), soit un dictionnaire d'opérateurs
+    (`{"gt": 0, "lt": 15}`), tous devant être vérifiés.
+    """
+    getter = _compile_getter(path)
+
+    if isinstance(expected, dict):
+        checks: List[Tuple[Callable[[Any, Any], bool], Any]] = []
+        for name, operand in expected.items():
+            if name not in _OPERATORS:
+                raise ReflexRuleError(f"Opérateur inconnu pour {path}: {name}")
+            checks.append((_OPERATORS[name], operand))
+
+        def condition(sensor_data: Dict[str, Any]) -> bool:
+            value = getter(sensor_data)
+            for compare, operand in checks:
+                if not compare(value, operand):
+                    return False
+            return True
+    else:
+        def condition(sensor_data: Dict[str, Any]) -> bool:
+            return getter(sensor_data) == expected
+
+    return condition
+
+
+class ReflexRule:
+    """Règle de réflexe compilée."""
+
+    def __init__(self, definition: Dict[str, Any]):
+        try:
+            self.name = definition["name"]
+            when = definition["when"]
+        except KeyError as e:
+            raise ReflexRuleError(f"Champ obligatoire manquant dans une règle de réflexe: {e}")
+        if not when:
+            raise ReflexRuleError(f"La règle {self.name} n'a aucune condition")
+
+        self.description = definition.get("description", "")
+        self.priority = definition.get("priority", 0)
+        self.cooldown = float(definition.get("cooldown", 0))
+        self.emotion = definition.get("emotion")
+        self.commands = definition.get("commands", [])
+        self._conditions = tuple(_compile_condition(path, expected) for path, expected in when.items())
+
+    def matches(self, sensor_data: Dict[str, Any]) -> bool:
+        """Indique si les données des capteurs vérifient toutes les conditions de la règle."""
+        try:
+            for condition in self._conditions:
+                if not condition(sensor_data):
+                    return False
+            return True
+        except (KeyError, TypeError):
+            # Champ absent ou de type inattendu : la règle ne s'applique pas
+            return False
+
+
+class ReflexEngine:
+    """
+    Moteur de réflexes déterministe.
+
+    Les règles, déclarées dans un fichier JSON, associent des conditions sur les
+    données des capteurs (`SensorDataPayload`) à une émotion et à des commandes.
+    Elles sont compilées en fonctions et évaluées en quelques microsecondes, avant
+    l'analyse par le LLM, qui affine ensuite la réaction. Le fichier est rechargé
+    à chaud lorsqu'il est modifié ; en cas d'erreur, les règles précédentes sont
+    conservées.
+    """
+
+    def __init__(self, path: Optional[str] = REFLEX_RULES_PATH, reload_interval: float = REFLEX_RELOAD_INTERVAL,
+                 rules: Optional[List[Dict[str, Any]]] = None):
+        """
+        Initialise le moteur de réflexes.
+
+        Args:
+            path: Fichier JSON des règles (None pour n'utiliser que `rules`)
+            reload_interval: Intervalle minimal (secondes) entre deux vérifications du fichier
+            rules: Définitions de règles à utiliser à la place du fichier
+        """
+        self.path = path if rules is None else None
+        self.reload_interval = reload_interval
+        self._lock = threading.Lock()
+        self._rules: Tuple[ReflexRule, ...] = ()
+        self._mtime: Optional[float] = None
+        self._checked_at = 0.0
+
+        if rules is not None:
+            self._rules = self.compile(rules)
+        else:
+            self.reload()
+
+    @staticmethod
+    def compile(definitions: List[Dict[str, Any]]) -> Tuple[ReflexRule, ...]:
+        """
+        Compile des définitions de règles, triées par priorité décroissante.
+
+        Raises:
+            ReflexRuleError: si une règle est invalide
+        """
+        rules = [ReflexRule(definition) for definition in definitions]
+        return tuple(sorted(rules, key=lambda rule: rule.priority, reverse=True))
+
+    def reload(self) -> bool:
+        """
+        Recharge les règles depuis le fichier.
+
+        Returns:
+            True si les règles ont été rechargées, False sinon
+        """
+        if not self.path:
+            return False
+        try:
+            mtime = os.path.getmtime(self.path)
+            with open(self.path, "r", encoding="utf-8") as f:
+                rules = self.compile(json.load(f).get("rules", []))
+        except FileNotFoundError:
+            logger.warning(f"Fichier des règles de réflexes introuvable: {self.path}")
+            return False
+        except Exception as e:
+            logger.error(f"Erreur lors du chargement des règles de réflexes ({self.path}): {e}")
+            return False
+
+        with self._lock:
+            self._rules = rules
+            self._mtime = mtime
+        logger.info(f"{len(rules)} règle(s) de réflexe chargée(s) depuis {self.path}")
+        return True
+
+    def _maybe_reload(self):
+        """Recharge le fichier des règles s'il a été modifié."""
+        now = time.monotonic()
+        if not self.path or now - self._checked_at < self.reload_interval:
+            return
+        self._checked_at = now
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return
+        if mtime != self._mtime:
+            self.reload()
+
+    @property
+    def rules(self) -> Tuple[ReflexRule, ...]:
+        """Règles compilées, par priorité décroissante."""
+        return self._rules
+
+    def evaluate(self, sensor_data: Dict[str, Any], last_fired: Dict[str, float],
+                 now: Optional[float] = None) -> Tuple[List[str], List[Dict[str, Any]]]:
+        """
+        Évalue les règles sur des données de capteurs.
+
+        L'émotion retenue est celle de la règle déclenchée la plus prioritaire ;
+        les commandes de toutes les règles déclenchées sont conservées, par
+        priorité décroissante. Une règle ne se redéclenche pas avant la fin de son
+        délai `cooldown`.
+
+        Args:
+            sensor_data: Données des capteurs
+            last_fired: Dates (time.monotonic) du dernier déclenchement de chaque
+                règle pour ce robot ; mis à jour par l'appel
+            now: Date courante (time.monotonic par défaut)
+
+        Returns:
+            Couple (noms des règles déclenchées, commandes à envoyer)
+        """
+        self._maybe_reload()
+        if now is None:
+            now = time.monotonic()
+
+        fired: List[str] = []
+        commands: List[Dict[str, Any]] = []
+        emotion = None
+        for rule in self._rules:
+            previous = last_fired.get(rule.name)
+            if previous is not None and now - previous < rule.cooldown:
+                continue
+            if not rule.matches(sensor_data):
+                continue
+            last_fired[rule.name] = now
+            fired.append(rule.name)
+            if emotion is None and rule.emotion:
+                emotion = rule.emotion
+            commands.extend(_copy_command(command) for command in rule.commands)
+
+        if emotion is not None:
+            commands.insert(0, {"command_type": "emotion", "emotion": dict(emotion)})
+        return fired, commands
+
+
+# Instancier le moteur de réflexes
+reflex_engine = ReflexEngine()
+
+def get_reflex_engine() -> ReflexEngine:
+    """Retourne l'instance du moteur de réflexes."""
+    return reflex_engine
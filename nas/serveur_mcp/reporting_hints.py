@@ -0,0 +1,167 @@
+import os
+import time
+import threading
+import logging
+from typing import Dict, Any, Optional
+
+from significance import reading_change
+from inference_pool import get_inference_pool
+from analysis_scheduler import get_analysis_scheduler
+
+# Configuration du logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Bornes (millisecondes) de l'intervalle d'envoi recommandé aux robots
+REPORT_INTERVAL_MIN = int(os.environ.get("REPORT_INTERVAL_MIN", "1000"))
+REPORT_INTERVAL_MAX = int(os.environ.get("REPORT_INTERVAL_MAX", "15000"))
+
+# Charge (LLM ou CPU, 1 = saturé) au-delà de laquelle les robots sont ralentis
+REPORT_LOAD_THRESHOLD = float(os.environ.get("REPORT_LOAD_THRESHOLD", "0.7"))
+
+# Poids d'une nouvelle lecture dans la mesure d'activité d'un robot
+REPORT_ACTIVITY_ALPHA = float(os.environ.get("REPORT_ACTIVITY_ALPHA", "0.2"))
+
+# Durée (secondes) pendant laquelle la mesure de la charge est réutilisée
+REPORT_LOAD_REFRESH = float(os.environ.get("REPORT_LOAD_REFRESH", "1"))
+
+
+class ActivityMeter:
+    """
+    Activité d'un robot : moyenne exponentielle de la part de ses lectures qui
+    diffèrent de la précédente (front ou variation supérieure à la bande morte
+    du filtre de changement significatif). 0 pour un robot immobile dans une
+    pièce calme, proche de 1 pour un robot dont l'état change à chaque lecture.
+    """
+
+    def __init__(self, alpha: float = REPORT_ACTIVITY_ALPHA, config: Optional[Dict[str, Any]] = None):
+        self.alpha = alpha
+        self.config = config
+        self.level = 0.0
+        self._previous: Optional[Dict[str, Any]] = None
+
+    def update(self, sensor_data: Dict[str, Any]) -> float:
+        """
+        Ajoute une lecture à la mesure.
+
+        Args:
+            sensor_data: Données des capteurs
+
+        Returns:
+            Activité mise à jour (0-1)
+        """
+        if self._previous is not None:
+            changed = reading_change(self._previous, sensor_data, self.config) is not None
+            self.level += self.alpha * (float(changed) - self.level)
+        self._previous = sensor_data
+        return self.level
+
+
+def _cpu_load() -> float:
+    """Charge moyenne du système sur une minute, rapportée au nombre de processeurs."""
+    try:
+        return os.getloadavg()[0] / (os.cpu_count() or 1)
+    except (AttributeError, OSError):
+        # os.getloadavg n'existe pas sous Windows
+        return 0.0
+
+
+class ReportingAdvisor:
+    """
+    Calcul de l'intervalle d'envoi recommandé à chaque robot, retourné dans
+    `MCPResponse.data["reporting"]` (voir `ReportingHints`).
+
+    L'intervalle dépend de l'activité du robot, sur une échelle logarithmique
+    entre `max_interval` (robot calme) et `min_interval` (robot dont l'état
+    change à chaque lecture). Lorsque la charge du serveur (file du LLM ou CPU)
+    dépasse `load_threshold`, il est allongé proportionnellement, jusqu'à doubler
+    à saturation. La charge n'est mesurée qu'une fois par `refresh` secondes.
+    """
+
+    def __init__(self, pool=None, scheduler=None, min_interval: int = REPORT_INTERVAL_MIN,
+                 max_interval: int = REPORT_INTERVAL_MAX, load_threshold: float = REPORT_LOAD_THRESHOLD,
+                 refresh: float = REPORT_LOAD_REFRESH, cpu_load=_cpu_load):
+        """
+        Initialise le calcul des recommandations.
+
+        Args:
+            pool: Pool d'inférence (par défaut, celui du serveur)
+            scheduler: Ordonnanceur des analyses (par défaut, celui du serveur)
+            min_interval: Intervalle minimal recommandé (ms)
+            max_interval: Intervalle maximal recommandé (ms)
+            load_threshold: Charge au-delà de laquelle les robots sont ralentis
+            refresh: Durée (secondes) de réutilisation de la mesure de la charge
+            cpu_load: Fonction retournant la charge du CPU (1 = saturé)
+        """
+        self.pool = pool or get_inference_pool()
+        self.scheduler = scheduler or get_analysis_scheduler()
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+        self.load_threshold = min(load_threshold, 0.99)
+        self.refresh = refresh
+        self.cpu_load = cpu_load
+        self._lock = threading.Lock()
+        self._load: Optional[Dict[str, float]] = None
+        self._measured_at = 0.0
+
+    def _llm_load(self) -> float:
+        """Tâches du LLM en cours ou en attente, rapportées à la capacité du pool."""
+        stats = self.scheduler.stats()
+        backlog = self.pool.running + self.pool.queue_depth + stats["pending"] + stats["waiting_for_pool"]
+        return backlog / (self.pool.max_workers + self.pool.max_queue)
+
+    def load(self) -> Dict[str, float]:
+        """
+        Mesure la charge du serveur (au plus une fois par `refresh` secondes).
+
+        Returns:
+            Dictionnaire avec la charge du LLM (`llm`) et du CPU (`cpu`)
+        """
+        now = time.monotonic()
+        with self._lock:
+            if self._load is not None and now - self._measured_at < self.refresh:
+                return self._load
+        try:
+            load = {"llm": self._llm_load(), "cpu": self.cpu_load()}
+        except Exception as e:
+            logger.error(f"Erreur lors de la mesure de la charge du serveur: {e}")
+            load = {"llm": 0.0, "cpu": 0.0}
+        with self._lock:
+            self._load = load
+            self._measured_at = now
+        return load
+
+    def hints(self, activity: float) -> Dict[str, Any]:
+        """
+        Calcule la recommandation d'un robot.
+
+        Args:
+            activity: Activité du robot (voir `ActivityMeter`)
+
+        Returns:
+            Dictionnaire au format `ReportingHints`
+        """
+        activity = min(1.0, max(0.0, float(activity)))
+        load = self.load()
+
+        interval = self.max_interval * (self.min_interval / self.max_interval) ** activity
+        pressure = max(load["llm"], load["cpu"])
+        if pressure > self.load_threshold:
+            interval *= 1 + min(1.0, (pressure - self.load_threshold) / (1 - self.load_threshold))
+        interval = min(self.max_interval, max(self.min_interval, interval))
+
+        return {
+            # Arrondi à 100 ms : la recommandation ne change pas à chaque lecture
+            "send_interval_ms": int(round(interval, -2)),
+            "activity": round(activity, 2),
+            "llm_load": round(load["llm"], 2),
+            "cpu_load": round(load["cpu"], 2)
+        }
+
+
+# Instancier le calcul des recommandations
+reporting_advisor = ReportingAdvisor()
+
+def get_reporting_advisor() -> ReportingAdvisor:
+    """Retourne l'instance du calcul des recommandations de cadence d'envoi."""
+    return reporting_advisor
@@ -0,0 +1,254 @@
+import os
+import asyncio
+import logging
+from collections import deque
+from typing import Dict, Any, Optional, Callable, Deque
+
+from metrics import record_mailbox_drop
+
+# Configuration du logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Nombre maximal de messages en attente dans la boîte aux lettres d'un robot
+ACTOR_MAILBOX_SIZE = int(os.environ.get("ACTOR_MAILBOX_SIZE", "64"))
+
+# Durée (secondes) d'inactivité après laquelle l'acteur d'un robot s'arrête
+ACTOR_IDLE_TTL = float(os.environ.get("ACTOR_IDLE_TTL", "300"))
+
+# Politiques de débordement de la boîte aux lettres
+DROP_OLDEST = "drop_oldest"  # le plus ancien message du même type est évincé
+BLOCK = "block"              # l'émetteur attend qu'une place se libère (aucune perte)
+REJECT = "reject"            # le message est refusé (MailboxFull)
+
+# Types de messages et politique de débordement de chacun. Un message `sensor` ne
+# porte que la demande d'analyse d'une lecture déjà enregistrée, un message
+# `emotion` que la mise à jour du contexte par un état déjà enregistré : les
+# évincer ne perd aucune donnée
+MAILBOX_POLICIES = {
+    "sensor": os.environ.get("ACTOR_POLICY_SENSOR", DROP_OLDEST),
+    "sensor_batch": os.environ.get("ACTOR_POLICY_SENSOR_BATCH", BLOCK),
+    "emotion": os.environ.get("ACTOR_POLICY_EMOTION", DROP_OLDEST),
+    "interaction": os.environ.get("ACTOR_POLICY_INTERACTION", BLOCK),
+    "command": os.environ.get("ACTOR_POLICY_COMMAND", BLOCK)
+}
+
+
+class MailboxFull(Exception):
+    """Levée lorsqu'un message est refusé par une boîte aux lettres pleine."""
+
+
+class MessageDropped(Exception):
+    """Levée pour un message évincé de la boîte aux lettres par un message plus récent."""
+
+
+class Message:
+    """Message adressé à l'acteur d'un robot : fonction à exécuter et son résultat."""
+
+    __slots__ = ("kind", "function", "args", "future")
+
+    def __init__(self, kind: str, function: Callable[..., Any], args: tuple, future: asyncio.Future):
+        self.kind = kind
+        self.function = function
+        self.args = args
+        self.future = future
+
+
+class Mailbox:
+    """
+    Boîte aux lettres bornée d'un acteur (utilisée depuis la boucle d'événements
+    uniquement). Lorsqu'elle est pleine, la politique du type de message
+    s'applique : éviction du plus ancien message du même type, attente d'une
+    place, ou refus.
+    """
+
+    def __init__(self, maxsize: int = ACTOR_MAILBOX_SIZE, policies: Optional[Dict[str, str]] = None):
+        self.maxsize = max(1, maxsize)
+        self.policies = MAILBOX_POLICIES if policies is None else policies
+        self._messages: Deque[Message] = deque()
+        self._changed = asyncio.Condition()
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def depth(self, kind: str) -> int:
+        """Nombre de messages d'un type en attente."""
+        return sum(1 for message in self._messages if message.kind == kind)
+
+    async def put(self, message: Message):
+        """
+        Dépose un message dans la boîte.
+
+        Raises:
+            MailboxFull: si la boîte est pleine et que la politique du message est `reject`
+        """
+        policy = self.policies.get(message.kind, BLOCK)
+        async with self._changed:
+            while len(self._messages) >= self.maxsize:
+                if policy == DROP_OLDEST and self._evict(message.kind):
+                    break
+                if policy == REJECT:
+                    record_mailbox_drop(message.kind, policy)
+                    raise MailboxFull(f"Boîte aux lettres pleine ({self.maxsize} messages)")
+                # Aucun message du même type à évincer : attendre une place
+                await self._changed.wait()
+            self._messages.append(message)
+            self._changed.notify_all()
+
+    def _evict(self, kind: str) -> bool:
+        """Évince le plus ancien message d'un type (verrou de la condition détenu)."""
+        for message in self._messages:
+            if message.kind == kind:
+                self._messages.remove(message)
+                if not message.future.done():
+                    message.future.set_exception(MessageDropped("Message remplacé par un message plus récent"))
+                record_mailbox_drop(kind, DROP_OLDEST)
+                return True
+        return False
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Message]:
+        """
+        Retire le plus ancien message de la boîte.
+
+        Args:
+            timeout: Délai maximal d'attente en secondes
+
+        Returns:
+            Le message, ou None si le délai a expiré
+        """
+        async with self._changed:
+            if not self._messages:
+                try:
+                    await asyncio.wait_for(self._changed.wait_for(lambda: self._messages), timeout)
+                except asyncio.TimeoutError:
+                    return None
+            message = self._messages.popleft()
+            self._changed.notify_all()
+            return message
+
+
+class RobotActor:
+    """
+    Acteur d'un robot : une tâche asyncio qui traite un à un, dans leur ordre
+    d'arrivée, les messages de sa boîte aux lettres. Chaque message est exécuté
+    dans un thread (`asyncio.to_thread`) : les messages d'un même robot ne
+    s'entrelacent jamais, ceux de robots différents s'exécutent en parallèle.
+    L'acteur s'arrête après `idle_ttl` secondes sans message.
+    """
+
+    def __init__(self, robot_id: str, mailbox_size: int = ACTOR_MAILBOX_SIZE, idle_ttl: float = ACTOR_IDLE_TTL,
+                 policies: Optional[Dict[str, str]] = None, on_stop: Optional[Callable[["RobotActor"], None]] = None):
+        self.robot_id = robot_id
+        self.idle_ttl = idle_ttl
+        self.mailbox = Mailbox(mailbox_size, policies)
+        self.on_stop = on_stop
+        self.loop = asyncio.get_running_loop()
+        self.task = self.loop.create_task(self._run())
+
+    @property
+    def alive(self) -> bool:
+        return not self.task.done() and not self.loop.is_closed()
+
+    async def ask(self, kind: str, function: Callable[..., Any], *args) -> Any:
+        """
+        Dépose un message et attend son traitement.
+
+        Args:
+            kind: Type du message (`sensor`, `sensor_batch`, `emotion`, `interaction` ou `command`)
+            function: Fonction à exécuter par l'acteur
+            args: Arguments de la fonction
+
+        Returns:
+            Résultat de la fonction
+
+        Raises:
+            MailboxFull: si le message est refusé
+            MessageDropped: si le message est évincé avant son traitement
+        """
+        message = Message(kind, function, args, self.loop.create_future())
+        await self.mailbox.put(message)
+        # Le message reste traité même si l'émetteur abandonne l'attente
+        return await asyncio.shield(message.future)
+
+    async def _run(self):
+        """Boucle de traitement des messages."""
+        try:
+            while True:
+                message = await self.mailbox.get(self.idle_ttl)
+                if message is None:
+                    if not len(self.mailbox):
+                        break
+                    continue
+                if message.future.done():
+                    continue
+                try:
+                    result = await asyncio.to_thread(message.function, *message.args)
+                except Exception as e:
+                    logger.error(f"Erreur lors du traitement d'un message {message.kind} du robot {self.robot_id}: {e}")
+                    if not message.future.done():
+                        message.future.set_exception(e)
+                else:
+                    if not message.future.done():
+                        message.future.set_result(result)
+        finally:
+            if self.on_stop is not None:
+                self.on_stop(self)
+
+
+class ActorSystem:
+    """Acteurs des robots, créés au premier message et arrêtés après inactivité."""
+
+    def __init__(self, mailbox_size: int = ACTOR_MAILBOX_SIZE, idle_ttl: float = ACTOR_IDLE_TTL,
+                 policies: Optional[Dict[str, str]] = None):
+        self.mailbox_size = mailbox_size
+        self.idle_ttl = idle_ttl
+        self.policies = MAILBOX_POLICIES if policies is None else policies
+        self._actors: Dict[str, RobotActor] = {}
+
+    def actor(self, robot_id: str) -> RobotActor:
+        """Retourne l'acteur d'un robot, créé si nécessaire (depuis la boucle d'événements)."""
+        actor = self._actors.get(robot_id)
+        if actor is None or not actor.alive or actor.loop is not asyncio.get_running_loop():
+            actor = RobotActor(robot_id, self.mailbox_size, self.idle_ttl, self.policies, on_stop=self._forget)
+            self._actors[robot_id] = actor
+        return actor
+
+    def _forget(self, actor: RobotActor):
+        """Retire un acteur arrêté."""
+        if self._actors.get(actor.robot_id) is actor:
+            del self._actors[actor.robot_id]
+
+    async def ask(self, robot_id: str, kind: str, function: Callable[..., Any], *args) -> Any:
+        """Fait traiter un message par l'acteur d'un robot (voir `RobotActor.ask`)."""
+        return await self.actor(robot_id).ask(kind, function, *args)
+
+    def active_count(self) -> int:
+        """Nombre d'acteurs en cours d'exécution."""
+        return len(self._actors)
+
+    def depth(self, kind: Optional[str] = None) -> int:
+        """Nombre total de messages en attente (d'un type, ou de tous les types)."""
+        actors = list(self._actors.values())
+        if kind is None:
+            return sum(len(actor.mailbox) for actor in actors)
+        return sum(actor.mailbox.depth(kind) for actor in actors)
+
+    def max_depth(self) -> int:
+        """Profondeur de la boîte aux lettres la plus remplie."""
+        return max((len(actor.mailbox) for actor in list(self._actors.values())), default=0)
+
+    async def shutdown(self):
+        """Arrête tous les acteurs (les messages en attente sont abandonnés)."""
+        actors = list(self._actors.values())
+        for actor in actors:
+            actor.task.cancel()
+        await asyncio.gather(*(actor.task for actor in actors), return_exceptions=True)
+        self._actors.clear()
+
+
+# Instancier le système d'acteurs
+actor_system = ActorSystem()
+
+def get_actor_system() -> ActorSystem:
+    """Retourne l'instance du système d'acteurs."""
+    return actor_system
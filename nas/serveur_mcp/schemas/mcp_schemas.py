@@ -74,6 +74,11 @@ class SensorMCPMessage(BaseModel):
     timestamp: int = Field(..., description="Timestamp en millisecondes")
     sensors: SensorDataPayload
 
+# Lot de messages de capteurs (un ou plusieurs robots)
+class SensorBatchMessage(BaseModel):
+    type: str = "sensor_batch"
+    readings: List[SensorMCPMessage] = Field(..., min_length=1, description="Lectures horodatées des capteurs")
+
 # Message MCP complet pour l'état émotionnel
 class EmotionalMCPMessage(BaseModel):
     type: str = "emotional_state"
@@ -104,11 +109,21 @@ class RobotCommand(BaseModel):
     movement: Optional[MovementCommand] = None
     sound: Optional[SoundCommand] = None
 
+# Cadence d'envoi recommandée à un robot, retournée dans MCPResponse.data["reporting"]
+# par /api/sensors, /api/sensors/batch (pour chaque robot) et /api/emotion
+class ReportingHints(BaseModel):
+    send_interval_ms: int = Field(..., ge=0, description="Intervalle recommandé entre deux envois MCP, en millisecondes")
+    activity: float = Field(..., ge=0, le=1, description="Part récente des lectures du robot qui changent (0-1)")
+    llm_load: float = Field(..., ge=0, description="Charge de la file du LLM (1 = pool d'inférence plein)")
+    cpu_load: float = Field(..., ge=0, description="Charge moyenne du CPU du NAS par processeur (1 = saturé)")
+
 # Message de réponse standard
 class MCPResponse(BaseModel):
     success: bool
     message: str
-    data: Optional[Dict[str, Any]] = None
+    data: Optional[Dict[str, Any]] = Field(
+        None, description="Données de la réponse ; `reporting` contient la cadence d'envoi recommandée (ReportingHints)"
+    )
 
 # Stockage en base de données
 class SensorDataRecord(BaseModel):
@@ -0,0 +1,312 @@
+import os
+import time
+import math
+import logging
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple, Union
+
+import numpy as np
+
+# Configuration du logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Nombre de lectures conservées par robot
+SENSOR_WINDOW_SIZE = int(os.environ.get("SENSOR_WINDOW_SIZE", "64"))
+
+# Champs numériques de SensorDataPayload (une colonne chacun)
+SCALAR_FIELDS = (
+    "sound.big_sound",
+    "sound.small_sound",
+    "vision.distance",
+    "vision.light_level",
+    "temperature.dht11",
+    "temperature.ds18b20",
+    "temperature.analog",
+    "temperature.humidity",
+    "magnetic.hall",
+    "water_level"
+)
+
+# Champs vectoriels [x, y, z] (trois colonnes chacun, plus la norme)
+VECTOR_FIELDS = (
+    "proprioception.acceleration",
+    "proprioception.gyro"
+)
+
+# Booléens dont on compte les fronts montants (événements)
+EVENT_FIELDS = (
+    "touch.tap",
+    "touch.shock",
+    "touch.touch",
+    "touch.button",
+    "vision.ir_detected",
+    "magnetic.reed",
+    "proprioception.tilt"
+)
+
+# Colonnes de la fenêtre
+COLUMNS = (
+    SCALAR_FIELDS
+    + tuple(f"{field}.{axis}" for field in VECTOR_FIELDS for axis in ("x", "y", "z"))
+    + tuple(f"{field}.magnitude" for field in VECTOR_FIELDS)
+)
+
+_EPOCH = datetime(1970, 1, 1)
+_SCALAR_PATHS = tuple(tuple(field.split(".")) for field in SCALAR_FIELDS)
+_VECTOR_PATHS = tuple(tuple(field.split(".")) for field in VECTOR_FIELDS)
+_EVENT_PATHS = tuple(tuple(field.split(".")) for field in EVENT_FIELDS)
+
+
+def _get_path(sensor_data: Dict[str, Any], path: Tuple[str, ...]) -> Any:
+    """Retourne la valeur d'un champ désigné par un chemin (None s'il est absent)."""
+    value = sensor_data
+    for part in path:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def _to_float(value: Any) -> float:
+    """Convertit une valeur en flottant (NaN si elle est absente ou invalide)."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _to_python(value: float) -> Optional[float]:
+    """Convertit un flottant NumPy en valeur sérialisable en JSON (None pour NaN)."""
+    return None if math.isnan(value) else float(value)
+
+
+class SensorWindow:
+    """
+    Fenêtre glissante des dernières lectures des capteurs d'un robot.
+
+    Les lectures sont rangées dans un tampon circulaire NumPy de taille fixe
+    (une ligne par lecture, une colonne par champ numérique, trois par vecteur
+    plus sa norme). Les sommes nécessaires à la moyenne, à la pente (régression
+    linéaire en fonction du temps) et au comptage des événements sont mises à
+    jour en O(1) à chaque lecture, la lecture évincée étant soustraite. Elles
+    sont recalculées toutes les `size` lectures pour éviter l'accumulation des
+    erreurs d'arrondi. Le minimum et le maximum sont calculés à la lecture des
+    caractéristiques, en une opération vectorisée sur la fenêtre.
+    """
+
+    def __init__(self, size: int = SENSOR_WINDOW_SIZE):
+        """
+        Initialise la fenêtre.
+
+        Args:
+            size: Nombre de lectures conservées
+        """
+        self.size = max(2, size)
+        columns = len(COLUMNS)
+        events = len(EVENT_FIELDS)
+
+        self._values = np.full((self.size, columns), np.nan)
+        self._times = np.zeros(self.size)
+        self._edges = np.zeros((self.size, events))
+        self._last_flags = np.zeros(events, dtype=bool)
+        self._head = 0
+        self._count = 0
+        self._t0: Optional[float] = None
+        self._since_rebuild = 0
+
+        # Sommes glissantes par colonne, sur les lectures valides : effectif, Σt, Σt²,
+        # Σx et Σtx ; la contribution de chaque lecture est conservée pour être
+        # soustraite en une opération lors de son éviction
+        self._contributions = np.zeros((self.size, 5, columns))
+        self._sums = np.zeros((5, columns))
+        self._event_counts = np.zeros(events)
+
+    def __len__(self) -> int:
+        return self._count
+
+    @staticmethod
+    def _extract(sensor_data: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray]:
+        """Extrait la ligne de valeurs et les booléens d'une lecture."""
+        values = [_to_float(_get_path(sensor_data, path)) for path in _SCALAR_PATHS]
+        magnitudes = []
+        for path in _VECTOR_PATHS:
+            vector = _get_path(sensor_data, path)
+            if isinstance(vector, (list, tuple)) and len(vector) == 3:
+                axes = [_to_float(component) for component in vector]
+            else:
+                axes = [math.nan] * 3
+            values.extend(axes)
+            magnitudes.append(math.sqrt(axes[0] ** 2 + axes[1] ** 2 + axes[2] ** 2))
+        values.extend(magnitudes)
+        flags = [bool(_get_path(sensor_data, path)) for path in _EVENT_PATHS]
+        return np.array(values), np.array(flags, dtype=bool)
+
+    @staticmethod
+    def _contribution(row: np.ndarray, t: float, out: np.ndarray):
+        """Calcule la contribution d'une lecture aux sommes glissantes."""
+        valid = ~np.isnan(row)
+        out[0] = valid
+        out[1] = out[0] * t
+        out[2] = out[1] * t
+        out[3] = np.where(valid, row, 0.0)
+        out[4] = out[3] * t
+
+    def add(self, sensor_data: Dict[str, Any], timestamp: Optional[Union[datetime, float]] = None):
+        """
+        Ajoute une lecture à la fenêtre (O(1)).
+
+        Args:
+            sensor_data: Données des capteurs (format SensorDataPayload)
+            timestamp: Date de la lecture (datetime UTC ou secondes depuis l'époque ;
+                par défaut, maintenant)
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        elif isinstance(timestamp, datetime):
+            timestamp = (timestamp - _EPOCH).total_seconds()
+        if self._t0 is None:
+            self._t0 = timestamp
+        t = timestamp - self._t0
+
+        row, flags = self._extract(sensor_data)
+        edges = (flags & ~self._last_flags).astype(float)
+        self._last_flags = flags
+
+        # Évincer la lecture la plus ancienne lorsque la fenêtre est pleine
+        contribution = self._contributions[self._head]
+        if self._count == self.size:
+            self._sums -= contribution
+            self._event_counts -= self._edges[self._head]
+
+        self._values[self._head] = row
+        self._times[self._head] = t
+        self._edges[self._head] = edges
+        self._contribution(row, t, contribution)
+        self._sums += contribution
+        self._event_counts += edges
+
+        self._head = (self._head + 1) % self.size
+        self._count = min(self._count + 1, self.size)
+
+        self._since_rebuild += 1
+        if self._since_rebuild >= self.size:
+            self._rebuild()
+
+    def _rebuild(self):
+        """Recalcule les sommes glissantes et ramène l'origine des temps au début de la fenêtre."""
+        self._since_rebuild = 0
+        filled = slice(0, self._count)
+        times = self._times[filled]
+        shift = times.min()
+        self._t0 += shift
+        self._times[filled] -= shift
+
+        values = self._values[filled]
+        valid = ~np.isnan(values)
+        t = times[:, None]
+        contributions = self._contributions[filled]
+        contributions[:, 0] = valid
+        contributions[:, 1] = contributions[:, 0] * t
+        contributions[:, 2] = contributions[:, 1] * t
+        contributions[:, 3] = np.where(valid, values, 0.0)
+        contributions[:, 4] = contributions[:, 3] * t
+        self._sums = contributions.sum(axis=0)
+        self._event_counts = self._edges[filled].sum(axis=0)
+
+    def _statistics(self) -> Dict[str, np.ndarray]:
+        """Calcule les statistiques de chaque colonne."""
+        filled = self._values[:self._count]
+        missing = np.isnan(filled)
+        n, sum_t, sum_tt, sum_x, sum_tx = self._sums
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = np.where(n > 0.5, sum_x / n, np.nan)
+            denominator = n * sum_tt - sum_t ** 2
+            slope = np.where(
+                (n > 1.5) & (denominator > 1e-9),
+                (n * sum_tx - sum_t * sum_x) / denominator,
+                np.nan
+            )
+        minimum = np.where(n > 0.5, np.where(missing, np.inf, filled).min(axis=0), np.nan)
+        maximum = np.where(n > 0.5, np.where(missing, -np.inf, filled).max(axis=0), np.nan)
+        return {
+            "last": self._values[(self._head - 1) % self.size],
+            "mean": mean,
+            "min": minimum,
+            "max": maximum,
+            "slope": slope
+        }
+
+    def _span(self) -> float:
+        """Durée (secondes) couverte par la fenêtre."""
+        if self._count < 2:
+            return 0.0
+        times = self._times[:self._count]
+        return float(times.max() - times.min())
+
+    def features(self) -> Dict[str, Any]:
+        """
+        Caractéristiques de la fenêtre.
+
+        Returns:
+            Dictionnaire avec le nombre de lectures (`samples`), la durée couverte
+            (`window_seconds`), les statistiques de chaque champ (`fields` : dernière
+            valeur, moyenne, minimum, maximum et pente par seconde) et le nombre de
+            fronts montants de chaque booléen (`events`)
+        """
+        features = {
+            "samples": self._count,
+            "window_seconds": self._span(),
+            "fields": {},
+            "events": {field: int(round(count)) for field, count in zip(EVENT_FIELDS, self._event_counts)}
+        }
+        if not self._count:
+            return features
+
+        statistics = self._statistics()
+        for index, column in enumerate(COLUMNS):
+            features["fields"][column] = {
+                name: _to_python(values[index]) for name, values in statistics.items()
+            }
+        return features
+
+    def trends(self, deadbands: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+        """
+        Résumé compact de la fenêtre, destiné au prompt du LLM.
+
+        Seuls les champs dont l'amplitude dans la fenêtre dépasse leur bande morte
+        (celle du vecteur pour ses composantes et sa norme) et les événements
+        survenus sont retenus ; les valeurs sont arrondies.
+
+        Args:
+            deadbands: Bandes mortes par champ (configuration du filtre de
+                changement significatif)
+
+        Returns:
+            Dictionnaire avec `samples`, `window_seconds`, `fields` et `events`
+        """
+        deadbands = deadbands or {}
+        trends = {
+            "samples": self._count,
+            "window_seconds": round(self._span(), 1),
+            "fields": {},
+            "events": {
+                field: int(round(count)) for field, count in zip(EVENT_FIELDS, self._event_counts) if count >= 0.5
+            }
+        }
+        if self._count < 2:
+            return trends
+
+        statistics = self._statistics()
+        for index, column in enumerate(COLUMNS):
+            if math.isnan(statistics["min"][index]):
+                continue
+            threshold = deadbands.get(column, deadbands.get(column.rsplit(".", 1)[0], 0))
+            if statistics["max"][index] - statistics["min"][index] <= threshold:
+                continue
+            trends["fields"][column] = {
+                name: round(float(statistics[name][index]), 2)
+                for name in ("mean", "min", "max", "slope")
+                if not math.isnan(statistics[name][index])
+            }
+        return trends
@@ -0,0 +1,233 @@
+import os
+import json
+import math
+import time
+import copy
+import logging
+from typing import Dict, Any, Optional, List
+
+# Configuration du logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Fichier JSON optionnel surchargeant la configuration par défaut du filtre
+SIGNIFICANCE_CONFIG = os.environ.get("SIGNIFICANCE_CONFIG", "")
+
+# Configuration par défaut du filtre de changement significatif.
+# Les chemins désignent des champs de SensorDataPayload ; les valeurs analogiques
+# de l'ESP32 sont sur 12 bits (0-4095).
+DEFAULT_SIGNIFICANCE_CONFIG: Dict[str, Any] = {
+    "enabled": True,
+    # Délai maximal (secondes) de réutilisation d'une analyse
+    "max_staleness": float(os.environ.get("SENSOR_ANALYSIS_MAX_STALENESS", "30")),
+    # Variation minimale par rapport à la dernière lecture analysée
+    # (norme de la différence pour les vecteurs)
+    "deadbands": {
+        "vision.distance": 5.0,
+        "vision.light_level": 150,
+        "sound.big_sound": 150,
+        "sound.small_sound": 150,
+        "temperature.dht11": 0.5,
+        "temperature.ds18b20": 0.5,
+        "temperature.humidity": 3.0,
+        "proprioception.acceleration": 1.5,
+        "proprioception.gyro": 20.0,
+        "water_level": 100
+    },
+    # Déclencheurs sur front des booléens, par rapport à la lecture précédente :
+    # "rising" (passage à vrai) ou "change" (tout changement)
+    "edges": {
+        "touch.tap": "rising",
+        "touch.shock": "rising",
+        "touch.touch": "rising",
+        "touch.button": "rising",
+        "vision.ir_detected": "rising",
+        "magnetic.reed": "change",
+        "proprioception.tilt": "change"
+    }
+}
+
+
+def load_significance_config(path: str = SIGNIFICANCE_CONFIG) -> Dict[str, Any]:
+    """
+    Charge la configuration du filtre : la configuration par défaut, surchargée
+    par le fichier JSON `path` s'il est fourni.
+
+    Args:
+        path: Chemin du fichier de configuration (optionnel)
+
+    Returns:
+        Configuration du filtre
+    """
+    config = copy.deepcopy(DEFAULT_SIGNIFICANCE_CONFIG)
+    if not path:
+        return config
+
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            overrides = json.load(f)
+        for key, value in overrides.items():
+            if isinstance(value, dict) and isinstance(config.get(key), dict):
+                config[key].update(value)
+            else:
+                config[key] = value
+        logger.info(f"Configuration du filtre de changement significatif chargée depuis {path}")
+    except Exception as e:
+        logger.error(f"Erreur lors du chargement de la configuration du filtre ({path}): {e}")
+    return config
+
+
+def _get_field(sensor_data: Dict[str, Any], path: str) -> Any:
+    """Retourne la valeur d'un champ désigné par un chemin pointé (`vision.distance`)."""
+    value = sensor_data
+    for part in path.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return None
+        value = value[part]
+    return value
+
+
+def _delta(previous: Any, current: Any) -> float:
+    """Écart entre deux valeurs numériques ou deux vecteurs (norme euclidienne)."""
+    if isinstance(current, (list, tuple)):
+        return math.sqrt(sum((float(c) - float(p)) ** 2 for p, c in zip(previous, current)))
+    return abs(float(current) - float(previous))
+
+
+def reading_change(previous: Dict[str, Any], current: Dict[str, Any],
+                   config: Optional[Dict[str, Any]] = None) -> Optional[str]:
+    """
+    Compare deux lectures successives : front d'un booléen surveillé, ou variation
+    d'un champ supérieure à sa bande morte.
+
+    Args:
+        previous: Lecture précédente
+        current: Nouvelle lecture
+        config: Configuration du filtre (par défaut, celle du serveur)
+
+    Returns:
+        Premier changement rencontré (`edge:<champ>` ou `delta:<champ>`), ou None
+    """
+    config = config if config is not None else significance_config
+    for path in config.get("edges", {}):
+        before = _get_field(previous, path)
+        after = _get_field(current, path)
+        if before is not None and after is not None and bool(before) != bool(after):
+            return f"edge:{path}"
+
+    for path, deadband in config.get("deadbands", {}).items():
+        before = _get_field(previous, path)
+        after = _get_field(current, path)
+        if before is None or after is None:
+            continue
+        try:
+            if _delta(before, after) > deadband:
+                return f"delta:{path}"
+        except (TypeError, ValueError):
+            return f"delta:{path}"
+    return None
+
+
+class SignificanceFilter:
+    """
+    Filtre de changement significatif des données des capteurs d'un robot.
+
+    Une lecture est jugée significative si :
+    - aucune analyse n'a encore été faite ;
+    - un champ a varié de plus de sa bande morte depuis la dernière lecture
+      analysée (la référence ne suit pas les petites variations, qui ne peuvent
+      donc pas s'accumuler sans déclencher d'analyse) ;
+    - un booléen surveillé a changé d'état par rapport à la lecture précédente ;
+    - la dernière analyse date de plus de `max_staleness` secondes.
+
+    Sinon, la dernière analyse peut être réutilisée sans appeler le LLM.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = config if config is not None else significance_config
+        self._reference: Optional[Dict[str, Any]] = None
+        self._previous: Optional[Dict[str, Any]] = None
+        self._analyzed_at: Optional[float] = None
+
+    def check(self, sensor_data: Dict[str, Any], force: Optional[str] = None) -> Optional[str]:
+        """
+        Évalue une lecture et met à jour l'état du filtre.
+
+        Si la lecture est significative, elle devient la nouvelle référence : un
+        appel concurrent avec une lecture identique ne déclenchera pas une
+        seconde analyse.
+
+        Args:
+            sensor_data: Données des capteurs
+            force: Raison imposant l'analyse (anomalie détectée), retournée si
+                aucune autre raison ne s'applique
+
+        Returns:
+            Raison de l'analyse (`first`, `disabled`, `stale`, `edge:<champ>`,
+            `delta:<champ>`), ou None si la dernière analyse peut être réutilisée
+        """
+        reason = self._reason(sensor_data) or force
+        self._previous = sensor_data
+        if reason is not None:
+            self._reference = sensor_data
+            self._analyzed_at = time.monotonic()
+        return reason
+
+    def check_many(self, readings: List[Dict[str, Any]], force: Optional[str] = None) -> Optional[str]:
+        """
+        Évalue une suite de lectures chronologiques (lot de capteurs) : un front
+        survenu au milieu du lot suffit à déclencher l'analyse.
+
+        Args:
+            readings: Lectures chronologiques
+            force: Raison imposant l'analyse (anomalie détectée dans le lot)
+
+        Returns:
+            Première raison d'analyse rencontrée, ou None
+        """
+        reasons = [self.check(sensor_data) for sensor_data in readings[:-1]]
+        reasons.append(self.check(readings[-1], force=force))
+        return next((reason for reason in reasons if reason is not None), None)
+
+    def reset(self):
+        """Oublie la dernière analyse (la prochaine lecture sera analysée)."""
+        self._reference = None
+        self._analyzed_at = None
+
+    def _reason(self, sensor_data: Dict[str, Any]) -> Optional[str]:
+        if not self.config.get("enabled", True):
+            return "disabled"
+        if self._reference is None or self._analyzed_at is None:
+            return "first"
+        if time.monotonic() - self._analyzed_at >= self.config.get("max_staleness", 30):
+            return "stale"
+
+        if self._previous is not None:
+            for path, mode in self.config.get("edges", {}).items():
+                before = _get_field(self._previous, path)
+                after = _get_field(sensor_data, path)
+                if before is None or after is None or bool(before) == bool(after):
+                    continue
+                if mode == "change" or after:
+                    return f"edge:{path}"
+
+        for path, deadband in self.config.get("deadbands", {}).items():
+            before = _get_field(self._reference, path)
+            after = _get_field(sensor_data, path)
+            if before is None or after is None:
+                continue
+            try:
+                if _delta(before, after) > deadband:
+                    return f"delta:{path}"
+            except (TypeError, ValueError):
+                return f"delta:{path}"
+
+        return None
+
+
+# Configuration du filtre, partagée par les robots
+significance_config = load_significance_config()
+
+def get_significance_config() -> Dict[str, Any]:
+    """Retourne la configuration du filtre de changement significatif."""
+    return significance_config
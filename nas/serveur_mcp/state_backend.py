@@ -0,0 +1,398 @@
+import os
+import json
+import time
+import sqlite3
+import tempfile
+import threading
+import logging
+from abc import ABC, abstractmethod
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, List, Any, Optional, Deque
+
+# Configuration du logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Choix du stockage de l'état des contextes : memory, sqlite ou redis
+CONTEXT_STATE_BACKEND = os.environ.get("CONTEXT_STATE_BACKEND", "memory")
+CONTEXT_STATE_PATH = os.environ.get(
+    "CONTEXT_STATE_PATH", os.path.join(tempfile.gettempdir(), "mcp_context_state.db")
+)
+REDIS_URL = os.environ.get("REDIS_URL", "redis://localhost:6379/0")
+
+# Durée de conservation (secondes) des résultats de tâches partagés entre workers
+JOB_STATE_TTL = int(os.environ.get("INFERENCE_RESULT_TTL", "300"))
+
+
+class StateBackend(ABC):
+    """
+    Stockage de l'état des contextes des robots.
+
+    L'état d'un robot est un ensemble de champs (`sensors`, `emotion`,
+    `last_interaction`, `recent_events`, ...) mis à jour champ par champ, afin
+    que deux workers modifiant des champs différents ne s'écrasent pas. Les
+    commandes en attente sont une file séparée, vidée atomiquement par
+    `drain_commands` : une commande mise en file par un worker est délivrée
+    exactement une fois, quel que soit le worker qui la récupère.
+
+    Un stockage qui n'implémente pas toutes les méthodes abstraites ne peut pas
+    être instancié.
+    """
+
+    # True si l'état est partagé entre plusieurs processus
+    shared = False
+
+    @abstractmethod
+    def load_state(self, robot_id: str) -> Optional[Dict[str, Any]]:
+        """Retourne l'état d'un robot, ou None s'il est inconnu."""
+
+    @abstractmethod
+    def update_state(self, robot_id: str, fields: Dict[str, Any]):
+        """Met à jour certains champs de l'état d'un robot."""
+
+    @abstractmethod
+    def append_event(self, robot_id: str, event: Dict[str, Any], max_events: int):
+        """Ajoute un événement récent en ne conservant que les `max_events` derniers."""
+
+    @abstractmethod
+    def push_commands(self, robot_id: str, commands: List[Dict[str, Any]]):
+        """Ajoute des commandes à la file d'un robot."""
+
+    @abstractmethod
+    def drain_commands(self, robot_id: str) -> List[Dict[str, Any]]:
+        """Retire et retourne toutes les commandes en attente d'un robot."""
+
+    @abstractmethod
+    def has_commands(self, robot_id: str) -> bool:
+        """Indique si des commandes sont en attente pour un robot (sans les retirer)."""
+
+    @abstractmethod
+    def robot_ids(self) -> List[str]:
+        """Retourne les identifiants des robots dont l'état est stocké."""
+
+    def save_job(self, job_id: str, job: Dict[str, Any]):
+        """Publie l'état d'une tâche d'inférence pour les autres workers."""
+
+    def load_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Retourne l'état d'une tâche publiée par un autre worker."""
+        return None
+
+    def close(self):
+        """Libère les ressources du stockage."""
+
+
+class InProcessBackend(StateBackend):
+    """
+    Stockage en mémoire du processus (déploiement à un seul worker).
+
+    Les commandes en attente de chaque robot sont une `deque` dont les ajouts
+    (`extend`) et les retraits (`popleft`) sont atomiques : la mise en file et le
+    vidage ne prennent aucun verrou, et un vidage concurrent d'un ajout ne perd
+    ni ne duplique de commande (celles ajoutées pendant le vidage sont délivrées
+    par le suivant). La file d'un robot n'est jamais supprimée, de sorte qu'un
+    ajout ne peut viser une file retirée du dictionnaire. Le verrou ne protège
+    que la création des files et les états.
+    """
+
+    shared = False
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._states: Dict[str, Dict[str, Any]] = {}
+        self._commands: Dict[str, Deque[Dict[str, Any]]] = {}
+
+    def _command_queue(self, robot_id: str) -> Deque[Dict[str, Any]]:
+        """Retourne la file des commandes d'un robot, en la créant si nécessaire."""
+        queue = self._commands.get(robot_id)
+        if queue is None:
+            with self._lock:
+                queue = self._commands.setdefault(robot_id, deque())
+        return queue
+
+    def load_state(self, robot_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            state = self._states.get(robot_id)
+            if state is None:
+                return None
+            state = dict(state)
+            if "recent_events" in state:
+                state["recent_events"] = list(state["recent_events"])
+            return state
+
+    def update_state(self, robot_id: str, fields: Dict[str, Any]):
+        with self._lock:
+            self._states.setdefault(robot_id, {}).update(fields)
+
+    def append_event(self, robot_id: str, event: Dict[str, Any], max_events: int):
+        with self._lock:
+            state = self._states.setdefault(robot_id, {})
+            events = state.get("recent_events")
+            if not isinstance(events, deque) or events.maxlen != max_events:
+                events = state["recent_events"] = deque(events or (), maxlen=max_events)
+            events.append(event)
+
+    def push_commands(self, robot_id: str, commands: List[Dict[str, Any]]):
+        if commands:
+            self._command_queue(robot_id).extend(commands)
+
+    def drain_commands(self, robot_id: str) -> List[Dict[str, Any]]:
+        queue = self._commands.get(robot_id)
+        commands = []
+        if queue is None:
+            return commands
+        # Retrait un à un : chaque popleft est atomique
+        try:
+            while True:
+                commands.append(queue.popleft())
+        except IndexError:
+            pass
+        return commands
+
+    def has_commands(self, robot_id: str) -> bool:
+        return bool(self._commands.get(robot_id))
+
+    def robot_ids(self) -> List[str]:
+        with self._lock:
+            robot_ids = set(self._states)
+            robot_ids.update(robot_id for robot_id, queue in self._commands.items() if queue)
+            return sorted(robot_ids)
+
+
+class SQLiteBackend(StateBackend):
+    """
+    Stockage dans un fichier SQLite local partagé par les workers d'une même machine.
+
+    Le journal WAL permet des lectures concurrentes ; les écritures sont
+    sérialisées par SQLite (`BEGIN IMMEDIATE`).
+    """
+
+    shared = True
+
+    def __init__(self, path: str = CONTEXT_STATE_PATH):
+        self.path = path
+        self._local = threading.local()
+        with self._transaction() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS context_state ("
+                "robot_id TEXT NOT NULL, field TEXT NOT NULL, value TEXT, "
+                "PRIMARY KEY (robot_id, field))"
+            )
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS pending_commands ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, robot_id TEXT NOT NULL, command TEXT NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS ix_pending_commands_robot ON pending_commands (robot_id, id)")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS inference_jobs ("
+                "job_id TEXT PRIMARY KEY, job TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+        logger.info(f"Stockage de l'état des contextes : SQLite ({path})")
+
+    def _connection(self) -> sqlite3.Connection:
+        """Retourne la connexion SQLite du thread courant."""
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=10, isolation_level=None, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    @contextmanager
+    def _transaction(self):
+        """Ouvre une transaction d'écriture (BEGIN IMMEDIATE)."""
+        db = self._connection()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            yield db
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+        db.execute("COMMIT")
+
+    def load_state(self, robot_id: str) -> Optional[Dict[str, Any]]:
+        rows = self._connection().execute(
+            "SELECT field, value FROM context_state WHERE robot_id = ?", (robot_id,)
+        ).fetchall()
+        if not rows:
+            return None
+        return {field: json.loads(value) for field, value in rows}
+
+    def update_state(self, robot_id: str, fields: Dict[str, Any]):
+        with self._transaction() as db:
+            db.executemany(
+                "INSERT OR REPLACE INTO context_state (robot_id, field, value) VALUES (?, ?, ?)",
+                [(robot_id, field, json.dumps(value)) for field, value in fields.items()]
+            )
+
+    def append_event(self, robot_id: str, event: Dict[str, Any], max_events: int):
+        with self._transaction() as db:
+            row = db.execute(
+                "SELECT value FROM context_state WHERE robot_id = ? AND field = 'recent_events'", (robot_id,)
+            ).fetchone()
+            events = (json.loads(row[0]) if row else []) + [event]
+            db.execute(
+                "INSERT OR REPLACE INTO context_state (robot_id, field, value) VALUES (?, 'recent_events', ?)",
+                (robot_id, json.dumps(events[-max_events:]))
+            )
+
+    def push_commands(self, robot_id: str, commands: List[Dict[str, Any]]):
+        if not commands:
+            return
+        with self._transaction() as db:
+            db.executemany(
+                "INSERT INTO pending_commands (robot_id, command) VALUES (?, ?)",
+                [(robot_id, json.dumps(command)) for command in commands]
+            )
+
+    def drain_commands(self, robot_id: str) -> List[Dict[str, Any]]:
+        with self._transaction() as db:
+            rows = db.execute(
+                "SELECT id, command FROM pending_commands WHERE robot_id = ? ORDER BY id", (robot_id,)
+            ).fetchall()
+            if rows:
+                db.execute("DELETE FROM pending_commands WHERE robot_id = ? AND id <= ?", (robot_id, rows[-1][0]))
+        return [json.loads(command) for _, command in rows]
+
+    def has_commands(self, robot_id: str) -> bool:
+        row = self._connection().execute(
+            "SELECT 1 FROM pending_commands WHERE robot_id = ? LIMIT 1", (robot_id,)
+        ).fetchone()
+        return row is not None
+
+    def robot_ids(self) -> List[str]:
+        rows = self._connection().execute(
+            "SELECT robot_id FROM context_state UNION SELECT robot_id FROM pending_commands"
+        ).fetchall()
+        return sorted(robot_id for (robot_id,) in rows)
+
+    def save_job(self, job_id: str, job: Dict[str, Any]):
+        with self._transaction() as db:
+            db.execute("DELETE FROM inference_jobs WHERE expires_at < ?", (time.time(),))
+            db.execute(
+                "INSERT OR REPLACE INTO inference_jobs (job_id, job, expires_at) VALUES (?, ?, ?)",
+                (job_id, json.dumps(job), time.time() + JOB_STATE_TTL)
+            )
+
+    def load_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        row = self._connection().execute(
+            "SELECT job FROM inference_jobs WHERE job_id = ? AND expires_at >= ?", (job_id, time.time())
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def close(self):
+        db = getattr(self._local, "db", None)
+        if db is not None:
+            db.close()
+            self._local.db = None
+
+
+class RedisBackend(StateBackend):
+    """
+    Stockage dans un serveur compatible Redis (Redis, KeyDB, Dragonfly, ...).
+
+    Nécessite le paquet `redis`, dépendance optionnelle de requirements.txt.
+    """
+
+    shared = True
+
+    def __init__(self, url: str = REDIS_URL, prefix: str = "mcp"):
+        import redis
+
+        self.prefix = prefix
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+        logger.info(f"Stockage de l'état des contextes : Redis ({url})")
+
+    def _key(self, kind: str, name: str) -> str:
+        return f"{self.prefix}:{kind}:{name}"
+
+    def load_state(self, robot_id: str) -> Optional[Dict[str, Any]]:
+        state = self.client.hgetall(self._key("state", robot_id))
+        if not state:
+            return None
+        return {field: json.loads(value) for field, value in state.items()}
+
+    def update_state(self, robot_id: str, fields: Dict[str, Any]):
+        pipe = self.client.pipeline()
+        pipe.hset(self._key("state", robot_id), mapping={field: json.dumps(value) for field, value in fields.items()})
+        pipe.sadd(self._key("robots", "all"), robot_id)
+        pipe.execute()
+
+    def append_event(self, robot_id: str, event: Dict[str, Any], max_events: int):
+        # Transaction optimiste : recommencer si un autre worker a modifié l'état entre-temps
+        key = self._key("state", robot_id)
+        with self.client.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(key)
+                    current = pipe.hget(key, "recent_events")
+                    events = (json.loads(current) if current else []) + [event]
+                    pipe.multi()
+                    pipe.hset(key, "recent_events", json.dumps(events[-max_events:]))
+                    pipe.sadd(self._key("robots", "all"), robot_id)
+                    pipe.execute()
+                    return
+                except Exception as e:
+                    if e.__class__.__name__ != "WatchError":
+                        raise
+
+    def push_commands(self, robot_id: str, commands: List[Dict[str, Any]]):
+        if not commands:
+            return
+        pipe = self.client.pipeline()
+        pipe.rpush(self._key("commands", robot_id), *[json.dumps(command) for command in commands])
+        pipe.sadd(self._key("robots", "all"), robot_id)
+        pipe.execute()
+
+    def drain_commands(self, robot_id: str) -> List[Dict[str, Any]]:
+        key = self._key("commands", robot_id)
+        pipe = self.client.pipeline(transaction=True)
+        pipe.lrange(key, 0, -1)
+        pipe.delete(key)
+        commands, _ = pipe.execute()
+        return [json.loads(command) for command in commands]
+
+    def has_commands(self, robot_id: str) -> bool:
+        return self.client.llen(self._key("commands", robot_id)) > 0
+
+    def robot_ids(self) -> List[str]:
+        return sorted(self.client.smembers(self._key("robots", "all")))
+
+    def save_job(self, job_id: str, job: Dict[str, Any]):
+        self.client.set(self._key("job", job_id), json.dumps(job), ex=JOB_STATE_TTL)
+
+    def load_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self.client.get(self._key("job", job_id))
+        return json.loads(job) if job else None
+
+    def close(self):
+        self.client.close()
+
+
+def create_state_backend(kind: str = CONTEXT_STATE_BACKEND) -> StateBackend:
+    """
+    Crée le stockage de l'état des contextes.
+
+    Args:
+        kind: Type de stockage (memory, sqlite ou redis)
+
+    Returns:
+        Instance du stockage
+    """
+    kind = kind.lower()
+    if kind == "memory":
+        return InProcessBackend()
+    if kind == "sqlite":
+        return SQLiteBackend()
+    if kind == "redis":
+        return RedisBackend()
+    raise ValueError(f"Stockage de l'état inconnu: {kind} (memory, sqlite ou redis)")
+
+
+# Instancier le stockage de l'état des contextes
+state_backend = create_state_backend()
+
+def get_state_backend() -> StateBackend:
+    """Retourne l'instance du stockage de l'état des contextes."""
+    return state_backend
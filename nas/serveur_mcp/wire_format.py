@@ -0,0 +1,234 @@
+import struct
+import logging
+from typing import Dict, Any, Tuple
+
+import msgpack
+from pydantic import ValidationError
+
+from schemas.mcp_schemas import (
+    SensorMCPMessage, EmotionalMCPMessage, EmotionType
+)
+
+# Configuration du logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Types de contenu acceptés par le serveur MCP
+CONTENT_TYPE_JSON = "application/json"
+CONTENT_TYPE_MSGPACK = "application/msgpack"
+CONTENT_TYPE_STRUCT = "application/x-mcp-struct"
+
+# Alias courants des types de contenu MessagePack
+_MSGPACK_ALIASES = ("application/msgpack", "application/x-msgpack", "application/vnd.msgpack")
+
+# En-tête des trames binaires : magique, version du schéma, type de message
+STRUCT_MAGIC = b"MC"
+STRUCT_VERSION = 1
+MESSAGE_SENSOR_DATA = 1
+MESSAGE_EMOTIONAL_STATE = 2
+
+# En-tête : magique (2 octets), version (u8), type (u8), timestamp (u64), longueur du robot_id (u8)
+_HEADER = struct.Struct("<2sBBQB")
+
+# Charge utile des capteurs, version 1 (56 octets, little-endian comme l'ESP32) :
+# big_sound, small_sound (u16), distance (f32), light_level (u16),
+# dht11, ds18b20, analog, humidity (f32), hall (i16), water_level (u16),
+# acceleration[3], gyro[3] (f32), drapeaux booléens (u16)
+_SENSOR_V1 = struct.Struct("<HHfH4fhH3f3fH")
+
+# Charge utile émotionnelle, version 1 : type (u8), intensité (u8), durée (u32)
+_EMOTION_V1 = struct.Struct("<BBI")
+
+# Bits du champ de drapeaux des capteurs
+FLAG_IR_DETECTED = 1 << 0
+FLAG_TAP = 1 << 1
+FLAG_SHOCK = 1 << 2
+FLAG_TOUCH = 1 << 3
+FLAG_BUTTON = 1 << 4
+FLAG_REED = 1 << 5
+FLAG_TILT = 1 << 6
+
+# Ordre des émotions dans les trames binaires (identique à l'enum EmotionType de l'ESP32)
+EMOTION_CODES = [
+    EmotionType.JOIE, EmotionType.PEUR, EmotionType.CURIOSITE, EmotionType.TRISTESSE,
+    EmotionType.COLERE, EmotionType.FATIGUE, EmotionType.SURPRISE, EmotionType.TENDRESSE,
+    EmotionType.NEUTRE
+]
+
+
+class WireFormatError(ValueError):
+    """Levée lorsqu'un message ne peut pas être décodé."""
+
+
+class UnsupportedContentType(WireFormatError):
+    """Levée lorsque le type de contenu d'un message n'est pas pris en charge."""
+
+
+def media_type(content_type: str) -> str:
+    """Retourne le type de média d'un en-tête Content-Type, sans ses paramètres."""
+    return (content_type or CONTENT_TYPE_JSON).split(";")[0].strip().lower()
+
+
+def _decode_header(body: bytes, expected_type: int) -> Tuple[str, int, int]:
+    """
+    Décode l'en-tête d'une trame binaire.
+
+    Returns:
+        Tuple (robot_id, timestamp, position du début de la charge utile)
+    """
+    if len(body) < _HEADER.size:
+        raise WireFormatError("Trame binaire tronquée (en-tête)")
+
+    magic, version, message_type, timestamp, robot_id_length = _HEADER.unpack_from(body, 0)
+    if magic != STRUCT_MAGIC:
+        raise WireFormatError("Trame binaire invalide (octets magiques)")
+    if version != STRUCT_VERSION:
+        raise WireFormatError(f"Version de schéma binaire non prise en charge: {version}")
+    if message_type != expected_type:
+        raise WireFormatError(f"Type de message binaire inattendu: {message_type}")
+
+    offset = _HEADER.size
+    if len(body) < offset + robot_id_length:
+        raise WireFormatError("Trame binaire tronquée (robot_id)")
+    robot_id = body[offset:offset + robot_id_length].decode("utf-8")
+    return robot_id, timestamp, offset + robot_id_length
+
+
+def _encode_header(message_type: int, robot_id: str, timestamp: int) -> bytes:
+    """Encode l'en-tête d'une trame binaire."""
+    robot_id_bytes = robot_id.encode("utf-8")
+    if len(robot_id_bytes) > 255:
+        raise WireFormatError("robot_id trop long pour le format binaire (255 octets maximum)")
+    return _HEADER.pack(STRUCT_MAGIC, STRUCT_VERSION, message_type, timestamp, len(robot_id_bytes)) + robot_id_bytes
+
+
+def decode_sensor_struct(body: bytes) -> SensorMCPMessage:
+    """Décode une trame binaire de données des capteurs."""
+    robot_id, timestamp, offset = _decode_header(body, MESSAGE_SENSOR_DATA)
+    if len(body) != offset + _SENSOR_V1.size:
+        raise WireFormatError("Taille de trame de capteurs invalide")
+
+    (big_sound, small_sound, distance, light_level,
+     dht11, ds18b20, analog, humidity, hall, water_level,
+     ax, ay, az, gx, gy, gz, flags) = _SENSOR_V1.unpack_from(body, offset)
+
+    # Validation directe depuis un dictionnaire Python, sans étape texte JSON
+    return SensorMCPMessage.model_validate({
+        "type": "sensor_data",
+        "robot_id": robot_id,
+        "timestamp": timestamp,
+        "sensors": {
+            "sound": {"big_sound": big_sound, "small_sound": small_sound},
+            "vision": {"distance": distance, "light_level": light_level, "ir_detected": bool(flags & FLAG_IR_DETECTED)},
+            "touch": {
+                "tap": bool(flags & FLAG_TAP), "shock": bool(flags & FLAG_SHOCK),
+                "touch": bool(flags & FLAG_TOUCH), "button": bool(flags & FLAG_BUTTON)
+            },
+            "temperature": {"dht11": dht11, "ds18b20": ds18b20, "analog": analog, "humidity": humidity},
+            "magnetic": {"hall": hall, "reed": bool(flags & FLAG_REED)},
+            "water_level": water_level,
+            "proprioception": {"acceleration": [ax, ay, az], "gyro": [gx, gy, gz], "tilt": bool(flags & FLAG_TILT)}
+        }
+    })
+
+
+def encode_sensor_struct(message: SensorMCPMessage) -> bytes:
+    """Encode un message de données des capteurs au format binaire (utilisé par les tests et benchmarks)."""
+    sensors = message.sensors
+    flags = (
+        (FLAG_IR_DETECTED if sensors.vision.ir_detected else 0)
+        | (FLAG_TAP if sensors.touch.tap else 0)
+        | (FLAG_SHOCK if sensors.touch.shock else 0)
+        | (FLAG_TOUCH if sensors.touch.touch else 0)
+        | (FLAG_BUTTON if sensors.touch.button else 0)
+        | (FLAG_REED if sensors.magnetic.reed else 0)
+        | (FLAG_TILT if sensors.proprioception.tilt else 0)
+    )
+    payload = _SENSOR_V1.pack(
+        sensors.sound.big_sound, sensors.sound.small_sound,
+        sensors.vision.distance, sensors.vision.light_level,
+        sensors.temperature.dht11, sensors.temperature.ds18b20,
+        sensors.temperature.analog, sensors.temperature.humidity,
+        sensors.magnetic.hall, sensors.water_level,
+        *sensors.proprioception.acceleration, *sensors.proprioception.gyro,
+        flags
+    )
+    return _encode_header(MESSAGE_SENSOR_DATA, message.robot_id, message.timestamp) + payload
+
+
+def decode_emotion_struct(body: bytes) -> EmotionalMCPMessage:
+    """Décode une trame binaire d'état émotionnel."""
+    robot_id, timestamp, offset = _decode_header(body, MESSAGE_EMOTIONAL_STATE)
+    if len(body) != offset + _EMOTION_V1.size:
+        raise WireFormatError("Taille de trame émotionnelle invalide")
+
+    emotion_code, intensity, duration = _EMOTION_V1.unpack_from(body, offset)
+    if emotion_code >= len(EMOTION_CODES):
+        raise WireFormatError(f"Code d'émotion inconnu: {emotion_code}")
+
+    return EmotionalMCPMessage.model_validate({
+        "type": "emotional_state",
+        "robot_id": robot_id,
+        "timestamp": timestamp,
+        "emotion": {"type": EMOTION_CODES[emotion_code], "intensity": intensity, "duration": duration}
+    })
+
+
+def encode_emotion_struct(message: EmotionalMCPMessage) -> bytes:
+    """Encode un message d'état émotionnel au format binaire."""
+    emotion = message.emotion
+    payload = _EMOTION_V1.pack(EMOTION_CODES.index(EmotionType(emotion.type)), emotion.intensity, emotion.duration)
+    return _encode_header(MESSAGE_EMOTIONAL_STATE, message.robot_id, message.timestamp) + payload
+
+
+def _decode(body: bytes, content_type: str, model, struct_decoder):
+    """Décode un message selon son type de contenu."""
+    kind = media_type(content_type)
+    try:
+        if kind == CONTENT_TYPE_JSON:
+            return model.model_validate_json(body)
+        if kind in _MSGPACK_ALIASES:
+            return model.model_validate(msgpack.unpackb(body, raw=False))
+        if kind == CONTENT_TYPE_STRUCT:
+            return struct_decoder(body)
+    except ValidationError:
+        # Message lisible mais hors du schéma (ValidationError hérite de ValueError)
+        raise
+    except (ValueError, struct.error) as e:
+        # ValueError couvre les erreurs de msgpack (message tronqué, données en trop, format
+        # invalide) et UnicodeDecodeError
+        raise WireFormatError(f"Message {kind} illisible: {e}")
+    raise UnsupportedContentType(f"Type de contenu non pris en charge: {kind}")
+
+
+def decode_sensor_message(body: bytes, content_type: str) -> SensorMCPMessage:
+    """
+    Décode un message de données des capteurs (JSON, MessagePack ou binaire).
+
+    Raises:
+        UnsupportedContentType: si le type de contenu n'est pas pris en charge
+        WireFormatError: si le message est illisible
+        ValidationError: si le message ne respecte pas le schéma
+    """
+    return _decode(body, content_type, SensorMCPMessage, decode_sensor_struct)
+
+
+def decode_emotion_message(body: bytes, content_type: str) -> EmotionalMCPMessage:
+    """
+    Décode un message d'état émotionnel (JSON, MessagePack ou binaire).
+
+    Raises:
+        UnsupportedContentType: si le type de contenu n'est pas pris en charge
+        WireFormatError: si le message est illisible
+        ValidationError: si le message ne respecte pas le schéma
+    """
+    return _decode(body, content_type, EmotionalMCPMessage, decode_emotion_struct)
+
+
+def supported_content_types() -> Dict[str, Any]:
+    """Décrit les types de contenu acceptés (pour la documentation de l'API)."""
+    return {
+        CONTENT_TYPE_JSON: "JSON (format historique)",
+        CONTENT_TYPE_MSGPACK: "MessagePack, même structure que le JSON",
+        CONTENT_TYPE_STRUCT: f"Trame binaire à disposition fixe, version {STRUCT_VERSION}"
+    }
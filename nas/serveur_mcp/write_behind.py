@@ -0,0 +1,425 @@
+import os
+import sys
+import json
+import time
+import atexit
+import threading
+import logging
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple
+
+# Ajouter les chemins pour l'importation des modules
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from metrics import metrics_registry, METRICS_ENABLED
+
+# Configuration du logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Paramètres du tampon d'écriture différée (configurables par variables d'environnement)
+WRITE_BEHIND_BATCH_SIZE = int(os.environ.get("WRITE_BEHIND_BATCH_SIZE", "500"))
+WRITE_BEHIND_FLUSH_INTERVAL = float(os.environ.get("WRITE_BEHIND_FLUSH_INTERVAL", "1"))
+WRITE_BEHIND_MAX_PENDING = int(os.environ.get("WRITE_BEHIND_MAX_PENDING", "20000"))
+WRITE_BEHIND_BLOCK_TIMEOUT = float(os.environ.get("WRITE_BEHIND_BLOCK_TIMEOUT", "2"))
+WRITE_BEHIND_MAX_ATTEMPTS = int(os.environ.get("WRITE_BEHIND_MAX_ATTEMPTS", "3"))
+
+# Fichier des lignes abandonnées après `WRITE_BEHIND_MAX_ATTEMPTS` échecs, au format
+# JSON Lines (vide pour seulement les journaliser)
+WRITE_BEHIND_DEAD_LETTER_PATH = os.environ.get(
+    "WRITE_BEHIND_DEAD_LETTER_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "write_behind_dead_letter.jsonl")
+)
+
+# Tables prises en charge (noms des tables de memoire.db_manager)
+SENSOR_DATA = "sensor_data"
+EMOTIONAL_STATES = "emotional_states"
+EVENTS = "events"
+MEMORIES = "long_term_memories"
+TABLES = (SENSOR_DATA, EMOTIONAL_STATES, EVENTS, MEMORIES)
+
+# Métriques du tampon
+WRITE_BEHIND_PENDING = metrics_registry.gauge(
+    "mcp_write_behind_pending", "Nombre de lignes en attente d'écriture en base de données"
+)
+WRITE_BEHIND_ROWS = metrics_registry.counter(
+    "mcp_write_behind_rows_total", "Nombre de lignes écrites en base de données par le tampon", ("table",)
+)
+WRITE_BEHIND_FLUSH_LATENCY = metrics_registry.histogram(
+    "mcp_write_behind_flush_seconds", "Durée des transactions d'écriture du tampon"
+)
+WRITE_BEHIND_FAILURES = metrics_registry.counter(
+    "mcp_write_behind_failures_total", "Nombre de transactions d'écriture du tampon en échec"
+)
+WRITE_BEHIND_DROPPED = metrics_registry.counter(
+    "mcp_write_behind_dropped_total",
+    "Nombre de lignes abandonnées après des échecs d'écriture répétés (fichier des lignes abandonnées)",
+    ("table",)
+)
+
+
+class WriteBehindFull(Exception):
+    """Levée lorsque le tampon d'écriture différée est plein."""
+
+
+class WriteBehindBuffer:
+    """
+    Tampon d'écriture différée des données du contexte.
+
+    Les lignes (données des capteurs, états émotionnels, événements, souvenirs)
+    sont mises en mémoire par le chemin de la requête, puis écrites par un thread
+    dédié en une transaction par lot (une requête INSERT multi-lignes par table),
+    dès que `batch_size` lignes sont en attente ou toutes les `flush_interval`
+    secondes. Au-delà de `max_pending` lignes en attente (base de données lente
+    ou indisponible), `add` bloque jusqu'à `block_timeout` secondes puis lève
+    `WriteBehindFull`. Le tampon est vidé à l'arrêt du serveur.
+
+    Si un lot est refusé alors que la base de données répond, les lignes sont
+    réécrites table par table, puis ligne par ligne : une ligne invalide ne
+    bloque pas les autres. Une ligne refusée `max_attempts` fois est abandonnée
+    et consignée dans le fichier des lignes abandonnées (`dead_letter_path`).
+    """
+
+    def __init__(self, db=None, batch_size: int = WRITE_BEHIND_BATCH_SIZE,
+                 flush_interval: float = WRITE_BEHIND_FLUSH_INTERVAL,
+                 max_pending: int = WRITE_BEHIND_MAX_PENDING,
+                 block_timeout: float = WRITE_BEHIND_BLOCK_TIMEOUT,
+                 max_attempts: int = WRITE_BEHIND_MAX_ATTEMPTS,
+                 dead_letter_path: str = WRITE_BEHIND_DEAD_LETTER_PATH):
+        """
+        Initialise le tampon d'écriture différée.
+
+        Args:
+            db: Gestionnaire de base de données exposant `write_batch` et `ping`
+                (par défaut celui de memoire.db_manager)
+            batch_size: Nombre de lignes en attente déclenchant une écriture
+            flush_interval: Délai maximal (secondes) entre deux écritures
+            max_pending: Nombre maximal de lignes en attente
+            block_timeout: Délai maximal (secondes) d'attente d'un appelant lorsque le tampon est plein
+            max_attempts: Nombre d'écritures refusées au-delà duquel une ligne est abandonnée
+            dead_letter_path: Fichier des lignes abandonnées (vide pour seulement les journaliser)
+        """
+        self._db = db
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.max_pending = max(self.batch_size, max_pending)
+        self.block_timeout = block_timeout
+        self.max_attempts = max(1, max_attempts)
+        self.dead_letter_path = dead_letter_path
+
+        self._cond = threading.Condition()
+        self._pending: Dict[str, List[Dict[str, Any]]] = {table: [] for table in TABLES}
+        self._count = 0
+        self._flushing = 0
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self._flush_lock = threading.Lock()
+        self._atexit_registered = False
+        # Échecs d'écriture par ligne (identifiant de l'objet), protégés par `_flush_lock`
+        self._attempts: Dict[int, int] = {}
+        self._dropped = 0
+
+    @property
+    def db(self):
+        """Gestionnaire de base de données (importé à la première écriture)."""
+        if self._db is None:
+            from memoire.db_manager import db_manager
+            self._db = db_manager
+        return self._db
+
+    def start(self):
+        """Démarre le thread d'écriture (appelé automatiquement au premier ajout)."""
+        with self._cond:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+            self._thread.start()
+            register = not self._atexit_registered
+            self._atexit_registered = True
+        if register:
+            # Vider le tampon à la sortie de l'interpréteur
+            atexit.register(self.shutdown)
+        logger.info(
+            f"Tampon d'écriture différée démarré (lots de {self.batch_size}, "
+            f"toutes les {self.flush_interval} s, {self.max_pending} lignes au plus)"
+        )
+
+    def add(self, table: str, rows: List[Dict[str, Any]]):
+        """
+        Met des lignes en attente d'écriture.
+
+        Args:
+            table: Nom de la table
+            rows: Lignes à insérer (colonnes du modèle SQLAlchemy)
+
+        Raises:
+            WriteBehindFull: si le tampon reste plein plus de `block_timeout` secondes
+        """
+        if not rows:
+            return
+        if self._thread is None:
+            self.start()
+
+        with self._cond:
+            if self._count + len(rows) > self.max_pending:
+                deadline = time.monotonic() + self.block_timeout
+                # Réveiller le thread d'écriture puis attendre de la place
+                self._cond.notify_all()
+                while self._count + len(rows) > self.max_pending:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or self._stopping:
+                        raise WriteBehindFull(
+                            f"Tampon d'écriture plein ({self._count} lignes en attente)"
+                        )
+                    self._cond.wait(remaining)
+
+            self._pending[table].extend(rows)
+            self._count += len(rows)
+            if self._count >= self.batch_size:
+                self._cond.notify_all()
+
+    def save_sensor_data(self, robot_id: str, data: Dict[str, Any], timestamp: Optional[datetime] = None):
+        """Met en attente l'enregistrement de données des capteurs."""
+        self.add(SENSOR_DATA, [{"robot_id": robot_id, "timestamp": timestamp or datetime.utcnow(), "data": data}])
+
+    def save_sensor_data_many(self, rows: List[Dict[str, Any]]) -> int:
+        """Met en attente plusieurs lectures (clés `robot_id`, `timestamp` et `data`)."""
+        self.add(SENSOR_DATA, rows)
+        return len(rows)
+
+    def save_emotional_state(self, robot_id: str, emotion_type: str, intensity: int, duration: int):
+        """Met en attente l'enregistrement d'un état émotionnel."""
+        self.add(EMOTIONAL_STATES, [{
+            "robot_id": robot_id,
+            "timestamp": datetime.utcnow(),
+            "emotion_type": emotion_type,
+            "intensity": intensity,
+            "duration": duration
+        }])
+
+    def save_event(self, robot_id: str, event_type: str, description: str, data: Dict[str, Any] = None):
+        """Met en attente l'enregistrement d'un événement."""
+        self.add(EVENTS, [{
+            "robot_id": robot_id,
+            "timestamp": datetime.utcnow(),
+            "event_type": event_type,
+            "description": description,
+            "data": data
+        }])
+
+    def save_memory(self, robot_id: str, memory_type: str, content: str,
+                    importance: int = 50, embedding: List[float] = None):
+        """Met en attente l'enregistrement d'un souvenir."""
+        now = datetime.utcnow()
+        self.add(MEMORIES, [{
+            "robot_id": robot_id,
+            "created_at": now,
+            "updated_at": now,
+            "memory_type": memory_type,
+            "content": content,
+            "importance": importance,
+            "embedding": embedding
+        }])
+
+    def flush(self) -> int:
+        """
+        Écrit toutes les lignes en attente en une transaction.
+
+        En cas d'échec, les lignes sont réécrites par table puis une à une (voir
+        `_write_isolated`) ; les lignes non écrites sont remises en tête du tampon
+        pour une nouvelle tentative.
+
+        Returns:
+            Nombre de lignes écrites
+        """
+        with self._flush_lock:
+            with self._cond:
+                if not self._count:
+                    return 0
+                batch = self._pending
+                count = self._count
+                self._pending = {table: [] for table in TABLES}
+                self._count = 0
+                self._flushing = count
+
+            start = time.perf_counter()
+            try:
+                self.db.write_batch(batch)
+            except Exception as e:
+                logger.error(f"Erreur lors de l'écriture de {count} ligne(s) en base de données: {e}")
+                if METRICS_ENABLED:
+                    WRITE_BEHIND_FAILURES.inc()
+                written, failed = self._write_isolated(batch, e)
+                kept = sum(len(rows) for rows in failed.values())
+                with self._cond:
+                    for table, rows in failed.items():
+                        self._pending[table][:0] = rows
+                    self._count += kept
+                    self._flushing = 0
+                    if kept < count:
+                        # Libérer les appelants bloqués par la contre-pression
+                        self._cond.notify_all()
+                return written
+
+            self._written(batch)
+            if METRICS_ENABLED:
+                WRITE_BEHIND_FLUSH_LATENCY.observe(time.perf_counter() - start)
+            with self._cond:
+                self._flushing = 0
+                # Libérer les appelants bloqués par la contre-pression
+                self._cond.notify_all()
+            return count
+
+    def _write_isolated(self, batch: Dict[str, List[Dict[str, Any]]],
+                        error: Exception) -> Tuple[int, Dict[str, List[Dict[str, Any]]]]:
+        """
+        Réécrit un lot refusé table par table, puis ligne par ligne, afin d'isoler
+        les lignes invalides.
+
+        Si la base de données ne répond pas, aucune ligne n'est réécrite ni
+        comptée comme refusée.
+
+        Args:
+            batch: Lignes du lot refusé, par table
+            error: Erreur de l'écriture du lot
+
+        Returns:
+            Couple (nombre de lignes écrites, lignes à conserver par table)
+        """
+        if not self.db.ping():
+            return 0, batch
+
+        written = 0
+        failed = {table: [] for table in TABLES}
+        tables = [table for table, rows in batch.items() if rows]
+        for table in tables:
+            rows = batch[table]
+            # Un lot d'une seule table a déjà été tenté tel quel
+            table_error = self._write(table, rows) if len(tables) > 1 else error
+            if table_error is None:
+                written += len(rows)
+                continue
+            for row in rows:
+                row_error = self._write(table, [row]) if len(rows) > 1 else table_error
+                if row_error is None:
+                    written += 1
+                elif self._retry(table, row, row_error):
+                    failed[table].append(row)
+        return written, failed
+
+    def _write(self, table: str, rows: List[Dict[str, Any]]) -> Optional[Exception]:
+        """Écrit des lignes d'une table en une transaction ; retourne l'erreur éventuelle."""
+        try:
+            self.db.write_batch({table: rows})
+        except Exception as e:
+            return e
+        self._written({table: rows})
+        return None
+
+    def _written(self, batch: Dict[str, List[Dict[str, Any]]]):
+        """Comptabilise des lignes écrites et oublie leurs échecs précédents."""
+        for table, rows in batch.items():
+            if not rows:
+                continue
+            if self._attempts:
+                for row in rows:
+                    self._attempts.pop(id(row), None)
+            if METRICS_ENABLED:
+                WRITE_BEHIND_ROWS.inc(len(rows), table)
+
+    def _retry(self, table: str, row: Dict[str, Any], error: Exception) -> bool:
+        """
+        Comptabilise l'échec de l'écriture d'une ligne.
+
+        Returns:
+            True si la ligne doit être conservée, False si elle a été abandonnée
+        """
+        attempts = self._attempts.pop(id(row), 0) + 1
+        if attempts < self.max_attempts:
+            self._attempts[id(row)] = attempts
+            return True
+        self._dead_letter(table, row, error)
+        return False
+
+    def _dead_letter(self, table: str, row: Dict[str, Any], error: Exception):
+        """Abandonne une ligne refusée et la consigne dans le fichier des lignes abandonnées."""
+        self._dropped += 1
+        if METRICS_ENABLED:
+            WRITE_BEHIND_DROPPED.inc(1, table)
+        logger.error(
+            f"Ligne de {table} abandonnée après {self.max_attempts} échec(s) d'écriture "
+            f"(robot {row.get('robot_id')}): {error}"
+        )
+        if not self.dead_letter_path:
+            return
+        entry = {"table": table, "failed_at": datetime.utcnow().isoformat(), "error": str(error), "row": row}
+        try:
+            directory = os.path.dirname(self.dead_letter_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.dead_letter_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, default=str) + "\n")
+        except Exception as e:
+            logger.error(f"Erreur lors de l'écriture du fichier des lignes abandonnées: {e}")
+
+    def _run(self):
+        """Boucle du thread d'écriture."""
+        while True:
+            with self._cond:
+                if not self._stopping and self._count < self.batch_size:
+                    self._cond.wait(self.flush_interval)
+                stopping = self._stopping
+
+            written = self.flush()
+            if stopping:
+                return
+            if not written and self._count >= self.batch_size:
+                # Base de données indisponible : patienter avant de réessayer
+                time.sleep(self.flush_interval)
+
+    def shutdown(self, timeout: float = 30):
+        """
+        Arrête le thread d'écriture après avoir vidé le tampon.
+
+        Args:
+            timeout: Délai maximal (secondes) d'attente de la dernière écriture
+        """
+        with self._cond:
+            thread = self._thread
+            self._stopping = True
+            self._cond.notify_all()
+        if thread is not None:
+            thread.join(timeout)
+            self._thread = None
+        # Dernière tentative pour les lignes ajoutées pendant l'arrêt
+        self.flush()
+        if self._count:
+            logger.error(f"{self._count} ligne(s) non écrite(s) en base de données à l'arrêt")
+
+    @property
+    def pending(self) -> int:
+        """Nombre de lignes en attente d'écriture (y compris le lot en cours)."""
+        return self._count + self._flushing
+
+    def stats(self) -> Dict[str, Any]:
+        """Statistiques du tampon."""
+        with self._cond:
+            by_table = {table: len(rows) for table, rows in self._pending.items()}
+        return {
+            "pending": self.pending,
+            "by_table": by_table,
+            "batch_size": self.batch_size,
+            "flush_interval": self.flush_interval,
+            "max_pending": self.max_pending,
+            "dropped": self._dropped
+        }
+
+
+# Instancier le tampon d'écriture différée
+write_behind = WriteBehindBuffer()
+WRITE_BEHIND_PENDING.set_function(lambda: write_behind.pending)
+
+def get_write_behind() -> WriteBehindBuffer:
+    """Retourne l'instance du tampon d'écriture différée."""
+    return write_behind
@@ -0,0 +1,72 @@
+"""
+Benchmark de la traduction des actions suggérées par le LLM en commandes.
+
+Compare l'ancienne chaîne de tests `in` de `ContextManager._generate_commands`
+(reproduite ci-dessous) au vocabulaire compilé de `config/actions.json`, sur des
+suggestions françaises et anglaises typiques.
+
+Usage :
+    python tests/benchmarks/bench_action_matcher.py [itérations]
+"""
+import sys
+import os
+import timeit
+
+# Ajout du chemin du serveur MCP pour les imports
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../nas/serveur_mcp"))
+
+from action_matcher import ActionMatcher, ACTIONS_PATH
+
+SUGGESTIONS = [
+    "Avancer lentement vers la lumière",
+    "Tourner à gauche pour éviter l'obstacle",
+    "turn right",
+    "S'arrêter et écouter",
+    "Émettre un bip joyeux",
+    "Saluer l'utilisateur",
+    "Observer la pièce",
+    "maintenir l'état actuel"
+]
+
+def legacy_commands(suggested_actions):
+    """Ancienne version de `_generate_commands` (sans la mise en file)."""
+    commands = []
+    for action in suggested_actions:
+        if "avancer" in action.lower() or "forward" in action.lower():
+            commands.append({"command_type": "movement",
+                             "movement": {"direction": "forward", "speed": 60, "duration": 2000}})
+        elif "reculer" in action.lower() or "backward" in action.lower():
+            commands.append({"command_type": "movement",
+                             "movement": {"direction": "backward", "speed": 60, "duration": 2000}})
+        elif "tourner" in action.lower() and "gauche" in action.lower() or "left" in action.lower():
+            commands.append({"command_type": "movement",
+                             "movement": {"direction": "left", "speed": 50, "duration": 1000}})
+        elif "tourner" in action.lower() and "droite" in action.lower() or "right" in action.lower():
+            commands.append({"command_type": "movement",
+                             "movement": {"direction": "right", "speed": 50, "duration": 1000}})
+        elif "arret" in action.lower() or "stop" in action.lower():
+            commands.append({"command_type": "movement", "movement": {"direction": "stop", "speed": 0}})
+        elif "bip" in action.lower() or "son" in action.lower() or "sound" in action.lower():
+            commands.append({"command_type": "sound", "sound": {"frequency": 1000, "duration": 500}})
+    return commands
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    matcher = ActionMatcher(ACTIONS_PATH)
+    synonyms = sum(len(action.synonyms) for action in matcher.actions)
+
+    print(f"{len(matcher.actions)} action(s), {synonyms} synonyme(s), "
+          f"{len(SUGGESTIONS)} suggestions, {iterations} itérations")
+    print(f"{'Version':<22}{'Par suggestion (µs)':>22}{'Commandes':>12}")
+    for name, translate in (("chaîne de tests in", legacy_commands), ("vocabulaire compilé", matcher.commands)):
+        seconds = timeit.timeit(lambda: translate(SUGGESTIONS), number=iterations)
+        print(f"{name:<22}{seconds / iterations / len(SUGGESTIONS) * 1e6:>22.2f}"
+              f"{len(translate(SUGGESTIONS)):>12}")
+
+    print()
+    print(f"{'Suggestion':<42}Actions reconnues")
+    for suggestion in SUGGESTIONS:
+        print(f"{suggestion:<42}{', '.join(matcher.match(suggestion)) or '-'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Benchmark du moteur de réflexes.
+
+Mesure le temps d'évaluation des règles de `config/reflexes.json` sur un
+SensorDataPayload, pour des données calmes (aucune règle déclenchée) et pour
+des stimuli déclenchant un réflexe (choc, obstacle proche, toucher).
+
+Usage :
+    python tests/benchmarks/bench_reflex_engine.py [itérations]
+"""
+import sys
+import os
+import copy
+import timeit
+
+# Ajout du chemin du serveur MCP pour les imports
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../nas/serveur_mcp"))
+
+from reflex_engine import ReflexEngine, REFLEX_RULES_PATH
+
+CALM = {
+    "sound": {"big_sound": 512, "small_sound": 128},
+    "vision": {"distance": 42.5, "light_level": 800, "ir_detected": False},
+    "touch": {"tap": False, "shock": False, "touch": False, "button": False},
+    "temperature": {"dht11": 21.0, "ds18b20": 21.5, "analog": 20.75, "humidity": 40.0},
+    "magnetic": {"hall": 12, "reed": False},
+    "water_level": 3,
+    "proprioception": {"acceleration": [0.5, -0.25, 9.75], "gyro": [0.0, 1.5, -2.0], "tilt": False}
+}
+
+def stimulus(path, value):
+    data = copy.deepcopy(CALM)
+    section, field = path.split(".")
+    data[section][field] = value
+    return data
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    engine = ReflexEngine(REFLEX_RULES_PATH)
+    # Délai de réarmement ignoré : chaque évaluation part d'un état vierge
+    scenarios = {
+        "calme": CALM,
+        "choc": stimulus("touch.shock", True),
+        "obstacle proche": stimulus("vision.distance", 8.0),
+        "toucher": stimulus("touch.touch", True)
+    }
+
+    print(f"{len(engine.rules)} règle(s), {iterations} évaluations par scénario")
+    print(f"{'Scénario':<20}{'Évaluation (µs)':>18}{'Réflexes':>24}")
+    for name, data in scenarios.items():
+        seconds = timeit.timeit(lambda: engine.evaluate(data, {}), number=iterations)
+        fired, _ = engine.evaluate(data, {})
+        print(f"{name:<20}{seconds / iterations * 1e6:>18.2f}{', '.join(fired) or '-':>24}")
+
+if __name__ == "__main__":
+    main()
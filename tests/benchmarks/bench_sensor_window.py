@@ -0,0 +1,48 @@
+"""
+Benchmark de la fenêtre glissante des capteurs.
+
+Mesure le coût d'ajout d'une lecture (constant, quelle que soit la taille de
+la fenêtre) et celui du calcul des caractéristiques exposées par
+`/api/robot_features/{robot_id}` et du résumé transmis au LLM.
+
+Usage :
+    python tests/benchmarks/bench_sensor_window.py [itérations]
+"""
+import sys
+import os
+import timeit
+
+# Ajout du chemin du serveur MCP pour les imports
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../nas/serveur_mcp"))
+
+from sensor_window import SensorWindow
+from significance import DEFAULT_SIGNIFICANCE_CONFIG
+
+READING = {
+    "sound": {"big_sound": 512, "small_sound": 128},
+    "vision": {"distance": 42.5, "light_level": 800, "ir_detected": False},
+    "touch": {"tap": True, "shock": False, "touch": False, "button": False},
+    "temperature": {"dht11": 21.0, "ds18b20": 21.5, "analog": 20.75, "humidity": 40.0},
+    "magnetic": {"hall": 12, "reed": False},
+    "water_level": 3,
+    "proprioception": {"acceleration": [0.5, -0.25, 9.75], "gyro": [0.0, 1.5, -2.0], "tilt": False}
+}
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    deadbands = DEFAULT_SIGNIFICANCE_CONFIG["deadbands"]
+
+    print(f"{iterations} itérations par mesure")
+    print(f"{'Taille':>8}{'Ajout (µs)':>14}{'features (µs)':>16}{'trends (µs)':>14}")
+    for size in (16, 64, 256, 1024):
+        window = SensorWindow(size)
+        for _ in range(size):
+            window.add(READING)
+        add = timeit.timeit(lambda: window.add(READING), number=iterations)
+        features = timeit.timeit(window.features, number=iterations // 10)
+        trends = timeit.timeit(lambda: window.trends(deadbands), number=iterations // 10)
+        print(f"{size:>8}{add / iterations * 1e6:>14.2f}"
+              f"{features / (iterations // 10) * 1e6:>16.2f}{trends / (iterations // 10) * 1e6:>14.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmark du démarrage à chaud des contextes.
+
+Compare, pour une flotte de robots, le temps nécessaire pour disposer du
+contexte de chaque robot après un redémarrage :
+- à froid : quatre requêtes à la base de données par robot (latence simulée) ;
+- à chaud : relecture du fichier des instantanés MessagePack.
+
+La base de données et le LLM sont remplacés par des objets factices : seule la
+reprise des contextes est mesurée (le LLM n'est plus chargé à l'import du
+serveur, mais en arrière-plan après son démarrage).
+
+Usage :
+    python tests/benchmarks/bench_warm_start.py [robots] [latence_ms]
+"""
+import sys
+import os
+import time
+import tempfile
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+# Ajout des chemins du serveur MCP pour les imports
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../nas/serveur_mcp"))
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../nas"))
+
+# Modules non nécessaires à la mesure (base PostgreSQL et LLM)
+sys.modules.setdefault('memoire.db_manager', MagicMock())
+sys.modules.setdefault('llm.model_manager', MagicMock())
+
+import context_manager
+from context_manager import ContextRegistry
+from context_snapshot import ContextSnapshotStore
+from state_backend import InProcessBackend
+
+class SlowDatabase:
+    """Base de données factice dont chaque requête dure `latency` secondes."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.queries = 0
+        now = datetime.utcnow()
+        self.emotion = SimpleNamespace(emotion_type="joie", intensity=60, timestamp=now)
+        self.event = SimpleNamespace(timestamp=now, event_type="sensor_interpretation",
+                                     description="Quelqu'un caresse le robot", data={"raw_analysis": {}})
+
+    def _query(self, result):
+        self.queries += 1
+        time.sleep(self.latency)
+        return result
+
+    def get_recent_sensor_data(self, robot_id, limit=1):
+        return self._query([SimpleNamespace(data={"vision": {"distance": 42.0}, "water_level": 3})])
+
+    def get_current_emotion(self, robot_id):
+        return self._query(self.emotion)
+
+    def get_recent_events(self, robot_id, limit=5):
+        return self._query([self.event] * limit)
+
+    def get_recent_interactions(self, robot_id, limit=1):
+        return self._query([])
+
+def load_fleet(registry, robots):
+    """Reprend le contexte de chaque robot ; retourne (premier contexte, tous) en secondes."""
+    start = time.perf_counter()
+    first = None
+    for index in range(robots):
+        registry.get(f"robot_{index}")
+        if first is None:
+            first = time.perf_counter() - start
+    return first, time.perf_counter() - start
+
+def main():
+    robots = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    latency = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.002
+    database = SlowDatabase(latency)
+    context_manager.db_manager = database
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = ContextSnapshotStore(os.path.join(directory, "context_snapshot.msgpack"))
+
+        # Démarrage à froid : contextes lus en base de données
+        cold = ContextRegistry(backend=InProcessBackend(), snapshot_store=store)
+        cold_first, cold_total = load_fleet(cold, robots)
+        queries = database.queries
+
+        # Point de contrôle puis redémarrage à chaud
+        start = time.perf_counter()
+        cold.checkpoint()
+        checkpoint = time.perf_counter() - start
+        size = os.path.getsize(store.path)
+
+        database.queries = 0
+        warm = ContextRegistry(backend=InProcessBackend(), snapshot_store=store)
+        start = time.perf_counter()
+        warm.warm_start(reconcile=False)
+        restore = time.perf_counter() - start
+        warm_first, warm_total = load_fleet(warm, robots)
+
+    print(f"{robots} robots, latence simulée de la base de données : {latency * 1000:.1f} ms par requête")
+    print(f"{'Démarrage':<12}{'Requêtes':>10}{'1er contexte (ms)':>20}{'Flotte (ms)':>14}")
+    print(f"{'à froid':<12}{queries:>10}{cold_first * 1000:>20.2f}{cold_total * 1000:>14.2f}")
+    print(f"{'à chaud':<12}{database.queries:>10}{(restore + warm_first) * 1000:>20.2f}"
+          f"{(restore + warm_total) * 1000:>14.2f}")
+    print(f"Instantané : {size} octets, écrit en {checkpoint * 1000:.2f} ms, relu en {restore * 1000:.2f} ms")
+
+if __name__ == "__main__":
+    main()
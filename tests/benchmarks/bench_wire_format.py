@@ -0,0 +1,64 @@
+"""
+Benchmark des formats de transport des messages de capteurs MCP.
+
+Compare, pour un message sensor_data typique, la taille de la charge utile et le
+temps de décodage + validation jusqu'au SensorMCPMessage :
+- JSON (format historique, `model_validate_json`)
+- MessagePack (`application/msgpack`)
+- Trame binaire à disposition fixe (`application/x-mcp-struct`)
+
+Usage :
+    python tests/benchmarks/bench_wire_format.py [itérations]
+"""
+import sys
+import os
+import json
+import timeit
+
+# Ajout du chemin du serveur MCP pour les imports
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../nas/serveur_mcp"))
+
+import msgpack
+
+from schemas.mcp_schemas import SensorMCPMessage
+from wire_format import (
+    decode_sensor_message, encode_sensor_struct,
+    CONTENT_TYPE_JSON, CONTENT_TYPE_MSGPACK, CONTENT_TYPE_STRUCT
+)
+
+SENSOR_MESSAGE = {
+    "type": "sensor_data",
+    "robot_id": "MignonBot1",
+    "timestamp": 3600000,
+    "sensors": {
+        "sound": {"big_sound": 512, "small_sound": 128},
+        "vision": {"distance": 42.5, "light_level": 800, "ir_detected": False},
+        "touch": {"tap": False, "shock": False, "touch": True, "button": False},
+        "temperature": {"dht11": 21.0, "ds18b20": 21.5, "analog": 20.75, "humidity": 40.0},
+        "magnetic": {"hall": 12, "reed": False},
+        "water_level": 3,
+        "proprioception": {"acceleration": [0.5, -0.25, 9.75], "gyro": [0.0, 1.5, -2.0], "tilt": False}
+    }
+}
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    reference = SensorMCPMessage.model_validate(SENSOR_MESSAGE)
+
+    payloads = {
+        CONTENT_TYPE_JSON: json.dumps(SENSOR_MESSAGE).encode("utf-8"),
+        CONTENT_TYPE_MSGPACK: msgpack.packb(SENSOR_MESSAGE),
+        CONTENT_TYPE_STRUCT: encode_sensor_struct(reference)
+    }
+
+    json_time = None
+    print(f"{'Format':<28}{'Taille (octets)':>16}{'Décodage (µs)':>16}{'Gain':>8}")
+    for content_type, body in payloads.items():
+        seconds = timeit.timeit(lambda: decode_sensor_message(body, content_type), number=iterations)
+        per_message = seconds / iterations * 1e6
+        if json_time is None:
+            json_time = per_message
+        print(f"{content_type:<28}{len(body):>16}{per_message:>16.2f}{json_time / per_message:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""
+Configuration commune des tests du NAS.
+
+`make_sensor_data` construit les lectures des capteurs utilisées par les tests
+du serveur MCP (`from conftest import make_sensor_data`).
+
+Les tests du LLM (test_llm_integration.py) remplacent `numpy` par un mock dans
+sys.modules dès leur collecte. Le vrai numpy est rétabli avant la collecte de
+chaque module de test : les autres modules (et les modules du serveur MCP
+qu'ils importent) calculent avec le vrai numpy, quel que soit l'ordre des tests.
+"""
+import sys
+from typing import Dict, Any, Sequence
+
+import numpy
+
+_numpy = numpy
+
+
+def pytest_collectstart(collector):
+    """Rétablit le vrai numpy avant la collecte d'un module de test."""
+    sys.modules["numpy"] = _numpy
+
+
+def make_sensor_data(distance: float = 100.0, light_level: int = 500, big_sound: int = 0, tap: bool = False,
+                     touch: bool = False, dht11: float = 21.0, ds18b20: float = 21.5, hall: int = 0,
+                     water_level: int = 0, acceleration: Sequence[float] = (0.0, 0.0, 9.8)) -> Dict[str, Any]:
+    """Construit des données de capteurs au format SensorDataPayload (robot au repos par défaut)."""
+    return {
+        "sound": {"big_sound": big_sound, "small_sound": 0},
+        "vision": {"distance": distance, "light_level": light_level, "ir_detected": False},
+        "touch": {"tap": tap, "shock": False, "touch": touch, "button": False},
+        "temperature": {"dht11": dht11, "ds18b20": ds18b20, "analog": 21.0, "humidity": 40.0},
+        "magnetic": {"hall": hall, "reed": False},
+        "water_level": water_level,
+        "proprioception": {"acceleration": list(acceleration), "gyro": [0.0, 0.0, 0.0], "tilt": False}
+    }
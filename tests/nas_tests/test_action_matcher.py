@@ -0,0 +1,96 @@
+import unittest
+import sys
+import os
+import json
+import tempfile
+
+# Ajout du chemin du serveur MCP pour les imports
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../nas/serveur_mcp"))
+
+from action_matcher import ActionMatcher, ActionVocabularyError, ACTIONS_PATH, normalize_text
+
+class TestActionMatcher(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """Vocabulaire livré avec le serveur."""
+        cls.matcher = ActionMatcher(ACTIONS_PATH)
+
+    def test_french_and_english_synonyms(self):
+        """Les synonymes français et anglais désignent la même action."""
+        cases = {
+            "avancer": ["Avancer lentement", "move forward"],
+            "reculer": ["Reculer d'un pas", "back away from the wall"],
+            "tourner_gauche": ["Tourner à gauche", "turn left"],
+            "tourner_droite": ["tourne vers la droite", "Turn right"],
+            "arreter": ["S'arrêter net", "Stop"],
+            "saluer": ["Saluer l'utilisateur", "greet the user", "dire bonjour"],
+            "ecouter": ["Écouter attentivement", "listen"],
+            "observer": ["Observer la pièce", "look around"],
+            "approcher": ["s’approcher doucement", "come closer"],
+            "attendre": ["Attendre", "wait a moment"],
+            "jouer": ["Jouer avec la balle", "play"],
+            "dormir": ["Dormir un peu", "go to sleep"],
+            "bip": ["émettre un son", "beep"]
+        }
+        for action, suggestions in cases.items():
+            for suggestion in suggestions:
+                with self.subTest(suggestion=suggestion):
+                    self.assertEqual(self.matcher.match(suggestion), [action])
+
+    def test_left_requires_direction(self):
+        """« tourner » seul ne tourne plus à gauche (précédence des opérateurs de l'ancienne version)."""
+        self.assertEqual(self.matcher.match("tourner sur place"), [])
+        self.assertEqual(self.matcher.match("tourner à droite"), ["tourner_droite"])
+
+    def test_whole_words_only(self):
+        """Un synonyme n'est reconnu que comme mot entier (« son » possessif, « restaurant »...)."""
+        self.assertEqual(self.matcher.match("agiter son bras"), [])
+        self.assertEqual(self.matcher.match("restaurant"), [])
+
+    def test_several_actions_in_order(self):
+        """Chaque action reconnue est émise une fois, dans l'ordre de la suggestion."""
+        self.assertEqual(self.matcher.match("tourner à gauche puis avancer, puis avancer"),
+                         ["tourner_gauche", "avancer"])
+        self.assertEqual(self.matcher.match("jouer un son"), ["bip"])
+
+    def test_commands_are_parameterised_copies(self):
+        """Les commandes émises sont celles du vocabulaire, copiées."""
+        commands = self.matcher.commands(["approcher", "maintenir l'état actuel"])
+
+        self.assertEqual(commands, [{"command_type": "movement",
+                                     "movement": {"direction": "forward", "speed": 40, "duration": 1500}}])
+        commands[0]["movement"]["speed"] = 100
+        self.assertEqual(self.matcher.commands(["approcher"])[0]["movement"]["speed"], 40)
+
+class TestActionVocabulary(unittest.TestCase):
+    def test_inline_vocabulary(self):
+        """Un vocabulaire peut être fourni directement."""
+        matcher = ActionMatcher(actions=[{"name": "clignoter", "synonyms": ["clignote*", "blink"],
+                                          "commands": [{"command_type": "sound"}]}])
+        self.assertEqual(matcher.match("Clignotez !"), ["clignoter"])
+        self.assertEqual(matcher.commands(["blink"]), [{"command_type": "sound"}])
+
+    def test_invalid_action(self):
+        """Une action sans synonyme est refusée."""
+        with self.assertRaises(ActionVocabularyError):
+            ActionMatcher.compile([{"name": "vide", "synonyms": []}])
+
+    def test_invalid_file_keeps_previous_vocabulary(self):
+        """Un fichier invalide conserve le vocabulaire précédent."""
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False, encoding="utf-8") as f:
+            json.dump({"actions": [{"name": "stop", "synonyms": ["stop"]}]}, f)
+        try:
+            matcher = ActionMatcher(f.name, reload_interval=0)
+            with open(f.name, "w", encoding="utf-8") as invalid:
+                invalid.write("{")
+            self.assertFalse(matcher.reload())
+            self.assertEqual(matcher.match("stop"), ["stop"])
+        finally:
+            os.remove(f.name)
+
+    def test_normalize_text(self):
+        """Minuscules, sans accents, espaces réduits."""
+        self.assertEqual(normalize_text("  S’ARRÊTER   là "), "s'arreter la")
+
+if __name__ == "__main__":
+    unittest.main()
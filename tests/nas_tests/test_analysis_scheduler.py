@@ -0,0 +1,88 @@
+import unittest
+import threading
+import sys
+import os
+
+# Ajout du chemin du serveur MCP pour les imports
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../nas/serveur_mcp"))
+
+from inference_pool import InferencePool
+from analysis_scheduler import AnalysisScheduler
+
+class FakeContext:
+    """Contexte dont l'analyse bloque jusqu'à `release` et mémorise les lectures analysées."""
+
+    def __init__(self, robot_id, release):
+        self.robot_id = robot_id
+        self.release = release
+        self.calls = []
+
+    def analyze_sensor_readings(self, history, anomalies=None):
+        self.release.wait(5)
+        self.calls.append((list(history), list(anomalies or [])))
+        return {"success": True, "message": "ok", "analysis": {"reading": history[-1]["n"]}, "commands": []}
+
+class TestAnalysisScheduler(unittest.TestCase):
+    def setUp(self):
+        """Configuration avant chaque test."""
+        self.pool = InferencePool(max_workers=1, max_queue=1)
+        self.scheduler = AnalysisScheduler(self.pool)
+        self.release = threading.Event()
+
+    def tearDown(self):
+        """Nettoyage après chaque test."""
+        self.release.set()
+        self.pool.shutdown(wait=True)
+
+    def test_latest_reading_wins(self):
+        """Une seule analyse en attente par robot : elle porte sur la lecture la plus récente."""
+        context = FakeContext("robot", self.release)
+
+        first, running = self.scheduler.submit(context, [{"n": 1}])
+        second, pending = self.scheduler.submit(context, [{"n": 2}], [{"field": "distance"}])
+        third, merged = self.scheduler.submit(context, [{"n": 3}])
+
+        self.assertEqual((first, second, third), ("started", "queued", "merged"))
+        self.assertIs(pending, merged)
+        self.assertEqual(self.scheduler.state("robot"), {"running": True, "pending": True})
+
+        self.release.set()
+        merged.future.result(timeout=5)
+
+        # Deux analyses au lieu de trois ; la seconde voit toutes les lectures fusionnées
+        self.assertEqual(context.calls, [([{"n": 1}], []), ([{"n": 2}, {"n": 3}], [{"field": "distance"}])])
+        self.assertEqual(self.scheduler.stats(), {"running": 0, "pending": 0, "waiting_for_pool": 0})
+
+    def test_latest_analysis_freshness(self):
+        """La dernière analyse terminée est exposée avec sa fraîcheur."""
+        context = FakeContext("robot", self.release)
+        self.assertIsNone(self.scheduler.latest("robot"))
+
+        self.release.set()
+        _, analysis = self.scheduler.submit(context, [{"n": 1}])
+        analysis.future.result(timeout=5)
+
+        latest = self.scheduler.latest("robot")
+        self.assertEqual(latest["result"]["analysis"], {"reading": 1})
+        self.assertIsNotNone(latest["analyzed_at"])
+        self.assertIsNotNone(latest["reading_received_at"])
+        self.assertGreaterEqual(latest["analysis_age"], 0)
+
+    def test_pool_full_defers_analysis(self):
+        """Un robot qui ne trouve pas de place dans le pool est relancé dès qu'une analyse se termine."""
+        contexts = [FakeContext(f"robot_{i}", self.release) for i in range(3)]
+
+        decisions = [self.scheduler.submit(context, [{"n": i}]) for i, context in enumerate(contexts)]
+
+        self.assertEqual([decision for decision, _ in decisions], ["started", "started", "queued"])
+        self.assertIsNone(decisions[2][1].job)
+        self.assertEqual(self.scheduler.stats()["waiting_for_pool"], 1)
+
+        self.release.set()
+        decisions[2][1].future.result(timeout=5)
+
+        self.assertEqual(contexts[2].calls, [([{"n": 2}], [])])
+        self.assertEqual(self.scheduler.stats()["waiting_for_pool"], 0)
+
+if __name__ == "__main__":
+    unittest.main()
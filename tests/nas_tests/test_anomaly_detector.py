@@ -0,0 +1,68 @@
+import unittest
+import sys
+import os
+
+# Ajout du chemin du serveur MCP pour les imports
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../nas/serveur_mcp"))
+
+# Le vrai numpy est rétabli par conftest.py avant la collecte de ce module
+from anomaly_detector import AnomalyDetector, DEFAULT_ANOMALY_CONFIG
+from conftest import make_sensor_data
+
+def noisy_sensor_data(step=0, dht11=21.0, ds18b20=21.5, hall=0, water_level=200):
+    """Lecture des capteurs avec un léger bruit, qui dépend du numéro de la lecture."""
+    noise = (step % 5 - 2) * 0.05
+    return make_sensor_data(big_sound=500 + (step % 7) * 10, light_level=800 + (step % 3) * 5,
+                            dht11=dht11 + noise, ds18b20=ds18b20 - noise, hall=hall + step % 4,
+                            water_level=water_level + step % 3)
+
+class TestAnomalyDetector(unittest.TestCase):
+    def setUp(self):
+        """Configuration avant chaque test."""
+        self.detector = AnomalyDetector(DEFAULT_ANOMALY_CONFIG)
+        for step in range(50):
+            self.assertEqual(self.detector.update(noisy_sensor_data(step)), [])
+
+    def test_no_anomaly_during_warmup(self):
+        """Aucune anomalie n'est signalée avant la fin de la période d'apprentissage."""
+        detector = AnomalyDetector(DEFAULT_ANOMALY_CONFIG)
+        detector.update(noisy_sensor_data())
+        self.assertEqual(detector.update(noisy_sensor_data(hall=2000)), [])
+
+    def test_hall_spike(self):
+        """Un pic du capteur à effet Hall est signalé une seule fois."""
+        anomalies = self.detector.update(noisy_sensor_data(50, hall=900))
+        self.assertEqual([anomaly["field"] for anomaly in anomalies], ["magnetic.hall"])
+        self.assertGreater(anomalies[0]["z"], DEFAULT_ANOMALY_CONFIG["threshold"])
+        self.assertEqual(self.detector.update(noisy_sensor_data(51, hall=900)), [])
+
+        # Retour à la normale puis nouveau pic : nouvelle anomalie
+        for step in range(52, 120):
+            self.detector.update(noisy_sensor_data(step))
+        self.assertEqual(len(self.detector.update(noisy_sensor_data(120, hall=900))), 1)
+
+    def test_temperature_drift(self):
+        """Un écart entre les deux thermomètres est signalé par le champ dérivé."""
+        anomalies = self.detector.update(noisy_sensor_data(50, dht11=21.0, ds18b20=23.0))
+        fields = [anomaly["field"] for anomaly in anomalies]
+        self.assertIn("temperature.drift", fields)
+        self.assertNotIn("temperature.dht11", fields)
+
+    def test_water_level_jump(self):
+        """Un saut du niveau d'eau est signalé ; un niveau durablement différent cesse de l'être."""
+        anomalies = self.detector.update(noisy_sensor_data(50, water_level=1500))
+        self.assertEqual([anomaly["field"] for anomaly in anomalies], ["water_level"])
+
+        for step in range(51, 200):
+            self.detector.update(noisy_sensor_data(step, water_level=1500))
+        self.assertEqual(self.detector.update(noisy_sensor_data(200, water_level=1500)), [])
+
+    def test_missing_field_is_ignored(self):
+        """Un champ absent ne modifie pas les statistiques et ne déclenche rien."""
+        data = noisy_sensor_data(50)
+        del data["water_level"]
+        self.assertEqual(self.detector.update(data), [])
+        self.assertEqual(self.detector.update(noisy_sensor_data(51)), [])
+
+if __name__ == "__main__":
+    unittest.main()
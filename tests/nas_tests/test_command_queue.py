@@ -0,0 +1,70 @@
+import unittest
+import sys
+import os
+
+# Ajout du chemin du serveur MCP pour les imports
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../nas/serveur_mcp"))
+
+from command_queue import CommandQueuePolicy, QUEUED_AT_FIELD
+
+def movement(direction, speed=60):
+    return {"command_type": "movement", "movement": {"direction": direction, "speed": speed}}
+
+def emotion(name, intensity=50):
+    return {"command_type": "emotion", "emotion": {"emotion": name, "intensity": intensity}}
+
+SOUND = {"command_type": "sound", "sound": {"frequency": 1000, "duration": 500}}
+
+class TestCommandQueuePolicy(unittest.TestCase):
+    def setUp(self):
+        """Configuration avant chaque test."""
+        self.policy = CommandQueuePolicy({"movement": 5, "sound": 5, "emotion": 30})
+
+    def prepare(self, commands, queued_at=1000.0, now=1000.0):
+        return self.policy.prepare(self.policy.stamp(commands, now=queued_at), now=now)
+
+    def test_stop_clears_pending_movements(self):
+        """Un arrêt annule les mouvements mis en file avant lui, pas ceux d'après."""
+        commands, dropped = self.prepare([movement("forward"), movement("left"), movement("stop", 0),
+                                          movement("backward")])
+
+        self.assertEqual([command["movement"]["direction"] for command in commands], ["stop", "backward"])
+        self.assertEqual(dropped["superseded"], 2)
+
+    def test_newer_emotion_replaces_older(self):
+        """Seule la dernière émotion est délivrée."""
+        commands, _ = self.prepare([emotion("joie"), SOUND, emotion("peur", 80)])
+
+        self.assertEqual(commands, [emotion("peur", 80), SOUND])
+
+    def test_priority_order(self):
+        """L'arrêt passe en premier, puis l'émotion, les mouvements et les sons."""
+        commands, _ = self.prepare([SOUND, movement("forward"), emotion("joie"), movement("stop", 0)])
+
+        self.assertEqual([command["command_type"] for command in commands], ["movement", "emotion", "sound"])
+        self.assertEqual(commands[0]["movement"]["direction"], "stop")
+
+    def test_repeated_commands_are_delivered_once(self):
+        """Un mouvement ou un son répété n'est délivré qu'une fois."""
+        commands, dropped = self.prepare([movement("forward"), movement("forward"), SOUND, SOUND])
+
+        self.assertEqual(commands, [movement("forward"), SOUND])
+        self.assertEqual(dropped["superseded"], 2)
+
+    def test_expired_commands_are_dropped(self):
+        """Les commandes trop anciennes sont abandonnées ; l'arrêt n'expire pas."""
+        commands, dropped = self.prepare([movement("forward"), emotion("joie"), movement("stop", 0)],
+                                         queued_at=1000.0, now=1010.0)
+
+        self.assertEqual([command["command_type"] for command in commands], ["movement", "emotion"])
+        self.assertEqual(dropped["expired"], 1)
+        self.assertTrue(all(QUEUED_AT_FIELD not in command for command in commands))
+
+    def test_stamp_keeps_original_date(self):
+        """Une commande remise en file conserve sa date de mise en file."""
+        stamped = self.policy.stamp([movement("forward")], now=1000.0)
+
+        self.assertEqual(self.policy.stamp(stamped, now=2000.0)[0][QUEUED_AT_FIELD], 1000.0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+import asyncio
+import threading
+import sys
+import os
+
+# Ajout du chemin du serveur MCP pour les imports
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../nas/serveur_mcp"))
+
+from command_stream import CommandNotifier
+
+class TestCommandNotifier(unittest.TestCase):
+    def setUp(self):
+        """Configuration avant chaque test."""
+        self.notifier = CommandNotifier()
+
+    def test_wait_timeout(self):
+        """Sans notification, l'attente expire."""
+        async def scenario():
+            return await self.notifier.wait("robot_a", 0.05)
+
+        self.assertFalse(asyncio.run(scenario()))
+        self.assertEqual(self.notifier.waiting(), 0)
+
+    def test_notify_from_worker_thread(self):
+        """Une notification émise depuis un autre thread réveille le client en attente."""
+        async def scenario():
+            self.notifier.attach(asyncio.get_running_loop())
+            threading.Timer(0.05, self.notifier.notify, args=("robot_a",)).start()
+            return await self.notifier.wait("robot_a", 5)
+
+        self.assertTrue(asyncio.run(scenario()))
+
+    def test_notify_is_per_robot(self):
+        """Une notification ne réveille que les clients du robot concerné."""
+        async def scenario():
+            self.notifier.attach(asyncio.get_running_loop())
+            waiter_a = asyncio.ensure_future(self.notifier.wait("robot_a", 0.2))
+            waiter_b = asyncio.ensure_future(self.notifier.wait("robot_b", 0.2))
+            await asyncio.sleep(0)
+            self.assertEqual(self.notifier.waiting(), 2)
+
+            self.notifier.notify("robot_b")
+            return await waiter_a, await waiter_b
+
+        self.assertEqual(asyncio.run(scenario()), (False, True))
+
+    def test_probe_detects_commands_from_other_workers(self):
+        """Avec une sonde, des commandes mises en file par un autre processus réveillent le client."""
+        pending = {"robot_a": False}
+        self.notifier.poll_interval = 0.02
+        self.notifier.set_probe(lambda robot_id: pending[robot_id])
+
+        async def scenario():
+            threading.Timer(0.05, pending.__setitem__, args=("robot_a", True)).start()
+            return await self.notifier.wait("robot_a", 5)
+
+        self.assertTrue(asyncio.run(scenario()))
+        self.notifier.set_probe(None)
+
+    def test_probe_is_shared_and_off_loop(self):
+        """La sonde est exécutée hors de la boucle, une fois par intervalle pour tous les clients d'un robot."""
+        calls = []
+        self.notifier.poll_interval = 0.05
+
+        def probe(robot_id):
+            calls.append(threading.get_ident())
+            return len(calls) >= 2
+
+        self.notifier.set_probe(probe)
+
+        async def scenario():
+            waiters = [self.notifier.wait("robot_a", 5) for _ in range(10)]
+            return await asyncio.gather(*waiters)
+
+        self.assertEqual(asyncio.run(scenario()), [True] * 10)
+        self.assertLess(len(calls), 10)
+        self.assertNotIn(threading.get_ident(), calls)
+        self.notifier.set_probe(None)
+
+if __name__ == "__main__":
+    unittest.main()
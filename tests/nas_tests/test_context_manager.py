@@ -0,0 +1,208 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import sys
+import os
+import threading
+from datetime import datetime, timedelta
+
+# Ajout des chemins du serveur MCP pour les imports
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../nas/serveur_mcp"))
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../nas"))
+
+# Création des mocks pour la base de données et le LLM
+sys.modules.setdefault('memoire.db_manager', MagicMock())
+sys.modules.setdefault('llm.model_manager', MagicMock())
+
+import context_manager
+from context_manager import ContextManager
+from state_backend import InProcessBackend
+from conftest import make_sensor_data
+
+def process(context, readings):
+    """Enregistre puis analyse des lectures, comme l'acteur du robot et l'ordonnanceur des analyses."""
+    anomalies = context.record_sensor_readings(readings)
+    return context.analyze_sensor_readings([sensor_data for _, sensor_data in readings], anomalies)
+
+class TestContextManager(unittest.TestCase):
+    def setUp(self):
+        """Configuration avant chaque test."""
+        self.db_patcher = patch.object(context_manager, 'db_manager')
+        self.llm_patcher = patch.object(context_manager, 'get_llm_manager')
+        self.writer_patcher = patch.object(context_manager, 'get_write_behind')
+        self.mock_db = self.db_patcher.start()
+        self.mock_llm = self.llm_patcher.start().return_value
+        self.mock_writer = self.writer_patcher.start().return_value
+
+        self.mock_db.get_recent_sensor_data.return_value = []
+        self.mock_db.get_current_emotion.return_value = None
+        self.mock_db.get_recent_events.return_value = []
+        self.mock_db.get_recent_interactions.return_value = []
+        self.mock_llm.analyze_sensors.return_value = {
+            "interpretation": "Quelqu'un caresse le robot",
+            "suggested_actions": ["bip"],
+            "emotional_response": {"emotion": "tendresse", "intensity": 70}
+        }
+
+        self.context = ContextManager(robot_id="test_robot", backend=InProcessBackend())
+
+    def tearDown(self):
+        """Nettoyage après chaque test."""
+        self.db_patcher.stop()
+        self.llm_patcher.stop()
+        self.writer_patcher.stop()
+
+    def test_sensor_batch(self):
+        """Un lot est enregistré en une requête et seule la lecture la plus récente est analysée."""
+        now = datetime.utcnow()
+        readings = [
+            (now - timedelta(seconds=2), make_sensor_data(distance=80.0)),
+            (now - timedelta(seconds=1), make_sensor_data(distance=50.0)),
+            (now, make_sensor_data(distance=20.0, touch=True))
+        ]
+
+        result = process(self.context, readings)
+
+        self.assertTrue(result["success"])
+        self.mock_writer.save_sensor_data_many.assert_called_once()
+        self.assertEqual(len(self.mock_writer.save_sensor_data_many.call_args[0][0]), 3)
+        self.mock_writer.save_sensor_data.assert_not_called()
+
+        self.mock_llm.analyze_sensors.assert_called_once()
+        analyzed = self.mock_llm.analyze_sensors.call_args[0][0]
+        self.assertEqual(analyzed["vision"]["distance"], 20.0)
+        self.assertEqual(self.context.current_context["sensors"]["vision"]["distance"], 20.0)
+
+        # Les tendances de la fenêtre glissante accompagnent l'analyse
+        trends = self.mock_llm.analyze_sensors.call_args[1]["trends"]
+        self.assertEqual(trends["samples"], 3)
+        self.assertAlmostEqual(trends["fields"]["vision.distance"]["slope"], -30.0)
+        self.assertEqual(trends["events"], {"touch.touch": 1})
+        features = self.context.get_sensor_features()
+        self.assertEqual(features["fields"]["vision.distance"]["min"], 20.0)
+
+    def test_unchanged_readings_reuse_last_analysis(self):
+        """Sans changement significatif, la dernière analyse est réutilisée sans appel au LLM."""
+        first = process(self.context, [(None, make_sensor_data())])
+        second = process(self.context, [(None, make_sensor_data(distance=101.0))])
+
+        self.mock_llm.analyze_sensors.assert_called_once()
+        self.assertFalse(first["analysis_reused"])
+        self.assertTrue(second["analysis_reused"])
+        self.assertEqual(second["analysis"], first["analysis"])
+        self.assertEqual(second["commands"], [])
+        self.assertEqual(self.mock_writer.save_sensor_data.call_count, 2)
+
+        # Un toucher déclenche une nouvelle analyse
+        third = process(self.context, [(None, make_sensor_data(distance=101.0, touch=True))])
+        self.assertFalse(third["analysis_reused"])
+        self.assertEqual(self.mock_llm.analyze_sensors.call_count, 2)
+
+    def test_anomaly_forces_analysis(self):
+        """Une anomalie impose l'analyse et est enregistrée comme événement."""
+        for _ in range(25):
+            result = process(self.context, [(None, make_sensor_data())])
+        self.assertTrue(result["analysis_reused"])
+        self.assertEqual(result["anomalies"], [])
+        self.mock_llm.analyze_sensors.assert_called_once()
+
+        # Pic du capteur à effet Hall, champ ignoré par le filtre de changement significatif
+        data = make_sensor_data()
+        data["magnetic"]["hall"] = 900
+        result = process(self.context, [(None, data)])
+
+        self.assertFalse(result["analysis_reused"])
+        self.assertEqual(result["anomalies"], ["magnetic.hall"])
+        self.assertEqual(self.mock_llm.analyze_sensors.call_count, 2)
+        trends = self.mock_llm.analyze_sensors.call_args[1]["trends"]
+        self.assertEqual(trends["anomalies"][0]["field"], "magnetic.hall")
+        anomaly_events = [call for call in self.mock_writer.save_event.call_args_list if call[0][1] == "anomaly"]
+        self.assertEqual(len(anomaly_events), 1)
+        self.assertEqual(anomaly_events[0][0][3]["value"], 900.0)
+
+    def test_reflexes_queue_commands_before_analysis(self):
+        """Un choc met immédiatement en file l'émotion et la commande du réflexe."""
+        data = make_sensor_data()
+        data["touch"]["shock"] = True
+
+        fired = self.context.apply_reflexes(data)
+
+        self.assertEqual(fired, ["choc"])
+        self.mock_llm.analyze_sensors.assert_not_called()
+        self.assertEqual(self.context.current_context["emotion"]["type"], "colere")
+        commands = self.context.get_commands("test_robot")
+        # L'arrêt, commande de sécurité, est délivré avant l'émotion
+        self.assertEqual([command["command_type"] for command in commands], ["movement", "emotion"])
+        self.assertEqual(commands[0]["movement"]["direction"], "stop")
+
+        # Le délai de réarmement évite de répéter le réflexe
+        self.assertEqual(self.context.apply_reflexes(data), [])
+
+    def test_backend_writes_outside_lock(self):
+        """Les écritures d'un réflexe dans le stockage partagé sont publiées hors du verrou du contexte."""
+        backend = InProcessBackend()
+        backend.shared = True
+        context = ContextManager(robot_id="test_robot", backend=backend)
+
+        def lock_held() -> bool:
+            held = []
+            def probe():
+                acquired = context.lock.acquire(blocking=False)
+                if acquired:
+                    context.lock.release()
+                held.append(not acquired)
+            thread = threading.Thread(target=probe)
+            thread.start()
+            thread.join()
+            return held[0]
+
+        writes = []
+        for name in ("update_state", "push_commands"):
+            write = getattr(backend, name)
+            def checked(*args, write=write, name=name):
+                writes.append((name, lock_held()))
+                return write(*args)
+            setattr(backend, name, checked)
+
+        data = make_sensor_data()
+        data["touch"]["shock"] = True
+        self.assertEqual(context.apply_reflexes(data), ["choc"])
+
+        # Publiées avant le retour, dans l'ordre, sans détenir le verrou
+        self.assertEqual(writes, [("update_state", False), ("push_commands", False)])
+        self.assertEqual(backend.load_state("test_robot")["emotion"]["type"], "colere")
+        self.assertTrue(backend.has_commands("test_robot"))
+
+    def test_emotional_state_recorded_before_context(self):
+        """Un état émotionnel est enregistré sans toucher au contexte, puis appliqué séparément."""
+        state = {"type": "joie", "intensity": 90, "duration": 1000}
+
+        self.assertTrue(self.context.record_emotional_state(state))
+        self.mock_writer.save_emotional_state.assert_called_once_with("test_robot", "joie", 90, 1000)
+        self.mock_writer.save_event.assert_called_once()
+        self.mock_writer.save_memory.assert_called_once()
+        self.assertEqual(self.context.current_context["emotion"]["type"], "neutre")
+
+        result = self.context.apply_emotional_state(state)
+        self.assertTrue(result["success"])
+        self.assertEqual(self.context.current_context["emotion"]["type"], "joie")
+        self.mock_writer.save_emotional_state.assert_called_once()
+
+    def test_emotion_blends_and_decays(self):
+        """La suggestion du LLM est mélangée à l'émotion, qui décroît ensuite jusqu'au neutre."""
+        process(self.context, [(None, make_sensor_data())])
+
+        emotion = self.context.emotion()
+        self.assertEqual((emotion["type"], emotion["intensity"]), ("tendresse", 35))
+        commands = [command for command in self.context.get_commands("test_robot")
+                    if command["command_type"] == "emotion"]
+        self.assertEqual([command["emotion"] for command in commands], [{"emotion": "tendresse", "intensity": 35}])
+        self.assertEqual(self.context.get_commands("test_robot"), [])
+
+        # Dix minutes plus tard, l'émotion s'est dissipée : le robot est ramené au neutre
+        state = self.context.current_context["emotion"]
+        state["last_change"] = (datetime.utcnow() - timedelta(minutes=10)).isoformat()
+        commands = self.context.get_commands("test_robot")
+        self.assertEqual([command["emotion"] for command in commands], [{"emotion": "neutre", "intensity": 50}])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,176 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import sys
+import os
+import asyncio
+import threading
+from datetime import datetime
+from types import SimpleNamespace
+
+# Ajout des chemins du serveur MCP pour les imports
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../nas/serveur_mcp"))
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../nas"))
+
+# Création des mocks pour la base de données et le LLM
+mock_db_module = MagicMock()
+mock_llm_module = MagicMock()
+sys.modules['memoire.db_manager'] = mock_db_module
+sys.modules['llm.model_manager'] = mock_llm_module
+
+import context_manager
+from context_manager import ContextRegistry
+from state_backend import InProcessBackend
+
+class TestContextRegistry(unittest.TestCase):
+    def setUp(self):
+        """Configuration avant chaque test."""
+        self.db_patcher = patch.object(context_manager, 'db_manager')
+        self.mock_db = self.db_patcher.start()
+        self.mock_db.get_recent_sensor_data.return_value = []
+        self.mock_db.get_current_emotion.return_value = None
+        self.mock_db.get_recent_events.return_value = []
+        self.mock_db.get_recent_interactions.return_value = []
+
+        self.registry = ContextRegistry(idle_ttl=60, shards=4, eviction_interval=3600, backend=InProcessBackend())
+
+    def tearDown(self):
+        """Nettoyage après chaque test."""
+        self.db_patcher.stop()
+
+    def test_lazy_creation_per_robot(self):
+        """Chaque robot obtient son propre contexte, créé au premier accès."""
+        robot_a = self.registry.get("robot_a")
+        robot_b = self.registry.get("robot_b")
+
+        self.assertIsNot(robot_a, robot_b)
+        self.assertEqual(robot_a.robot_id, "robot_a")
+        self.assertEqual(robot_b.robot_id, "robot_b")
+        self.assertIs(self.registry.get("robot_a"), robot_a)
+        self.assertEqual(self.mock_db.get_current_emotion.call_count, 2)
+
+    def test_commands_are_isolated(self):
+        """Les commandes d'un robot ne sont pas délivrées à un autre."""
+        self.registry.get("robot_a").add_command({"command_type": "sound"})
+
+        self.assertEqual(self.registry.get("robot_b").get_commands("robot_b"), [])
+        self.assertEqual(len(self.registry.get("robot_a").get_commands("robot_a")), 1)
+
+    def test_idle_eviction_and_restore(self):
+        """Un contexte inactif est évincé vers un instantané puis restauré sans la base de données."""
+        context = self.registry.get("robot_a")
+        context.add_command({"command_type": "sound"})
+        context.current_context["emotion"]["type"] = "joie"
+        context.last_access -= 120
+
+        self.assertEqual(self.registry.evict_idle(), 1)
+        self.assertEqual(self.registry.stats()["active"], 0)
+        self.assertEqual(self.registry.robot_ids(), ["robot_a"])
+
+        self.mock_db.reset_mock()
+        restored = self.registry.get("robot_a")
+
+        self.assertIsNot(restored, context)
+        self.assertEqual(restored.current_context["emotion"]["type"], "joie")
+        self.assertEqual(len(restored.get_commands("robot_a")), 1)
+        self.mock_db.get_current_emotion.assert_not_called()
+
+    def test_busy_context_is_not_evicted(self):
+        """Un contexte verrouillé (traitement en cours) n'est pas évincé."""
+        context = self.registry.get("robot_a")
+        context.last_access -= 120
+
+        locked = threading.Event()
+        release = threading.Event()
+
+        def hold_lock():
+            with context.lock:
+                locked.set()
+                release.wait(5)
+
+        worker = threading.Thread(target=hold_lock)
+        worker.start()
+        locked.wait(5)
+        try:
+            self.assertEqual(self.registry.evict_idle(), 0)
+        finally:
+            release.set()
+            worker.join()
+
+        self.assertEqual(self.registry.stats()["active"], 1)
+
+    def test_async_preload(self):
+        """Un contexte lu par le moteur asynchrone est ensuite créé sans requête synchrone."""
+        emotion = SimpleNamespace(emotion_type="joie", intensity=70, timestamp=datetime(2025, 4, 4, 12, 0, 0))
+
+        class AsyncDatabase:
+            async def get_recent_sensor_data(self, robot_id, limit=1):
+                return [SimpleNamespace(data={"distance": 42.0})]
+
+            async def get_current_emotion(self, robot_id):
+                return emotion
+
+            async def get_recent_events(self, robot_id, limit=5):
+                return []
+
+            async def get_recent_interactions(self, robot_id, limit=1):
+                return []
+
+        with patch.object(context_manager, 'get_async_db_manager', return_value=AsyncDatabase()):
+            loaded = asyncio.run(self.registry.preload("robot_a"))
+            context = self.registry.get("robot_a", db_context=loaded)
+            # Contexte actif : plus de lecture en base de données
+            self.assertIsNone(asyncio.run(self.registry.preload("robot_a")))
+
+        self.assertEqual(context.current_context["sensors"], {"distance": 42.0})
+        self.assertEqual(context.current_context["emotion"]["type"], "joie")
+        self.assertEqual(self.registry.robot_ids(), ["robot_a"])
+        self.mock_db.get_current_emotion.assert_not_called()
+
+    def test_failed_preload_skips_sync_read(self):
+        """Si la lecture asynchrone échoue, le contexte est créé sans lecture synchrone."""
+        class FailingDatabase:
+            async def get_recent_sensor_data(self, robot_id, limit=1):
+                raise ConnectionError("base de données indisponible")
+
+        with patch.object(context_manager, 'get_async_db_manager', return_value=FailingDatabase()):
+            loaded = asyncio.run(self.registry.preload("robot_a"))
+        context = self.registry.get("robot_a", db_context=loaded)
+
+        self.assertEqual(loaded, {})
+        self.assertEqual(context.current_context["emotion"]["type"], "neutre")
+        self.mock_db.get_current_emotion.assert_not_called()
+
+    def test_unknown_robot_is_not_listed(self):
+        """Un robot qui n'a rien envoyé n'est ni listé ni conservé à l'éviction."""
+        class EmptyDatabase:
+            async def get_recent_sensor_data(self, robot_id, limit=1):
+                return []
+
+            async def get_current_emotion(self, robot_id):
+                return None
+
+            async def get_recent_events(self, robot_id, limit=5):
+                return []
+
+            async def get_recent_interactions(self, robot_id, limit=1):
+                return []
+
+        with patch.object(context_manager, 'get_async_db_manager', return_value=EmptyDatabase()):
+            loaded = asyncio.run(self.registry.preload("robot_typo"))
+        context = self.registry.get("robot_typo", db_context=loaded)
+
+        self.assertEqual(self.registry.robot_ids(), [])
+        self.assertIsNone(self.registry.backend.load_state("robot_typo"))
+        context.last_access -= 120
+        self.assertEqual(self.registry.evict_idle(), 1)
+        self.assertEqual(self.registry.robot_ids(), [])
+
+        # Les premières données du robot le rendent connu
+        with patch.object(context_manager, 'get_write_behind'):
+            robot = self.registry.get("robot_b")
+            robot.writer = MagicMock()
+            robot.record_sensor_readings([(None, {"vision": {"distance": 10.0}})])
+        self.assertEqual(self.registry.robot_ids(), ["robot_b"])
+
+if __name__ == "__main__":
+    unittest.main()
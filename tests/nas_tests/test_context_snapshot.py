@@ -0,0 +1,150 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import sys
+import os
+import tempfile
+import threading
+from datetime import datetime
+from types import SimpleNamespace
+
+# Ajout des chemins du serveur MCP pour les imports
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../nas/serveur_mcp"))
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../nas"))
+
+# Création des mocks pour la base de données et le LLM
+sys.modules.setdefault('memoire.db_manager', MagicMock())
+sys.modules.setdefault('llm.model_manager', MagicMock())
+
+# Les tests du serveur MCP remplacent le gestionnaire de contexte par un mock
+if isinstance(sys.modules.get('context_manager'), MagicMock):
+    sys.modules.pop('context_manager')
+
+import context_manager
+from context_manager import ContextRegistry
+from context_snapshot import ContextSnapshotStore
+from state_backend import InProcessBackend
+
+class TestContextSnapshotStore(unittest.TestCase):
+    def setUp(self):
+        """Configuration avant chaque test."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "data", "context_snapshot.msgpack")
+        self.store = ContextSnapshotStore(self.path)
+
+    def tearDown(self):
+        """Nettoyage après chaque test."""
+        self.directory.cleanup()
+
+    def test_save_and_load(self):
+        """Les instantanés sont relus à l'identique ; aucun fichier temporaire ne subsiste."""
+        contexts = {
+            "robot_a": {"emotion": {"type": "joie", "intensity": 70, "last_change": "2025-04-04T12:00:00"},
+                        "recent_events": [{"type": "tap", "data": {"count": 2}}]},
+            "robot_b": {"sensors": {"vision": {"distance": 12.5}}}
+        }
+        self.assertEqual(self.store.save(contexts), 2)
+        self.assertEqual(self.store.load(), contexts)
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), ["context_snapshot.msgpack"])
+
+    def test_concurrent_saves(self):
+        """Des écritures concurrentes (point de contrôle final pendant un périodique) publient un fichier complet."""
+        contexts = [{f"robot_{index}": {"sensors": {"vision": {"distance": float(index)}}, "pad": "x" * 100000}}
+                    for index in range(8)]
+        threads = [threading.Thread(target=self.store.save, args=(snapshot,)) for snapshot in contexts]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertIn(self.store.load(), contexts)
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), ["context_snapshot.msgpack"])
+
+    def test_missing_or_corrupt_file(self):
+        """Un fichier absent ou illisible donne un démarrage à froid."""
+        self.assertEqual(self.store.load(), {})
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, "wb") as f:
+            f.write(b"\xc1 pas un instantane")
+        self.assertEqual(self.store.load(), {})
+
+    def test_disabled(self):
+        """Un chemin vide désactive les instantanés."""
+        store = ContextSnapshotStore("")
+        self.assertEqual(store.save({"robot_a": {}}), 0)
+        self.assertEqual(store.load(), {})
+
+class TestWarmStart(unittest.TestCase):
+    def setUp(self):
+        """Configuration avant chaque test."""
+        self.db_patcher = patch.object(context_manager, 'db_manager')
+        self.mock_db = self.db_patcher.start()
+        self.mock_db.get_recent_sensor_data.return_value = []
+        self.mock_db.get_current_emotion.return_value = None
+        self.mock_db.get_recent_events.return_value = []
+        self.mock_db.get_recent_interactions.return_value = []
+
+        self.directory = tempfile.TemporaryDirectory()
+        self.store = ContextSnapshotStore(os.path.join(self.directory.name, "context_snapshot.msgpack"))
+
+    def tearDown(self):
+        """Nettoyage après chaque test."""
+        self.db_patcher.stop()
+        self.directory.cleanup()
+
+    def make_registry(self):
+        return ContextRegistry(idle_ttl=60, shards=4, eviction_interval=3600,
+                               backend=InProcessBackend(), snapshot_store=self.store)
+
+    def test_restart_restores_contexts_without_db_queries(self):
+        """Après redémarrage, le contexte est repris de l'instantané sans interroger la base."""
+        registry = self.make_registry()
+        context = registry.get("robot_a")
+        context.received_data = True
+        context.current_context["emotion"] = {"type": "joie", "intensity": 80, "last_change": "2025-04-04T12:00:00"}
+        # Un robot qui n'a rien envoyé (identifiant erroné d'une requête GET) n'est pas écrit
+        registry.get("robot_inconnu")
+        self.assertEqual(registry.checkpoint(), 1)
+
+        self.mock_db.reset_mock()
+        restarted = self.make_registry()
+        self.assertEqual(restarted.warm_start(reconcile=False), 1)
+        restored = restarted.get("robot_a")
+
+        self.assertEqual(restored.current_context["emotion"]["type"], "joie")
+        self.mock_db.get_current_emotion.assert_not_called()
+        self.assertEqual(restarted.robot_ids(), ["robot_a"])
+
+    def test_reconcile_prefers_newer_db_state(self):
+        """La réconciliation retient l'émotion la plus récente et fusionne les événements."""
+        registry = self.make_registry()
+        context = registry.get("robot_a")
+        context.received_data = True
+        context.current_context["emotion"] = {"type": "joie", "intensity": 80, "last_change": "2025-04-04T12:00:00"}
+        context.current_context["recent_events"] = [
+            {"timestamp": "2025-04-04T12:00:00", "type": "sensor_interpretation", "description": "A", "data": None}
+        ]
+        registry.checkpoint()
+
+        self.mock_db.get_current_emotion.return_value = SimpleNamespace(
+            emotion_type="peur", intensity=75, timestamp=datetime(2025, 4, 4, 12, 5)
+        )
+        self.mock_db.get_recent_events.return_value = [
+            SimpleNamespace(timestamp=datetime(2025, 4, 4, 12, 5), event_type="anomaly", description="B", data={})
+        ]
+
+        restarted = self.make_registry()
+        restarted.warm_start(reconcile=False)
+        self.assertEqual(restarted.reconcile(["robot_a"]), 1)
+        restored = restarted.get("robot_a")
+
+        self.assertEqual(restored.current_context["emotion"]["type"], "peur")
+        self.assertEqual([event["description"] for event in restored.current_context["recent_events"]], ["A", "B"])
+
+        # Une base plus ancienne que l'instantané ne l'écrase pas
+        self.mock_db.get_current_emotion.return_value = SimpleNamespace(
+            emotion_type="tristesse", intensity=30, timestamp=datetime(2025, 4, 4, 11, 0)
+        )
+        restarted.reconcile(["robot_a"])
+        self.assertEqual(restored.current_context["emotion"]["type"], "peur")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,318 @@
+import unittest
+import importlib.util
+import asyncio
+import sys
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateTable
+
+# Module chargé depuis son fichier : les autres tests remplacent `memoire.db_manager` par un mock
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+_path = os.path.join(os.path.dirname(__file__), "../../nas/memoire/db_manager.py")
+_spec = importlib.util.spec_from_file_location("db_manager_under_test", _path)
+db_manager = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(db_manager)
+
+PAYLOAD = {
+    "sound": {"big_sound": 512, "small_sound": 230},
+    "vision": {"distance": 42.5, "light_level": 780, "ir_detected": True},
+    "touch": {"tap": False, "shock": True, "touch": False, "button": False},
+    "temperature": {"dht11": 21.5, "ds18b20": 21.25, "analog": 21.75, "humidity": 45.0},
+    "magnetic": {"hall": -12, "reed": False},
+    "water_level": 3,
+    "proprioception": {"acceleration": [0.5, 0.0, 9.75], "gyro": [0.0, 0.25, 0.0], "tilt": True}
+}
+
+class TestDatabaseManager(unittest.TestCase):
+    def setUp(self):
+        """Configuration avant chaque test (base SQLite en mémoire)."""
+        self.db = db_manager.DatabaseManager("sqlite://")
+        self.db.create_tables()
+
+    def test_save_many(self):
+        """Chaque table accepte des lignes par lots ; les colonnes absentes prennent leur valeur par défaut."""
+        stamp = datetime(2025, 4, 4, 12, 0, 0)
+        self.assertEqual(self.db.save_sensor_data_many([
+            {"robot_id": "robot", "timestamp": stamp, "data": {"distance": 42.0}},
+            {"robot_id": "robot", "data": {"distance": 40.0}}
+        ]), 2)
+        self.assertEqual(self.db.save_emotional_state_many([
+            {"robot_id": "robot", "emotion_type": "joie", "intensity": 70, "duration": 0}
+        ]), 1)
+        self.assertEqual(self.db.save_event_many([
+            {"robot_id": "robot", "event_type": "reflex", "description": "Obstacle"}
+        ] * 3), 3)
+        self.assertEqual(self.db.save_memory_many([
+            {"robot_id": "robot", "memory_type": "fact", "content": "Il aime la musique"}
+        ]), 1)
+        self.assertEqual(self.db.save_interaction_many([
+            {"robot_id": "robot", "interaction_type": "voice", "content": "Bonjour", "metadata": {"lang": "fr"}}
+        ]), 1)
+        self.assertEqual(self.db.save_event_many([]), 0)
+
+        readings = self.db.get_recent_sensor_data("robot")
+        self.assertEqual([reading.data["distance"] for reading in readings], [40.0, 42.0])
+        self.assertEqual(readings[1].timestamp, stamp)
+        self.assertEqual(self.db.get_current_emotion("robot").intensity, 70)
+        self.assertEqual(len(self.db.get_recent_events("robot")), 3)
+        self.assertEqual(self.db.get_memories_by_type("robot", "fact")[0].importance, 50)
+        self.assertEqual(self.db.get_recent_interactions("robot")[0].content, "Bonjour")
+
+    def test_typed_columns(self):
+        """Une lecture est stockée en colonnes typées et relue au format de SensorDataPayload."""
+        columns = db_manager.split_reading(PAYLOAD)
+        self.assertEqual((columns["distance"], columns["accel_z"], columns["hall"]), (42.5, 9.75, -12))
+        self.assertEqual(columns["flags"], 0b1000101)
+        self.assertIsNone(columns["extra"])
+
+        # Les champs hors du schéma et les vecteurs ou booléens incomplets restent en JSON
+        partial = {"vision": {"distance": 40.0, "ir_detected": True}, "proprioception": {"gyro": [1.0]}, "mood": "ok"}
+        columns = db_manager.split_reading(partial)
+        self.assertEqual(columns["distance"], 40.0)
+        self.assertEqual(columns["extra"], {"vision": {"ir_detected": True}, "proprioception": {"gyro": [1.0]},
+                                            "mood": "ok"})
+        self.assertEqual(db_manager.reading_data(columns), partial)
+
+        self.db.save_sensor_data("robot", PAYLOAD)
+        self.db.write_batch({"sensor_data": [{"robot_id": "robot", "data": partial}]})
+        readings = self.db.get_recent_sensor_data("robot")
+        self.assertEqual([reading.data for reading in readings], [partial, PAYLOAD])
+        self.assertEqual(list(readings[1].data), list(PAYLOAD))
+
+    def test_non_finite_values(self):
+        """Les valeurs non finies sont stockées à NULL, jamais dans le JSON de `extra` (refusées par PostgreSQL)."""
+        nan = float("nan")
+        reading = {"vision": {"distance": nan}, "temperature": {"dht11": float("inf")}, "water_level": nan,
+                   "proprioception": {"acceleration": [0.5, nan, 9.75], "gyro": [nan]}, "mood": [nan, 1.0]}
+        columns = db_manager.split_reading(reading)
+        self.assertEqual((columns["distance"], columns["temp_dht11"], columns["water_level"]), (None, None, None))
+        self.assertEqual((columns["accel_x"], columns["accel_y"], columns["accel_z"]), (0.5, None, 9.75))
+        self.assertEqual(columns["extra"], {"proprioception": {"gyro": [None]}, "mood": [None, 1.0]})
+        self.assertIsNone(db_manager.split_reading(nan)["extra"])
+
+        self.db.save_sensor_data_many([{"robot_id": "robot", "timestamp": datetime(2025, 4, 4, 12, 0, 0),
+                                        "data": reading}])
+        self.assertEqual(self.db.get_recent_sensor_data("robot")[0].data,
+                         {"proprioception": {"acceleration": [0.5, None, 9.75], "gyro": [None]},
+                          "mood": [None, 1.0]})
+        with self.db.engine.connect() as connection:
+            minute = connection.execute(db_manager.select(db_manager.ROLLUP_TABLES[60])).mappings().one()
+        self.assertEqual((minute["distance_count"], minute["accel_x_count"], minute["accel_y_count"]), (0, 1, 0))
+
+    def test_migrate_json_rows(self):
+        """Les lectures d'une table créée avant les colonnes typées sont converties, puis agrégées."""
+        db = db_manager.DatabaseManager("sqlite://")
+        stamp = datetime(2025, 4, 4, 12, 0, 0)
+        with db.engine.begin() as connection:
+            connection.execute(text("CREATE TABLE sensor_data (id INTEGER PRIMARY KEY, robot_id VARCHAR, "
+                                    "timestamp DATETIME NOT NULL, data JSON)"))
+            connection.execute(db_manager.insert(db_manager.legacy_sensor_table()), [
+                {"robot_id": "robot", "timestamp": stamp, "data": PAYLOAD},
+                {"robot_id": "robot", "timestamp": stamp + timedelta(seconds=1), "data": {"distance": 40.0}}
+            ])
+
+        db.create_tables()
+        readings = db.get_recent_sensor_data("robot")
+        self.assertEqual([reading.data for reading in readings], [{"distance": 40.0}, PAYLOAD])
+        with db.engine.connect() as connection:
+            columns = [row[1] for row in connection.execute(text("PRAGMA table_info(sensor_data)"))]
+        self.assertNotIn("data", columns)
+        history = db.get_sensor_history("robot", timedelta(hours=1), 60, now=stamp)
+        self.assertEqual(history["fields"]["distance"]["max"][-1], 42.5)
+        self.assertEqual(db.migrate_sensor_data(), 0)
+
+    def test_write_batch_is_atomic(self):
+        """Un lot invalide n'écrit aucune ligne."""
+        with self.assertRaises(KeyError):
+            self.db.write_batch({
+                "sensor_data": [{"robot_id": "robot", "data": {}}],
+                "unknown_table": [{"robot_id": "robot"}]
+            })
+        self.assertEqual(self.db.get_recent_sensor_data("robot"), [])
+
+    def test_retention_without_partitions(self):
+        """Sans partitions (SQLite), la rétention supprime les lignes expirées par DELETE."""
+        now = datetime(2025, 4, 4, 12, 0, 0)
+        retention = db_manager.PARTITIONED_TABLES["sensor_data"]["retention_days"]
+        self.db.save_sensor_data_many([
+            {"robot_id": "robot", "timestamp": now - timedelta(days=retention + 1), "data": {}},
+            {"robot_id": "robot", "timestamp": now, "data": {}}
+        ])
+
+        self.assertEqual(self.db.maintain_partitions(now)["sensor_data"], 1)
+        self.assertEqual([reading.timestamp for reading in self.db.get_recent_sensor_data("robot")], [now])
+
+    def test_rollups_incremental(self):
+        """Chaque écriture de lectures met à jour les agrégats par minute et par heure."""
+        now = datetime(2025, 4, 4, 12, 0, 0)
+        self.db.save_sensor_data_many([
+            {"robot_id": "robot", "timestamp": now + timedelta(seconds=10), "data": {"vision": {"distance": 40.0}}},
+            {"robot_id": "robot", "timestamp": now + timedelta(seconds=20), "data": {"vision": {"distance": 20.0}}}
+        ])
+        self.db.write_batch({"sensor_data": [
+            {"robot_id": "robot", "timestamp": now + timedelta(seconds=70),
+             "data": {"vision": {"distance": 30.0}, "proprioception": {"acceleration": [0.5, 0, 9.8]}}}
+        ]})
+
+        with self.db.engine.connect() as connection:
+            minutes = connection.execute(db_manager.select(db_manager.ROLLUP_TABLES[60])).mappings().all()
+            hours = connection.execute(db_manager.select(db_manager.ROLLUP_TABLES[3600])).mappings().all()
+        self.assertEqual([(row["bucket"], row["distance_count"], row["distance_min"], row["distance_max"])
+                          for row in minutes],
+                         [(now, 2, 20.0, 40.0), (now + timedelta(minutes=1), 1, 30.0, 30.0)])
+        self.assertEqual(len(hours), 1)
+        self.assertEqual((hours[0]["distance_count"], hours[0]["distance_sum"]), (3, 90.0))
+        self.assertEqual((hours[0]["accel_z_count"], hours[0]["hall_count"]), (1, 0))
+
+        # Le recalcul à partir des lectures brutes retrouve les mêmes agrégats
+        self.assertEqual(self.db.rebuild_rollups(now), 3)
+
+        # Agrégats triés par (robot, intervalle) : même ordre de verrouillage pour toutes les écritures
+        rows = [{"robot_id": robot, "timestamp": now + timedelta(minutes=minute), "distance": 1.0}
+                for minute, robot in ((2, "b"), (0, "b"), (1, "a"), (0, "a"))]
+        self.assertEqual([(row["robot_id"], row["bucket"]) for row in db_manager.rollup_rows(rows, 60)],
+                         [("a", now), ("a", now + timedelta(minutes=1)),
+                          ("b", now), ("b", now + timedelta(minutes=2))])
+        history = self.db.get_sensor_history("robot", timedelta(hours=1), 60, now=now + timedelta(minutes=1))
+        self.assertEqual(history["fields"]["distance"]["avg"][-2:], [30.0, 30.0])
+
+    def test_history_resolution(self):
+        """L'historique est lu dans l'agrégat le plus grossier qui fournit la résolution demandée."""
+        now = datetime(2025, 4, 4, 12, 0, 0)
+        self.db.save_sensor_data_many([
+            {"robot_id": "robot", "timestamp": now - timedelta(seconds=5 * index),
+             "data": {"vision": {"distance": float(index)}}}
+            for index in range(12)
+        ])
+
+        history = self.db.get_sensor_history("robot", timedelta(minutes=1), 12, now=now)
+        self.assertEqual((history["source"], history["step"], len(history["timestamps"])), ("sensor_data", 5, 12))
+        self.assertEqual(history["fields"]["distance"]["max"][-1], 0.0)
+
+        history = self.db.get_sensor_history("robot", timedelta(hours=1), 60, now=now)
+        self.assertEqual((history["source"], history["step"]), ("sensor_rollups_1m", 60))
+        self.assertEqual(sum(history["fields"]["distance"]["count"]), 12)
+        self.assertIsNone(history["fields"]["distance"]["avg"][0])
+        self.assertEqual(history["timestamps"][-1], "2025-04-04T12:00:00Z")
+
+        history = self.db.get_sensor_history("robot", timedelta(days=7), 60, now=now)
+        self.assertEqual((history["source"], history["step"]), ("sensor_rollups_1h", 3 * 3600))
+        self.assertEqual(sum(history["fields"]["distance"]["count"]), 12)
+
+    def test_partitioned_table(self):
+        """Sur PostgreSQL, les lectures sont partitionnées par date, de clé primaire (id, timestamp)."""
+        table = db_manager.partitioned_table(db_manager.SensorData.__table__)
+        ddl = str(CreateTable(table).compile(dialect=postgresql.dialect()))
+        self.assertIn("PARTITION BY RANGE (timestamp)", ddl)
+        self.assertIn("PRIMARY KEY (id, timestamp)", ddl)
+        self.assertEqual([index.name for index in table.indexes], ["ix_sensor_data_robot_timestamp"])
+
+    def test_partition_periods(self):
+        """Les partitions sont nommées d'après leur début, retrouvé à la rétention."""
+        start = db_manager.period_start(datetime(2025, 12, 31, 23, 59), "month")
+        self.assertEqual(db_manager.next_period(start, "month"), datetime(2026, 1, 1))
+        name = db_manager.partition_name("sensor_data", datetime(2025, 4, 4), "day")
+        self.assertEqual(name, "sensor_data_p20250404")
+        self.assertEqual(db_manager.partition_start("sensor_data", name), datetime(2025, 4, 4))
+        self.assertIsNone(db_manager.partition_start("sensor_data", "sensor_data_default"))
+
+    def test_copy_value(self):
+        """Les valeurs sont échappées pour le format texte de COPY."""
+        self.assertEqual(db_manager._copy_value(None), "\\N")
+        self.assertEqual(db_manager._copy_value("a\tb\\c\n"), "a\\tb\\\\c\\n")
+        self.assertEqual(db_manager._copy_value({"head": True}), '{"head": true}')
+        self.assertEqual(db_manager._copy_value(False), "f")
+
+@unittest.skipUnless(importlib.util.find_spec("aiosqlite"), "aiosqlite non installé")
+class TestAsyncDatabaseManager(unittest.TestCase):
+    def setUp(self):
+        """Configuration avant chaque test (fichier SQLite temporaire, pilote aiosqlite)."""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.db = db_manager.AsyncDatabaseManager(f"sqlite+aiosqlite:///{directory.name}/robot.db")
+
+    def run_async(self, scenario):
+        """Exécute un scénario dans une boucle d'événements (le moteur lui est lié)."""
+        async def run():
+            await self.db.create_tables()
+            try:
+                await scenario()
+            finally:
+                await self.db.dispose()
+        asyncio.run(run())
+
+    def test_save_and_read(self):
+        """Les méthodes d'écriture unitaires enregistrent une ligne relue ensuite."""
+        async def scenario():
+            reading = await self.db.save_sensor_data("robot", PAYLOAD)
+            self.assertIsNotNone(reading.id)
+            await self.db.save_emotional_state("robot", "joie", 70, 0)
+            await self.db.save_event("robot", "reflex", "Obstacle", {"distance": 5})
+            await self.db.save_memory("robot", "fact", "Il aime la musique")
+            await self.db.save_interaction("robot", "voice", "Bonjour", {"lang": "fr"})
+
+            readings = await self.db.get_recent_sensor_data("robot")
+            self.assertEqual([row.data for row in readings], [PAYLOAD])
+            self.assertEqual((await self.db.get_current_emotion("robot")).intensity, 70)
+            self.assertEqual((await self.db.get_recent_events("robot"))[0].data, {"distance": 5})
+            self.assertEqual((await self.db.get_memories_by_type("robot", "fact"))[0].importance, 50)
+            self.assertEqual((await self.db.get_recent_interactions("robot"))[0].content, "Bonjour")
+        self.run_async(scenario)
+
+    def test_save_many(self):
+        """Les écritures par lots insèrent toutes les lignes en une transaction."""
+        async def scenario():
+            stamp = datetime(2025, 4, 4, 12, 0, 0)
+            self.assertEqual(await self.db.save_sensor_data_many([
+                {"robot_id": "robot", "timestamp": stamp, "data": {"vision": {"distance": 42.0}}},
+                {"robot_id": "robot", "timestamp": stamp + timedelta(seconds=1),
+                 "data": {"vision": {"distance": 40.0}}}
+            ]), 2)
+            self.assertEqual(await self.db.save_event_many([
+                {"robot_id": "robot", "event_type": "reflex", "description": "Obstacle"}
+            ] * 3), 3)
+            self.assertEqual(await self.db.save_many(db_manager.LongTermMemory, [
+                {"robot_id": "robot", "memory_type": "fact", "content": "Il aime la musique"}
+            ]), 1)
+            self.assertEqual(await self.db.save_many(db_manager.Event, []), 0)
+            self.assertEqual(await self.db.write_batch({
+                "emotional_states": [{"robot_id": "robot", "emotion_type": "joie", "intensity": 70, "duration": 0}],
+                "events": [{"robot_id": "robot", "event_type": "voice_command", "description": "Bonjour"}]
+            }), 2)
+            self.assertEqual(await self.db.save_interaction_many([
+                {"robot_id": "robot", "interaction_type": "voice", "content": "Bonjour"}
+            ]), 1)
+
+            readings = await self.db.get_recent_sensor_data("robot")
+            self.assertEqual([row.data["vision"]["distance"] for row in readings], [40.0, 42.0])
+            self.assertEqual(len(await self.db.get_recent_events("robot")), 4)
+            self.assertEqual((await self.db.get_current_emotion("robot")).emotion_type, "joie")
+            self.assertEqual((await self.db.get_recent_interactions("robot"))[0].content, "Bonjour")
+        self.run_async(scenario)
+
+    def test_sensor_history(self):
+        """L'historique asynchrone lit les lectures brutes et les agrégats mis à jour à l'écriture."""
+        async def scenario():
+            now = datetime(2025, 4, 4, 12, 0, 0)
+            await self.db.save_sensor_data_many([
+                {"robot_id": "robot", "timestamp": now - timedelta(seconds=5 * index),
+                 "data": {"vision": {"distance": float(index)}}}
+                for index in range(12)
+            ])
+
+            history = await self.db.get_sensor_history("robot", timedelta(minutes=1), 12, now=now)
+            self.assertEqual((history["source"], history["step"], len(history["timestamps"])),
+                             ("sensor_data", 5, 12))
+            self.assertEqual(history["fields"]["distance"]["max"][-1], 0.0)
+
+            history = await self.db.get_sensor_history("robot", timedelta(hours=1), 60, now=now)
+            self.assertEqual((history["source"], history["step"]), ("sensor_rollups_1m", 60))
+            self.assertEqual(sum(history["fields"]["distance"]["count"]), 12)
+        self.run_async(scenario)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+import sys
+import os
+from datetime import datetime, timedelta
+
+# Ajout du chemin du serveur MCP pour les imports
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../nas/serveur_mcp"))
+
+from emotion_model import EmotionModel, NEUTRAL_EMOTION, NEUTRAL_INTENSITY
+
+START = datetime(2025, 4, 4, 12, 0, 0)
+
+class TestEmotionModel(unittest.TestCase):
+    def setUp(self):
+        """Configuration avant chaque test."""
+        self.model = EmotionModel(half_lives={"surprise": 10}, default_half_life=60, threshold=20,
+                                  weights={"robot": 1.0, "llm": 0.5})
+        self.state = self.model.stimulate(None, "joie", 80, "robot", now=START)
+
+    def test_decay_on_read(self):
+        """L'intensité est divisée par deux à chaque demi-vie, calculée à la lecture."""
+        self.assertEqual(self.model.read(self.state, START)["intensity"], 80)
+        self.assertEqual(self.model.read(self.state, START + timedelta(seconds=60))["intensity"], 40)
+        self.assertEqual(self.model.read(self.state, START + timedelta(seconds=120))["type"], "joie")
+
+        # Sous le seuil, le robot redevient neutre
+        self.assertEqual(self.model.read(self.state, START + timedelta(seconds=180)),
+                         {"type": NEUTRAL_EMOTION, "intensity": NEUTRAL_INTENSITY,
+                          "last_change": START.isoformat()})
+
+    def test_half_life_per_emotion(self):
+        """Chaque type d'émotion a sa propre demi-vie."""
+        state = self.model.stimulate(self.state, "surprise", 100, "robot", now=START)
+        self.assertEqual(self.model.read(state, START + timedelta(seconds=10))["intensity"], 50)
+
+    def test_blend_same_emotion(self):
+        """Un stimulus de même type est mélangé à l'intensité courante décrue."""
+        state = self.model.stimulate(self.state, "joie", 100, "llm", now=START + timedelta(seconds=60))
+        self.assertEqual(self.model.read(state, START + timedelta(seconds=60))["intensity"], 70)
+
+    def test_blend_other_emotion(self):
+        """Un stimulus d'un autre type ne remplace l'émotion que s'il domine le mélange."""
+        weak = self.model.stimulate(self.state, "peur", 60, "llm", now=START)
+        self.assertEqual(self.model.read(weak, START), {"type": "joie", "intensity": 40,
+                                                        "last_change": START.isoformat()})
+        self.assertEqual(weak["components"], {"joie": 40.0, "peur": 30.0})
+
+        strong = self.model.stimulate(weak, "peur", 90, "llm", now=START)
+        self.assertEqual(self.model.read(strong, START)["type"], "peur")
+
+    def test_neutral_stimulus_calms(self):
+        """Un stimulus neutre apaise toutes les composantes ; signalé par le robot, il les efface."""
+        calmed = self.model.stimulate(self.state, NEUTRAL_EMOTION, 50, "llm", now=START)
+        self.assertEqual(self.model.read(calmed, START)["intensity"], 40)
+
+        reset = self.model.stimulate(self.state, NEUTRAL_EMOTION, 50, "robot", now=START)
+        self.assertEqual(reset["components"], {})
+        self.assertEqual(self.model.read(reset, START)["type"], NEUTRAL_EMOTION)
+
+    def test_legacy_state(self):
+        """Un état sans composantes (base de données, ancien instantané) est lu tel quel puis décroît."""
+        state = {"type": "joie", "intensity": 80, "last_change": START.isoformat()}
+        self.assertEqual(self.model.read(state, START + timedelta(seconds=60))["intensity"], 40)
+        self.assertEqual(self.model.read({"type": "joie", "intensity": 80})["intensity"], 80)
+
+if __name__ == "__main__":
+    unittest.main()
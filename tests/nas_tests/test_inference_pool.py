@@ -0,0 +1,71 @@
+import unittest
+import threading
+from concurrent.futures import wait
+import sys
+import os
+
+# Ajout du chemin du serveur MCP pour les imports
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../nas/serveur_mcp"))
+
+from inference_pool import InferencePool, InferenceQueueFull
+
+class TestInferencePool(unittest.TestCase):
+    def setUp(self):
+        """Configuration avant chaque test."""
+        self.pool = InferencePool(max_workers=1, max_queue=1)
+        self.release = threading.Event()
+
+    def tearDown(self):
+        """Nettoyage après chaque test."""
+        self.release.set()
+        self.pool.shutdown(wait=True)
+
+    def _blocking_task(self, value):
+        self.release.wait(5)
+        return value
+
+    def test_submit_and_wait(self):
+        """Une tâche soumise est exécutée et son résultat récupérable."""
+        job = self.pool.submit(lambda: {"success": True}, robot_id="test_robot")
+
+        self.assertEqual(job.future.result(timeout=5), {"success": True})
+        self.assertEqual(job.status, "done")
+        self.assertEqual(job.result, {"success": True})
+        self.assertIs(self.pool.get_job(job.job_id), job)
+
+    def test_wait_timeout(self):
+        """L'attente expire sans annuler la tâche."""
+        job = self.pool.submit(self._blocking_task, 42)
+        done, _ = wait([job.future], timeout=0.05)
+
+        self.assertFalse(done)
+        self.assertFalse(job.done)
+
+        self.release.set()
+        self.assertEqual(job.future.result(timeout=5), 42)
+        self.assertEqual(job.status, "done")
+
+    def test_queue_full(self):
+        """La file est bornée à max_workers + max_queue tâches."""
+        self.pool.submit(self._blocking_task, 1)
+        self.pool.submit(self._blocking_task, 2)
+
+        with self.assertRaises(InferenceQueueFull):
+            self.pool.submit(self._blocking_task, 3)
+
+        self.release.set()
+
+    def test_error_is_recorded(self):
+        """Les exceptions de la tâche sont enregistrées dans son état."""
+        def failing():
+            raise ValueError("boom")
+
+        job = self.pool.submit(failing)
+        with self.assertRaises(ValueError):
+            job.future.result(timeout=5)
+
+        self.assertEqual(job.status, "error")
+        self.assertEqual(job.error, "boom")
+
+if __name__ == "__main__":
+    unittest.main()
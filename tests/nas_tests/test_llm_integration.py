@@ -149,10 +149,10 @@ class TestLLMIntegration(unittest.TestCase):
     
     def test_get_embeddings(self):
         """Test de l'obtention des embeddings."""
-        # Configurer le mock
-        self.mock_embedder.embed_documents.return_value = [
-            [0.1, 0.2, 0.3] * 128,  # 384D vector
-            [0.4, 0.5, 0.6] * 128   # 384D vector
+        # Configurer le mock : un vecteur 384D par texte
+        self.mock_embedder.embed_documents.side_effect = lambda texts: [
+            [0.1, 0.2, 0.3] * 128 if i % 2 == 0 else [0.4, 0.5, 0.6] * 128
+            for i in range(len(texts))
         ]
         
         # Créer l'instance
@@ -174,18 +174,6 @@ class TestLLMIntegration(unittest.TestCase):
     
     def test_semantic_search(self):
         """Test de la recherche sémantique."""
-        # Configurer des embeddings qui produiront des similarités prévisibles
-        self.mock_embedder.embed_documents.side_effect = lambda texts: [
-            [0.9, 0.1, 0.1] * 128 if i == 0 else  # Query embedding
-            [0.9, 0.1, 0.1] * 128 if i == 1 else  # Very similar to query (doc 0)
-            [0.5, 0.5, 0.5] * 128 if i == 2 else  # Somewhat similar (doc 1)
-            [0.1, 0.9, 0.9] * 128                 # Not similar (doc 2)
-            for i in range(len(texts))
-        ]
-        
-        # Créer l'instance
-        llm = LLMManager()
-        
         # Documents de test
         documents = [
             "Document très similaire à la requête",
@@ -193,6 +181,19 @@ class TestLLMIntegration(unittest.TestCase):
             "Document pas du tout similaire"
         ]
         
+        # Configurer des embeddings qui produiront des similarités prévisibles (la
+        # requête et les documents sont vectorisés par deux appels distincts)
+        vectors = {
+            "Requête de test": [0.9, 0.1, 0.1] * 128,
+            documents[0]: [0.9, 0.1, 0.1] * 128,  # Très similaire à la requête
+            documents[1]: [0.5, 0.5, 0.5] * 128,  # Moyennement similaire
+            documents[2]: [0.1, 0.9, 0.9] * 128   # Pas similaire
+        }
+        self.mock_embedder.embed_documents.side_effect = lambda texts: [vectors[text] for text in texts]
+        
+        # Créer l'instance
+        llm = LLMManager()
+        
         # Effectuer la recherche
         results = llm.semantic_search("Requête de test", documents, top_k=2)
         
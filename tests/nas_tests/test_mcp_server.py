@@ -1,5 +1,6 @@
 import unittest
 import json
+import asyncio
 from unittest.mock import patch, MagicMock
 import sys
 import os
@@ -17,6 +18,9 @@ class SensorMCPMessage(BaseModel):
     timestamp: str
     sensors: Dict[str, Any]
 
+class SensorBatchMessage(BaseModel):
+    readings: List[SensorMCPMessage]
+
 class EmotionalMCPMessage(BaseModel):
     robot_id: str
     timestamp: str
@@ -38,6 +42,7 @@ sys.modules['context_manager'] = MagicMock()
 
 # Remplacer les classes dans le module mocké
 sys.modules['schemas.mcp_schemas'].SensorMCPMessage = SensorMCPMessage
+sys.modules['schemas.mcp_schemas'].SensorBatchMessage = SensorBatchMessage
 sys.modules['schemas.mcp_schemas'].EmotionalMCPMessage = EmotionalMCPMessage
 sys.modules['schemas.mcp_schemas'].RobotCommand = RobotCommand
 sys.modules['schemas.mcp_schemas'].MCPResponse = MCPResponse
@@ -115,7 +120,8 @@ class TestMCPServer(unittest.TestCase):
     def test_receive_emotional_state(self):
         """Test de la route pour recevoir l'état émotionnel."""
         # Configuration du mock pour retourner une réponse valide
-        self.mock_context_instance.process_emotional_state.return_value = {
+        self.mock_context_instance.record_emotional_state.return_value = True
+        self.mock_context_instance.apply_emotional_state.return_value = {
             "success": True,
             "message": "État émotionnel traité avec succès",
             "emotion": {"type": "joie", "intensity": 75}
@@ -141,8 +147,9 @@ class TestMCPServer(unittest.TestCase):
         self.assertTrue(data["success"])
         self.assertEqual(data["message"], "État émotionnel traité avec succès")
         
-        # Vérification que la méthode a été appelée avec les bonnes données
-        self.mock_context_instance.process_emotional_state.assert_called_once()
+        # Vérification que l'état a été enregistré puis appliqué au contexte
+        self.mock_context_instance.record_emotional_state.assert_called_once()
+        self.mock_context_instance.apply_emotional_state.assert_called_once()
     
     def test_get_commands(self):
         """Test de la route pour récupérer les commandes."""
@@ -151,7 +158,16 @@ class TestMCPServer(unittest.TestCase):
             {"type": "expression", "payload": {"expression": "sourire", "duration": 5}},
             {"type": "mouvement", "payload": {"direction": "avant", "vitesse": 50}}
         ]
-        self.mock_context_instance.get_commands.return_value = mock_commands
+        # Le vidage de la file (stockage d'état) est exécuté hors de la boucle d'événements
+        loop_threads = []
+        def drain(robot_id):
+            try:
+                asyncio.get_running_loop()
+                loop_threads.append(robot_id)
+            except RuntimeError:
+                pass
+            return mock_commands
+        self.mock_context_instance.get_commands.side_effect = drain
         
         # Envoi de la requête
         response = self.client.get("/api/commands?robot_id=test_robot")
@@ -166,6 +182,35 @@ class TestMCPServer(unittest.TestCase):
         
         # Vérification que la méthode a été appelée avec le bon ID
         self.mock_context_instance.get_commands.assert_called_once_with("test_robot")
+        self.assertEqual(loop_threads, [])
+    
+    def test_get_commands_long_poll(self):
+        """Test du long-poll sur la route des commandes."""
+        # Aucune commande au premier passage, une commande ensuite
+        mock_command = {"type": "expression", "payload": {"expression": "sourire", "duration": 5}}
+        self.mock_context_instance.get_commands.side_effect = [[], [mock_command]]
+        
+        # Envoi de la requête avec un délai d'attente court
+        response = self.client.get("/api/commands?robot_id=test_robot&wait=0.1")
+        
+        # Vérification de la réponse
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertTrue(data["success"])
+        self.assertEqual(data["data"]["commands"], [mock_command])
+        self.assertEqual(self.mock_context_instance.get_commands.call_count, 2)
+    
+    def test_metrics(self):
+        """Test de la route d'exposition des métriques."""
+        self.client.get("/api/ping")
+        
+        response = self.client.get("/metrics")
+        
+        # Vérification de la réponse au format texte Prometheus
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("text/plain"))
+        self.assertIn("# TYPE mcp_http_request_duration_seconds histogram", response.text)
+        self.assertIn('route="/api/ping"', response.text)
     
     def test_send_command(self):
         """Test de la route pour envoyer une commande."""
@@ -215,6 +260,23 @@ class TestMCPServer(unittest.TestCase):
         self.assertIn("recent_events", data["data"])
         self.assertIn("last_interaction", data["data"])
     
+    def test_get_robot_features(self):
+        """Test de la route pour obtenir les caractéristiques des capteurs."""
+        self.mock_context_instance.get_sensor_features.return_value = {
+            "samples": 2,
+            "window_seconds": 0.5,
+            "fields": {"vision.distance": {"last": 40.0, "mean": 45.0, "min": 40.0, "max": 50.0, "slope": -20.0}},
+            "events": {"touch.tap": 1}
+        }
+        
+        response = self.client.get("/api/robot_features/test_robot")
+        
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertTrue(data["success"])
+        self.assertEqual(data["data"]["fields"]["vision.distance"]["slope"], -20.0)
+        self.assertEqual(data["data"]["events"]["touch.tap"], 1)
+    
     def test_root(self):
         """Test de la route principale."""
         response = self.client.get("/")
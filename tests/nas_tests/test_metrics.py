@@ -0,0 +1,69 @@
+import unittest
+import sys
+import os
+
+# Ajout du chemin du serveur MCP pour les imports
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../nas/serveur_mcp"))
+
+from metrics import MetricsRegistry, Histogram, observe_llm_timings, SENSOR_STAGE_LATENCY, LLM_TOKENS_PER_SECOND
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        """Configuration avant chaque test."""
+        self.registry = MetricsRegistry()
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Les comptes par borne sont cumulés, la somme et le nombre sont exposés."""
+        histogram = self.registry.histogram("test_latency_seconds", "Latence", ("route",), buckets=(0.1, 1.0))
+        histogram.observe(0.05, "/api/ping")
+        histogram.observe(0.1, "/api/ping")
+        histogram.observe(5.0, "/api/ping")
+
+        text = self.registry.render()
+        self.assertIn('test_latency_seconds_bucket{route="/api/ping",le="0.1"} 2', text)
+        self.assertIn('test_latency_seconds_bucket{route="/api/ping",le="1.0"} 2', text)
+        self.assertIn('test_latency_seconds_bucket{route="/api/ping",le="+Inf"} 3', text)
+        self.assertIn('test_latency_seconds_count{route="/api/ping"} 3', text)
+        self.assertIn('test_latency_seconds_sum{route="/api/ping"} 5.15', text)
+
+    def test_counter_and_gauge_function(self):
+        """Les compteurs s'incrémentent et les jauges calculées sont évaluées à la collecte."""
+        counter = self.registry.counter("test_total", "Compteur")
+        gauge = self.registry.gauge("test_depth", "Profondeur")
+        depth = [3]
+        gauge.set_function(lambda: depth[0])
+        counter.inc()
+        counter.inc(2)
+
+        depth[0] = 7
+        text = self.registry.render()
+        self.assertIn("# TYPE test_total counter\ntest_total 3", text)
+        self.assertIn("test_depth 7", text)
+
+    def test_label_values_are_escaped(self):
+        """Les valeurs d'étiquettes sont échappées."""
+        counter = self.registry.counter("test_errors_total", "Erreurs", ("message",))
+        counter.inc(1, 'dit "bonjour"')
+
+        self.assertIn('test_errors_total{message="dit \\"bonjour\\""} 1', self.registry.render())
+
+    def test_wrong_label_count(self):
+        """Un nombre d'étiquettes incorrect est refusé."""
+        histogram = Histogram("test_seconds", "Durée", ("stage",))
+        with self.assertRaises(ValueError):
+            histogram.observe(1.0)
+
+    def test_llm_timings(self):
+        """Les durées de l'analyse LLM alimentent les étapes et le débit en tokens/s."""
+        before = SENSOR_STAGE_LATENCY.count("generation")
+        before_wait = SENSOR_STAGE_LATENCY.count("llm_lock_wait")
+        observe_llm_timings({"prompt_build": 0.001, "llm_lock_wait": 1.5, "generation": 2.0,
+                             "json_parse": 0.0005, "completion_tokens": 50})
+
+        self.assertEqual(SENSOR_STAGE_LATENCY.count("generation"), before + 1)
+        self.assertEqual(SENSOR_STAGE_LATENCY.count("llm_lock_wait"), before_wait + 1)
+        # L'attente du modèle n'entre pas dans le débit
+        self.assertEqual(LLM_TOKENS_PER_SECOND.value(), 25.0)
+
+if __name__ == "__main__":
+    unittest.main()
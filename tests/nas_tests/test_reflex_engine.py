@@ -0,0 +1,93 @@
+import unittest
+import sys
+import os
+import json
+import shutil
+import tempfile
+
+# Ajout du chemin du serveur MCP pour les imports
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../nas/serveur_mcp"))
+
+from reflex_engine import ReflexEngine, ReflexRuleError, REFLEX_RULES_PATH
+from conftest import make_sensor_data
+
+class TestReflexEngine(unittest.TestCase):
+    def setUp(self):
+        """Configuration avant chaque test."""
+        self.engine = ReflexEngine(REFLEX_RULES_PATH)
+        self.last_fired = {}
+
+    def test_default_rules(self):
+        """Les règles par défaut suivent la table stimulus → émotion du README."""
+        shock = make_sensor_data()
+        shock["touch"]["shock"] = True
+        fired, commands = self.engine.evaluate(shock, self.last_fired, now=0)
+        self.assertEqual(fired, ["choc"])
+        self.assertEqual(commands[0], {"command_type": "emotion", "emotion": {"emotion": "colere", "intensity": 80}})
+        self.assertEqual(commands[1]["movement"]["direction"], "stop")
+
+        fired, commands = self.engine.evaluate(make_sensor_data(distance=8.0), self.last_fired, now=0)
+        self.assertEqual(fired, ["obstacle_proche"])
+        self.assertEqual(commands[0]["emotion"]["emotion"], "peur")
+        self.assertEqual(commands[1]["movement"]["direction"], "backward")
+
+        fired, commands = self.engine.evaluate(make_sensor_data(touch=True), self.last_fired, now=0)
+        self.assertEqual(fired, ["toucher"])
+        self.assertEqual(commands, [{"command_type": "emotion", "emotion": {"emotion": "tendresse", "intensity": 70}}])
+
+    def test_no_match(self):
+        """Des données calmes ne déclenchent aucun réflexe."""
+        self.assertEqual(self.engine.evaluate(make_sensor_data(), self.last_fired), ([], []))
+
+    def test_priority_and_cooldown(self):
+        """L'émotion la plus prioritaire l'emporte et une règle respecte son délai de réarmement."""
+        data = make_sensor_data(distance=8.0, touch=True)
+        fired, commands = self.engine.evaluate(data, self.last_fired, now=100.0)
+        self.assertEqual(fired, ["obstacle_proche", "toucher"])
+        self.assertEqual([c["command_type"] for c in commands], ["emotion", "movement"])
+        self.assertEqual(commands[0]["emotion"]["emotion"], "peur")
+
+        fired, _ = self.engine.evaluate(data, self.last_fired, now=101.0)
+        self.assertEqual(fired, [])
+        fired, _ = self.engine.evaluate(data, self.last_fired, now=103.5)
+        self.assertEqual(fired, ["obstacle_proche"])
+
+    def test_commands_are_copies(self):
+        """Les commandes retournées peuvent être modifiées sans altérer les règles."""
+        _, commands = self.engine.evaluate(make_sensor_data(distance=8.0), self.last_fired, now=0)
+        commands[1]["movement"]["speed"] = 0
+        _, commands = self.engine.evaluate(make_sensor_data(distance=8.0), {}, now=0)
+        self.assertEqual(commands[1]["movement"]["speed"], 60)
+
+    def test_invalid_rule(self):
+        """Un opérateur inconnu est refusé à la compilation."""
+        with self.assertRaises(ReflexRuleError):
+            ReflexEngine(rules=[{"name": "x", "when": {"vision.distance": {"around": 3}}}])
+
+    def test_hot_reload(self):
+        """Le fichier des règles est rechargé lorsqu'il est modifié ; un fichier invalide est ignoré."""
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, "reflexes.json")
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"rules": [{"name": "bouton", "when": {"touch.button": True},
+                                      "emotion": {"emotion": "joie", "intensity": 60}}]}, f)
+            engine = ReflexEngine(path, reload_interval=0)
+            self.assertEqual([rule.name for rule in engine.rules], ["bouton"])
+
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"rules": [{"name": "reed", "when": {"magnetic.reed": True}}]}, f)
+            os.utime(path, (1, 1))
+            engine.evaluate(make_sensor_data(), {})
+            self.assertEqual([rule.name for rule in engine.rules], ["reed"])
+
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("{ invalide")
+            os.utime(path, (2, 2))
+            engine.evaluate(make_sensor_data(), {})
+            self.assertEqual([rule.name for rule in engine.rules], ["reed"])
+        finally:
+            shutil.rmtree(directory)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+import sys
+import os
+
+# Ajout du chemin du serveur MCP pour les imports
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../nas/serveur_mcp"))
+
+from reporting_hints import ActivityMeter, ReportingAdvisor
+
+CONFIG = {"edges": {"touch_sensors.head": True}, "deadbands": {"distance": 10}}
+
+class FakePool:
+    def __init__(self, running=0, queue_depth=0):
+        self.running = running
+        self.queue_depth = queue_depth
+        self.max_workers = 1
+        self.max_queue = 3
+
+class FakeScheduler:
+    def __init__(self, pending=0):
+        self.pending = pending
+
+    def stats(self):
+        return {"pending": self.pending, "waiting_for_pool": 0}
+
+class TestReportingHints(unittest.TestCase):
+    def _advisor(self, pool=None, scheduler=None, cpu=0.0):
+        return ReportingAdvisor(pool or FakePool(), scheduler or FakeScheduler(), min_interval=1000,
+                                max_interval=16000, load_threshold=0.5, refresh=0, cpu_load=lambda: cpu)
+
+    def test_activity_meter(self):
+        """L'activité reste nulle pour des lectures identiques et croît lorsqu'elles changent."""
+        meter = ActivityMeter(alpha=0.5, config=CONFIG)
+        for _ in range(5):
+            meter.update({"distance": 100, "touch_sensors": {"head": False}})
+        self.assertEqual(meter.level, 0.0)
+
+        # Variation sous la bande morte : pas d'activité
+        meter.update({"distance": 105, "touch_sensors": {"head": False}})
+        self.assertEqual(meter.level, 0.0)
+
+        meter.update({"distance": 105, "touch_sensors": {"head": True}})
+        meter.update({"distance": 150, "touch_sensors": {"head": True}})
+        self.assertEqual(meter.level, 0.75)
+
+    def test_interval_follows_activity(self):
+        """Un robot calme est ralenti au maximum, un robot très actif accéléré au minimum."""
+        advisor = self._advisor()
+        self.assertEqual(advisor.hints(0.0)["send_interval_ms"], 16000)
+        self.assertEqual(advisor.hints(0.5)["send_interval_ms"], 4000)
+        self.assertEqual(advisor.hints(1.0)["send_interval_ms"], 1000)
+
+    def test_load_slows_robots(self):
+        """Au-delà du seuil de charge, l'intervalle s'allonge jusqu'à doubler à saturation."""
+        saturated = self._advisor(pool=FakePool(running=1, queue_depth=2), scheduler=FakeScheduler(pending=1))
+        hints = saturated.hints(1.0)
+        self.assertEqual(hints["llm_load"], 1.0)
+        self.assertEqual(hints["send_interval_ms"], 2000)
+
+        # Charge CPU à mi-chemin entre le seuil et la saturation
+        self.assertEqual(self._advisor(cpu=0.75).hints(1.0)["send_interval_ms"], 1500)
+
+        # Un robot calme n'est jamais ralenti au-delà du maximum
+        self.assertEqual(saturated.hints(0.0)["send_interval_ms"], 16000)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+import unittest
+import asyncio
+import threading
+import sys
+import os
+
+# Ajout du chemin du serveur MCP pour les imports
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../nas/serveur_mcp"))
+
+from robot_actor import ActorSystem, MailboxFull, MessageDropped, DROP_OLDEST, BLOCK, REJECT
+
+POLICIES = {"sensor": DROP_OLDEST, "command": BLOCK, "interaction": REJECT}
+
+class TestRobotActor(unittest.TestCase):
+    def setUp(self):
+        """Configuration avant chaque test."""
+        self.release = threading.Event()
+        self.processed = []
+
+    def tearDown(self):
+        """Nettoyage après chaque test."""
+        self.release.set()
+
+    def _record(self, value):
+        self.processed.append(value)
+        return value
+
+    def _blocking(self, value):
+        self.release.wait(5)
+        return self._record(value)
+
+    def test_messages_processed_in_order(self):
+        """Les messages d'un robot sont traités un à un, dans leur ordre d'arrivée."""
+        async def scenario():
+            system = ActorSystem(mailbox_size=100, policies=POLICIES)
+            results = await asyncio.gather(*(system.ask("robot", "command", self._record, i) for i in range(50)))
+            await system.shutdown()
+            return results
+
+        self.assertEqual(asyncio.run(scenario()), list(range(50)))
+        self.assertEqual(self.processed, list(range(50)))
+
+    def test_robots_processed_in_parallel(self):
+        """Les messages de robots différents s'exécutent en parallèle."""
+        barrier = threading.Barrier(2, timeout=5)
+
+        def meet(value):
+            barrier.wait()
+            return value
+
+        async def scenario():
+            system = ActorSystem(policies=POLICIES)
+            results = await asyncio.gather(system.ask("robot_1", "sensor", meet, 1),
+                                           system.ask("robot_2", "sensor", meet, 2))
+            await system.shutdown()
+            return results
+
+        self.assertEqual(asyncio.run(scenario()), [1, 2])
+
+    def test_drop_oldest_sensor(self):
+        """Boîte pleine : la plus ancienne lecture en attente est évincée par la nouvelle."""
+        async def scenario():
+            system = ActorSystem(mailbox_size=1, policies=POLICIES)
+            running = asyncio.ensure_future(system.ask("robot", "sensor", self._blocking, 1))
+            await asyncio.sleep(0.05)
+            dropped = asyncio.ensure_future(system.ask("robot", "sensor", self._record, 2))
+            await asyncio.sleep(0)
+            latest = asyncio.ensure_future(system.ask("robot", "sensor", self._record, 3))
+            await asyncio.sleep(0)
+            self.assertEqual(system.depth("sensor"), 1)
+
+            self.release.set()
+            results = await asyncio.gather(running, dropped, latest, return_exceptions=True)
+            await system.shutdown()
+            return results
+
+        running, dropped, latest = asyncio.run(scenario())
+        self.assertEqual((running, latest), (1, 3))
+        self.assertIsInstance(dropped, MessageDropped)
+        self.assertEqual(self.processed, [1, 3])
+
+    def test_block_never_drops_commands(self):
+        """Boîte pleine : une commande attend une place et n'est jamais perdue."""
+        async def scenario():
+            system = ActorSystem(mailbox_size=1, policies=POLICIES)
+            running = asyncio.ensure_future(system.ask("robot", "command", self._blocking, 1))
+            await asyncio.sleep(0.05)
+            queued = [asyncio.ensure_future(system.ask("robot", "command", self._record, i)) for i in (2, 3, 4)]
+            await asyncio.sleep(0.05)
+            self.assertEqual(system.max_depth(), 1)
+
+            self.release.set()
+            results = await asyncio.gather(running, *queued)
+            await system.shutdown()
+            return results
+
+        self.assertEqual(asyncio.run(scenario()), [1, 2, 3, 4])
+        self.assertEqual(self.processed, [1, 2, 3, 4])
+
+    def test_reject_when_full(self):
+        """Boîte pleine : un message à la politique `reject` est refusé."""
+        async def scenario():
+            system = ActorSystem(mailbox_size=1, policies=POLICIES)
+            running = asyncio.ensure_future(system.ask("robot", "interaction", self._blocking, 1))
+            await asyncio.sleep(0.05)
+            queued = asyncio.ensure_future(system.ask("robot", "interaction", self._record, 2))
+            await asyncio.sleep(0)
+            with self.assertRaises(MailboxFull):
+                await system.ask("robot", "interaction", self._record, 3)
+
+            self.release.set()
+            results = await asyncio.gather(running, queued)
+            await system.shutdown()
+            return results
+
+        self.assertEqual(asyncio.run(scenario()), [1, 2])
+
+    def test_idle_actor_stops(self):
+        """Un acteur sans message s'arrête après son délai d'inactivité."""
+        async def scenario():
+            system = ActorSystem(idle_ttl=0.05, policies=POLICIES)
+            await system.ask("robot", "sensor", self._record, 1)
+            self.assertEqual(system.active_count(), 1)
+            await asyncio.sleep(0.2)
+            return system.active_count()
+
+        self.assertEqual(asyncio.run(scenario()), 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+import sys
+import os
+import math
+
+# Ajout du chemin du serveur MCP pour les imports
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../nas/serveur_mcp"))
+
+import numpy as np
+from sensor_window import SensorWindow
+from conftest import make_sensor_data
+
+class TestSensorWindow(unittest.TestCase):
+    def test_rolling_statistics_match_window(self):
+        """Les statistiques glissantes correspondent à un calcul direct sur la fenêtre."""
+        window = SensorWindow(size=8)
+        start = 1.7e9
+        readings = [(start + 0.25 * i, 100.0 - 1.5 * i + (i % 3)) for i in range(50)]
+        for timestamp, distance in readings:
+            window.add(make_sensor_data(distance=distance), timestamp)
+
+        kept = readings[-8:]
+        times = np.array([t - start for t, _ in kept])
+        distances = np.array([d for _, d in kept])
+        stats = window.features()["fields"]["vision.distance"]
+
+        self.assertEqual(window.features()["samples"], 8)
+        self.assertAlmostEqual(window.features()["window_seconds"], 1.75)
+        self.assertEqual(stats["last"], distances[-1])
+        self.assertAlmostEqual(stats["mean"], distances.mean())
+        self.assertEqual(stats["min"], distances.min())
+        self.assertEqual(stats["max"], distances.max())
+        self.assertAlmostEqual(stats["slope"], np.polyfit(times, distances, 1)[0], places=6)
+
+    def test_event_counts_follow_window(self):
+        """Seuls les fronts montants présents dans la fenêtre sont comptés."""
+        window = SensorWindow(size=4)
+        for tap in (True, True, False, True):
+            window.add(make_sensor_data(tap=tap))
+        self.assertEqual(window.features()["events"]["touch.tap"], 2)
+
+        for _ in range(3):
+            window.add(make_sensor_data())
+        self.assertEqual(window.features()["events"]["touch.tap"], 1)
+        window.add(make_sensor_data())
+        self.assertEqual(window.features()["events"]["touch.tap"], 0)
+
+    def test_vector_magnitude_and_missing_fields(self):
+        """La norme des vecteurs est calculée ; un champ absent est ignoré."""
+        window = SensorWindow(size=4)
+        window.add(make_sensor_data(acceleration=(3.0, 4.0, 0.0)))
+        partial = make_sensor_data(acceleration=(0.0, 0.0, 1.0))
+        del partial["magnetic"]
+        window.add(partial)
+
+        fields = window.features()["fields"]
+        self.assertAlmostEqual(fields["proprioception.acceleration.magnitude"]["max"], 5.0)
+        self.assertAlmostEqual(fields["proprioception.acceleration.magnitude"]["mean"], 3.0)
+        self.assertEqual(fields["magnetic.hall"]["mean"], 0.0)
+        self.assertIsNone(fields["magnetic.hall"]["last"])
+
+    def test_trends_keep_significant_fields(self):
+        """Le résumé pour le LLM ne retient que les champs ayant varié au-delà de leur bande morte."""
+        window = SensorWindow(size=8)
+        for i in range(4):
+            window.add(make_sensor_data(distance=60.0 - 10 * i, hall=i), 1000.0 + i)
+
+        trends = window.trends({"vision.distance": 5.0, "magnetic.hall": 10})
+        self.assertEqual(list(trends["fields"]), ["vision.distance"])
+        self.assertAlmostEqual(trends["fields"]["vision.distance"]["slope"], -10.0)
+        self.assertEqual(trends["events"], {})
+        self.assertTrue(all(not math.isnan(value) for value in trends["fields"]["vision.distance"].values()))
+
+if __name__ == "__main__":
+    unittest.main()
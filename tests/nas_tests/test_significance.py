@@ -0,0 +1,67 @@
+import unittest
+import sys
+import os
+import json
+import tempfile
+
+# Ajout du chemin du serveur MCP pour les imports
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../nas/serveur_mcp"))
+
+from significance import SignificanceFilter, load_significance_config
+from conftest import make_sensor_data
+
+class TestSignificanceFilter(unittest.TestCase):
+    def setUp(self):
+        """Configuration avant chaque test."""
+        self.config = load_significance_config("")
+        self.filter = SignificanceFilter(self.config)
+        self.assertEqual(self.filter.check(make_sensor_data()), "first")
+
+    def test_identical_reading_is_skipped(self):
+        """Une lecture identique ne déclenche pas d'analyse."""
+        self.assertIsNone(self.filter.check(make_sensor_data()))
+
+    def test_deadband_is_measured_from_last_analysis(self):
+        """Les petites variations successives finissent par dépasser la bande morte."""
+        self.assertIsNone(self.filter.check(make_sensor_data(distance=97.0)))
+        self.assertIsNone(self.filter.check(make_sensor_data(distance=96.0)))
+        self.assertEqual(self.filter.check(make_sensor_data(distance=94.0)), "delta:vision.distance")
+        self.assertIsNone(self.filter.check(make_sensor_data(distance=93.0)))
+
+    def test_vector_deadband(self):
+        """La variation d'un vecteur est mesurée par sa norme."""
+        moved = make_sensor_data()
+        moved["proprioception"]["acceleration"] = [1.0, 1.5, 9.8]
+        self.assertEqual(self.filter.check(moved), "delta:proprioception.acceleration")
+
+    def test_rising_edge(self):
+        """Le passage à vrai d'un booléen déclenche l'analyse, pas son maintien ni son retour à faux."""
+        self.assertEqual(self.filter.check(make_sensor_data(touch=True)), "edge:touch.touch")
+        self.assertIsNone(self.filter.check(make_sensor_data(touch=True)))
+        self.assertIsNone(self.filter.check(make_sensor_data(touch=False)))
+
+    def test_edge_inside_batch(self):
+        """Un front au milieu d'un lot déclenche l'analyse."""
+        readings = [make_sensor_data(), make_sensor_data(touch=True), make_sensor_data()]
+        self.assertEqual(self.filter.check_many(readings), "edge:touch.touch")
+
+    def test_max_staleness(self):
+        """Une analyse trop ancienne n'est pas réutilisée."""
+        self.config["max_staleness"] = 0
+        self.assertEqual(self.filter.check(make_sensor_data()), "stale")
+
+    def test_config_file_overrides_defaults(self):
+        """Le fichier de configuration surcharge les valeurs par défaut champ par champ."""
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+            json.dump({"max_staleness": 5, "deadbands": {"vision.distance": 50}}, f)
+        try:
+            config = load_significance_config(f.name)
+        finally:
+            os.unlink(f.name)
+
+        self.assertEqual(config["max_staleness"], 5)
+        self.assertEqual(config["deadbands"]["vision.distance"], 50)
+        self.assertIn("vision.light_level", config["deadbands"])
+
+if __name__ == "__main__":
+    unittest.main()
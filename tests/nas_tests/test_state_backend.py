@@ -0,0 +1,313 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import importlib.util
+import sys
+import os
+import shutil
+import tempfile
+import threading
+from datetime import datetime
+from types import SimpleNamespace
+
+# Ajout des chemins du serveur MCP pour les imports
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../nas/serveur_mcp"))
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../nas"))
+
+# Création des mocks pour la base de données et le LLM
+sys.modules.setdefault('memoire.db_manager', MagicMock())
+sys.modules.setdefault('llm.model_manager', MagicMock())
+
+# test_mcp_server remplace le module context_manager par un mock : utiliser le vrai module
+if isinstance(sys.modules.get('context_manager'), MagicMock):
+    sys.modules.pop('context_manager')
+
+import context_manager
+from context_manager import ContextRegistry
+from state_backend import StateBackend, InProcessBackend, SQLiteBackend, RedisBackend
+
+class BackendContractMixin:
+    """Comportement commun à tous les stockages de l'état."""
+
+    def test_state_fields_are_merged(self):
+        """Les champs mis à jour séparément sont conservés."""
+        self.assertIsNone(self.backend.load_state("robot_a"))
+        self.backend.update_state("robot_a", {"sensors": {"water_level": 3}})
+        self.backend.update_state("robot_a", {"emotion": {"type": "joie", "intensity": 60}})
+
+        state = self.backend.load_state("robot_a")
+        self.assertEqual(state["sensors"], {"water_level": 3})
+        self.assertEqual(state["emotion"]["type"], "joie")
+        self.assertEqual(self.backend.robot_ids(), ["robot_a"])
+
+    def test_recent_events_are_bounded(self):
+        """Seuls les derniers événements sont conservés."""
+        for index in range(7):
+            self.backend.append_event("robot_a", {"description": str(index)}, 5)
+
+        events = self.backend.load_state("robot_a")["recent_events"]
+        self.assertEqual([event["description"] for event in events], ["2", "3", "4", "5", "6"])
+
+    def test_drain_commands(self):
+        """Les commandes sont délivrées dans l'ordre, une seule fois."""
+        self.backend.push_commands("robot_a", [{"command_type": "sound"}, {"command_type": "movement"}])
+
+        self.assertTrue(self.backend.has_commands("robot_a"))
+        self.assertFalse(self.backend.has_commands("robot_b"))
+        commands = self.backend.drain_commands("robot_a")
+        self.assertEqual([command["command_type"] for command in commands], ["sound", "movement"])
+        self.assertEqual(self.backend.drain_commands("robot_a"), [])
+
+def hammer_commands(push, drain, producers=8, commands=2000, consumers=4):
+    """
+    Met des commandes en file depuis plusieurs threads pendant que d'autres
+    threads vident la file, et retourne les commandes délivrées.
+    """
+    delivered = []
+    lock = threading.Lock()
+    done = threading.Event()
+    interval = sys.getswitchinterval()
+    # Changer de thread très souvent pour multiplier les entrelacements
+    sys.setswitchinterval(1e-6)
+
+    def produce(producer):
+        for index in range(commands):
+            push({"producer": producer, "index": index})
+
+    def consume():
+        while True:
+            finished = done.is_set()
+            batch = drain()
+            with lock:
+                delivered.extend(batch)
+            if finished and not batch:
+                return
+
+    try:
+        threads = [threading.Thread(target=consume) for _ in range(consumers)]
+        producer_threads = [threading.Thread(target=produce, args=(producer,)) for producer in range(producers)]
+        for thread in threads + producer_threads:
+            thread.start()
+        for thread in producer_threads:
+            thread.join(30)
+        done.set()
+        for thread in threads:
+            thread.join(30)
+    finally:
+        sys.setswitchinterval(interval)
+    return delivered
+
+class TestInProcessBackend(BackendContractMixin, unittest.TestCase):
+    def setUp(self):
+        """Configuration avant chaque test."""
+        self.backend = InProcessBackend()
+
+    def test_concurrent_push_and_drain_loses_no_command(self):
+        """Des ajouts et vidages concurrents ne perdent ni ne dupliquent de commande."""
+        delivered = hammer_commands(
+            lambda command: self.backend.push_commands("robot_a", [command]),
+            lambda: self.backend.drain_commands("robot_a")
+        )
+
+        self.assertEqual(len(delivered), 8 * 2000)
+        self.assertEqual(len({(command["producer"], command["index"]) for command in delivered}), 8 * 2000)
+        self.assertFalse(self.backend.has_commands("robot_a"))
+
+    def test_drain_preserves_order_of_each_producer(self):
+        """Les commandes d'un même thread sont délivrées dans l'ordre de leur mise en file."""
+        delivered = hammer_commands(
+            lambda command: self.backend.push_commands("robot_a", [command]),
+            lambda: self.backend.drain_commands("robot_a"),
+            consumers=1
+        )
+
+        for producer in range(8):
+            indexes = [command["index"] for command in delivered if command["producer"] == producer]
+            self.assertEqual(indexes, list(range(2000)))
+
+class TestStateBackendInterface(unittest.TestCase):
+    def test_incomplete_backend_cannot_be_built(self):
+        """Un stockage auquel il manque une méthode est refusé à sa création."""
+        class IncompleteBackend(StateBackend):
+            def load_state(self, robot_id):
+                return None
+
+        with self.assertRaises(TypeError):
+            IncompleteBackend()
+
+@unittest.skipUnless(importlib.util.find_spec("fakeredis"), "fakeredis non installé")
+class TestRedisBackend(BackendContractMixin, unittest.TestCase):
+    def setUp(self):
+        """Configuration avant chaque test (serveur Redis simulé par fakeredis)."""
+        import fakeredis
+
+        self.server = fakeredis.FakeServer()
+        self.backend = self._backend()
+
+    def _backend(self) -> RedisBackend:
+        """Stockage Redis connecté au serveur simulé (un par worker)."""
+        import fakeredis
+
+        client = fakeredis.FakeRedis(server=self.server, decode_responses=True)
+        with patch("redis.Redis.from_url", return_value=client):
+            return RedisBackend("redis://localhost:6379/0", prefix="test")
+
+    def tearDown(self):
+        """Nettoyage après chaque test."""
+        self.backend.close()
+
+    def test_state_is_shared_between_workers(self):
+        """Deux workers voient le même état, les mêmes commandes et les mêmes tâches."""
+        other = self._backend()
+        self.backend.update_state("robot_a", {"emotion": {"type": "joie"}})
+        self.backend.push_commands("robot_a", [{"command_type": "sound"}])
+        self.backend.save_job("job", {"status": "done"})
+
+        self.assertEqual(other.load_state("robot_a"), {"emotion": {"type": "joie"}})
+        self.assertEqual(other.drain_commands("robot_a"), [{"command_type": "sound"}])
+        self.assertEqual(self.backend.drain_commands("robot_a"), [])
+        self.assertEqual(other.load_job("job"), {"status": "done"})
+        self.assertEqual(other.robot_ids(), ["robot_a"])
+
+class TestSQLiteBackend(BackendContractMixin, unittest.TestCase):
+    def setUp(self):
+        """Configuration avant chaque test."""
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "state.db")
+        self.backend = SQLiteBackend(self.path)
+
+    def tearDown(self):
+        """Nettoyage après chaque test."""
+        self.backend.close()
+        shutil.rmtree(self.directory)
+
+    def test_concurrent_drain_delivers_each_command_once(self):
+        """Deux workers vidant la même file ne perdent ni ne dupliquent de commande."""
+        other = SQLiteBackend(self.path)
+        delivered = []
+        lock = threading.Lock()
+        done = threading.Event()
+
+        def consume(backend):
+            while not done.is_set() or backend.has_commands("robot_a"):
+                commands = backend.drain_commands("robot_a")
+                with lock:
+                    delivered.extend(command["index"] for command in commands)
+            backend.close()
+
+        consumers = [threading.Thread(target=consume, args=(backend,)) for backend in (self.backend, other)]
+        for consumer in consumers:
+            consumer.start()
+        for index in range(200):
+            self.backend.push_commands("robot_a", [{"index": index}])
+        done.set()
+        for consumer in consumers:
+            consumer.join(10)
+
+        self.assertEqual(sorted(delivered), list(range(200)))
+
+    def test_jobs_are_shared(self):
+        """L'état d'une tâche publié par un worker est lisible par un autre."""
+        self.backend.save_job("job-1", {"job_id": "job-1", "status": "done", "result": {"success": True}})
+
+        other = SQLiteBackend(self.path)
+        self.assertEqual(other.load_job("job-1")["result"], {"success": True})
+        self.assertIsNone(other.load_job("job-2"))
+        other.close()
+
+class TestSharedRegistries(unittest.TestCase):
+    """Deux registres sur le même fichier SQLite simulent deux workers Uvicorn."""
+
+    def setUp(self):
+        """Configuration avant chaque test."""
+        self.db_patcher = patch.object(context_manager, 'db_manager')
+        self.mock_db = self.db_patcher.start()
+        self.mock_db.get_recent_sensor_data.return_value = []
+        self.mock_db.get_current_emotion.return_value = None
+        self.mock_db.get_recent_events.return_value = []
+        self.mock_db.get_recent_interactions.return_value = []
+
+        self.directory = tempfile.mkdtemp()
+        path = os.path.join(self.directory, "state.db")
+        self.worker_a = ContextRegistry(eviction_interval=3600, backend=SQLiteBackend(path))
+        self.worker_b = ContextRegistry(eviction_interval=3600, backend=SQLiteBackend(path))
+
+    def tearDown(self):
+        """Nettoyage après chaque test."""
+        self.db_patcher.stop()
+        self.worker_a.backend.close()
+        self.worker_b.backend.close()
+        shutil.rmtree(self.directory)
+
+    def test_command_queued_by_one_worker_is_delivered_by_another(self):
+        """Une commande mise en file par un worker est délivrée par l'autre."""
+        self.worker_b.get("robot_a")
+        self.worker_a.get("robot_a").add_command({"command_type": "sound"})
+
+        self.assertEqual(len(self.worker_b.get("robot_a").get_commands("robot_a")), 1)
+        self.assertEqual(self.worker_a.get("robot_a").get_commands("robot_a"), [])
+
+    def test_state_is_consistent_across_workers(self):
+        """L'état modifié par un worker est visible par l'autre."""
+        # Robot connu de la base de données : son contexte est publié dès sa création
+        self.mock_db.get_current_emotion.return_value = SimpleNamespace(
+            emotion_type="neutre", intensity=50, timestamp=datetime(2025, 4, 4, 12, 0)
+        )
+        context_b = self.worker_b.get("robot_a")
+        self.worker_a.get("robot_a").process_emotional_state({"type": "joie", "intensity": 40, "duration": 1000})
+
+        self.assertIs(self.worker_b.get("robot_a"), context_b)
+        self.assertEqual(context_b.current_context["emotion"]["type"], "joie")
+        self.assertEqual(self.worker_b.robot_ids(), ["robot_a"])
+        # Le contexte n'est chargé depuis la base de données qu'une seule fois
+        self.assertEqual(self.mock_db.get_current_emotion.call_count, 1)
+
+class TestConcurrentContext(unittest.TestCase):
+    """Requêtes concurrentes sur le contexte d'un même robot (stockage en mémoire)."""
+
+    def setUp(self):
+        """Configuration avant chaque test."""
+        self.db_patcher = patch.object(context_manager, 'db_manager')
+        self.mock_db = self.db_patcher.start()
+        self.mock_db.get_recent_sensor_data.return_value = []
+        self.mock_db.get_current_emotion.return_value = None
+        self.mock_db.get_recent_events.return_value = []
+        self.mock_db.get_recent_interactions.return_value = []
+        self.writer_patcher = patch.object(context_manager, 'get_write_behind')
+        self.writer_patcher.start()
+
+        self.registry = ContextRegistry(eviction_interval=3600, backend=InProcessBackend())
+        self.context = self.registry.get("robot_a")
+
+    def tearDown(self):
+        """Nettoyage après chaque test."""
+        self.writer_patcher.stop()
+        self.db_patcher.stop()
+
+    def test_add_command_and_get_commands_lose_nothing(self):
+        """add_command et get_commands appelés depuis plusieurs threads ne perdent aucune commande."""
+        delivered = hammer_commands(
+            self.context.add_command,
+            lambda: self.context.get_commands("robot_a")
+        )
+
+        self.assertEqual(len({(command["producer"], command["index"]) for command in delivered}), 8 * 2000)
+
+    def test_recent_events_stay_bounded_under_concurrency(self):
+        """Les analyses concurrentes ne conservent que les derniers événements."""
+        def analyze(worker):
+            for index in range(200):
+                with self.context.lock:
+                    self.context._process_sensor_analysis({"interpretation": f"{worker}-{index}"})
+
+        threads = [threading.Thread(target=analyze, args=(worker,)) for worker in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(30)
+
+        events = self.context.snapshot()["recent_events"]
+        self.assertIsInstance(events, list)
+        self.assertEqual(len(events), context_manager.MAX_RECENT_EVENTS)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import unittest
+from unittest.mock import MagicMock
+import sys
+import os
+import json
+
+# Ajout du chemin du serveur MCP pour les imports
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../nas/serveur_mcp"))
+
+# Retirer les schémas simulés par d'autres tests : ce module teste les vrais schémas
+for module_name in ("schemas", "schemas.mcp_schemas", "wire_format"):
+    if isinstance(sys.modules.get(module_name), MagicMock) or module_name == "wire_format":
+        sys.modules.pop(module_name, None)
+
+import msgpack
+from pydantic import ValidationError
+
+from schemas.mcp_schemas import SensorMCPMessage, EmotionalMCPMessage
+from wire_format import (
+    decode_sensor_message, decode_emotion_message, encode_sensor_struct, encode_emotion_struct,
+    WireFormatError, UnsupportedContentType,
+    CONTENT_TYPE_JSON, CONTENT_TYPE_MSGPACK, CONTENT_TYPE_STRUCT
+)
+
+SENSOR_MESSAGE = {
+    "type": "sensor_data",
+    "robot_id": "MignonBot1",
+    "timestamp": 123456,
+    "sensors": {
+        "sound": {"big_sound": 512, "small_sound": 128},
+        "vision": {"distance": 42.5, "light_level": 800, "ir_detected": True},
+        "touch": {"tap": False, "shock": True, "touch": True, "button": False},
+        "temperature": {"dht11": 21.0, "ds18b20": 21.5, "analog": 20.75, "humidity": 40.0},
+        "magnetic": {"hall": -12, "reed": False},
+        "water_level": 3,
+        "proprioception": {"acceleration": [0.5, -0.25, 9.75], "gyro": [0.0, 1.5, -2.0], "tilt": True}
+    }
+}
+
+EMOTION_MESSAGE = {
+    "type": "emotional_state",
+    "robot_id": "MignonBot1",
+    "timestamp": 123456,
+    "emotion": {"type": "tendresse", "intensity": 70, "duration": 1500}
+}
+
+class TestWireFormat(unittest.TestCase):
+    def test_all_formats_decode_to_same_payload(self):
+        """JSON, MessagePack et binaire produisent le même SensorDataPayload."""
+        reference = SensorMCPMessage.model_validate(SENSOR_MESSAGE)
+
+        from_json = decode_sensor_message(json.dumps(SENSOR_MESSAGE).encode(), CONTENT_TYPE_JSON)
+        from_msgpack = decode_sensor_message(msgpack.packb(SENSOR_MESSAGE), CONTENT_TYPE_MSGPACK)
+        from_struct = decode_sensor_message(encode_sensor_struct(reference), CONTENT_TYPE_STRUCT)
+
+        for message in (from_json, from_msgpack, from_struct):
+            self.assertEqual(message.robot_id, "MignonBot1")
+            self.assertEqual(message.timestamp, 123456)
+            self.assertEqual(message.sensors.dict(), reference.sensors.dict())
+
+    def test_struct_is_compact(self):
+        """La trame binaire est bien plus petite que le JSON."""
+        reference = SensorMCPMessage.model_validate(SENSOR_MESSAGE)
+        self.assertLess(len(encode_sensor_struct(reference)) * 4, len(json.dumps(SENSOR_MESSAGE)))
+
+    def test_emotion_struct_round_trip(self):
+        """Un état émotionnel survit à l'encodage binaire."""
+        reference = EmotionalMCPMessage.model_validate(EMOTION_MESSAGE)
+        decoded = decode_emotion_message(encode_emotion_struct(reference), CONTENT_TYPE_STRUCT)
+
+        self.assertEqual(decoded.emotion.dict(), reference.emotion.dict())
+
+    def test_content_type_parameters_are_ignored(self):
+        """Les paramètres du Content-Type (charset, ...) n'empêchent pas le décodage."""
+        message = decode_sensor_message(json.dumps(SENSOR_MESSAGE).encode(), "application/json; charset=utf-8")
+        self.assertEqual(message.robot_id, "MignonBot1")
+
+    def test_errors(self):
+        """Les messages invalides lèvent des erreurs explicites."""
+        reference = SensorMCPMessage.model_validate(SENSOR_MESSAGE)
+        frame = encode_sensor_struct(reference)
+
+        with self.assertRaises(UnsupportedContentType):
+            decode_sensor_message(b"<xml/>", "application/xml")
+        with self.assertRaises(WireFormatError):
+            decode_sensor_message(frame[:-1], CONTENT_TYPE_STRUCT)
+        with self.assertRaises(WireFormatError):
+            decode_emotion_message(frame, CONTENT_TYPE_STRUCT)
+        with self.assertRaises(ValidationError):
+            decode_sensor_message(msgpack.packb({"robot_id": "x"}), CONTENT_TYPE_MSGPACK)
+
+    def test_truncated_msgpack(self):
+        """Un message MessagePack tronqué ou invalide lève WireFormatError (400), pas ValueError (500)."""
+        packed = msgpack.packb(SENSOR_MESSAGE)
+        for body in (b"\x92\x01", b"\xd9", packed[:-2], b"\xc1"):
+            with self.subTest(body=body[:8]):
+                with self.assertRaises(WireFormatError):
+                    decode_sensor_message(body, CONTENT_TYPE_MSGPACK)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+import unittest
+from unittest.mock import MagicMock
+import sys
+import os
+import json
+import time
+import tempfile
+import threading
+from datetime import datetime
+
+# Ajout du chemin du serveur MCP pour les imports
+sys.path.append(os.path.join(os.path.dirname(__file__), "../../nas/serveur_mcp"))
+
+from write_behind import WriteBehindBuffer, WriteBehindFull
+
+class TestWriteBehindBuffer(unittest.TestCase):
+    def setUp(self):
+        """Configuration avant chaque test."""
+        self.db = MagicMock()
+        self.written = threading.Event()
+        self.db.write_batch.side_effect = lambda batch: self.written.set()
+
+    def make_buffer(self, **kwargs):
+        params = {"batch_size": 3, "flush_interval": 60, "max_pending": 10, "block_timeout": 0.1}
+        params.update(kwargs)
+        buffer = WriteBehindBuffer(db=self.db, **params)
+        self.addCleanup(buffer.shutdown, 1)
+        return buffer
+
+    def test_flush_on_batch_size(self):
+        """Les lignes sont écrites en une transaction dès que le lot est complet."""
+        buffer = self.make_buffer()
+        buffer.save_sensor_data("robot", {"water_level": 1})
+        buffer.save_event("robot", "sensor_interpretation", "Rien à signaler")
+        self.assertFalse(self.written.wait(0.1))
+
+        buffer.save_emotional_state("robot", "joie", 60, 30)
+        self.assertTrue(self.written.wait(2))
+        batch = self.db.write_batch.call_args[0][0]
+        self.assertEqual(len(batch["sensor_data"]), 1)
+        self.assertEqual(len(batch["events"]), 1)
+        self.assertEqual(batch["emotional_states"][0]["emotion_type"], "joie")
+        # L'horodatage est celui de la mise en attente, pas celui de l'écriture
+        self.assertIsInstance(batch["sensor_data"][0]["timestamp"], datetime)
+        self.assertEqual(self.db.write_batch.call_count, 1)
+
+    def test_flush_on_interval(self):
+        """Un lot incomplet est écrit au bout de `flush_interval` secondes."""
+        buffer = self.make_buffer(flush_interval=0.05)
+        buffer.save_memory("robot", "emotional_event", "Souvenir", importance=90)
+        self.assertTrue(self.written.wait(2))
+        self.assertEqual(self.db.write_batch.call_args[0][0]["long_term_memories"][0]["importance"], 90)
+
+    def test_failed_flush_keeps_rows(self):
+        """Les lignes d'une écriture en échec sont conservées, dans l'ordre."""
+        self.db.write_batch.side_effect = RuntimeError("base de données indisponible")
+        buffer = self.make_buffer()
+        buffer.save_sensor_data("robot", {"water_level": 1})
+        buffer.save_sensor_data("robot", {"water_level": 2})
+
+        self.assertEqual(buffer.flush(), 0)
+        self.assertEqual(buffer.pending, 2)
+
+        self.db.write_batch.side_effect = None
+        self.assertEqual(buffer.flush(), 2)
+        rows = self.db.write_batch.call_args[0][0]["sensor_data"]
+        self.assertEqual([row["data"]["water_level"] for row in rows], [1, 2])
+        self.assertEqual(buffer.pending, 0)
+
+    def test_poison_row_is_isolated(self):
+        """Une ligne refusée par la base n'empêche pas l'écriture des autres, puis est abandonnée."""
+        written = []
+
+        def write_batch(batch):
+            if any(row["data"] == "poison" for row in batch.get("sensor_data", ())):
+                raise ValueError("valeur refusée par la base")
+            written.extend(row["data"] for rows in batch.values() for row in rows)
+
+        self.db.write_batch.side_effect = write_batch
+        self.db.ping.return_value = True
+        dead_letter = os.path.join(tempfile.mkdtemp(), "dead_letter.jsonl")
+        buffer = self.make_buffer(batch_size=10, max_attempts=2, dead_letter_path=dead_letter)
+        buffer.save_sensor_data("robot", {"water_level": 1})
+        buffer.save_sensor_data("robot", "poison")
+        buffer.save_sensor_data("robot", {"water_level": 3})
+        buffer.save_event("robot", "anomaly", "Valeur inhabituelle", {"field": "distance"})
+
+        self.assertEqual(buffer.flush(), 3)
+        self.assertEqual(written, [{"water_level": 1}, {"water_level": 3}, {"field": "distance"}])
+        self.assertEqual(buffer.pending, 1)
+
+        # Deuxième refus : la ligne est abandonnée
+        self.assertEqual(buffer.flush(), 0)
+        self.assertEqual(buffer.pending, 0)
+        self.assertEqual(buffer.stats()["dropped"], 1)
+        with open(dead_letter, encoding="utf-8") as f:
+            entries = [json.loads(line) for line in f]
+        self.assertEqual(len(entries), 1)
+        self.assertEqual(entries[0]["table"], "sensor_data")
+        self.assertEqual(entries[0]["row"]["data"], "poison")
+
+    def test_unreachable_database_drops_nothing(self):
+        """Base de données injoignable : aucune ligne n'est réécrite une à une ni abandonnée."""
+        self.db.write_batch.side_effect = RuntimeError("connexion refusée")
+        self.db.ping.return_value = False
+        buffer = self.make_buffer(max_attempts=1, dead_letter_path="")
+        buffer.save_sensor_data("robot", {"water_level": 1})
+        buffer.save_sensor_data("robot", {"water_level": 2})
+
+        for _ in range(3):
+            self.assertEqual(buffer.flush(), 0)
+        self.assertEqual(buffer.pending, 2)
+        self.assertEqual(buffer.stats()["dropped"], 0)
+        self.assertEqual(self.db.write_batch.call_count, 3)
+
+    def test_backpressure(self):
+        """Un tampon plein bloque l'appelant puis lève WriteBehindFull."""
+        release = threading.Event()
+        self.db.write_batch.side_effect = lambda batch: release.wait(5)
+        buffer = self.make_buffer(batch_size=2, max_pending=4)
+        self.addCleanup(release.set)
+
+        buffer.save_sensor_data_many([{"robot_id": "robot", "timestamp": datetime.utcnow(), "data": {}}] * 2)
+        # Laisser le thread d'écriture prendre le premier lot (bloqué par la base)
+        deadline = time.monotonic() + 2
+        while buffer.stats()["by_table"]["sensor_data"] and time.monotonic() < deadline:
+            time.sleep(0.01)
+        buffer.save_sensor_data_many([{"robot_id": "robot", "timestamp": datetime.utcnow(), "data": {}}] * 4)
+
+        start = time.monotonic()
+        with self.assertRaises(WriteBehindFull):
+            buffer.save_sensor_data("robot", {})
+        self.assertGreaterEqual(time.monotonic() - start, 0.1)
+
+    def test_shutdown_flushes_pending_rows(self):
+        """L'arrêt écrit les lignes encore en attente."""
+        buffer = self.make_buffer()
+        buffer.save_event("robot", "emotion_change", "Changement d'émotion")
+        buffer.shutdown(timeout=2)
+
+        self.db.write_batch.assert_called_once()
+        self.assertEqual(buffer.pending, 0)
+
+if __name__ == "__main__":
+    unittest.main()